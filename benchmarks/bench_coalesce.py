@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Concurrent ``diagnose`` calls with and without the coalescing front end.
+
+``--clients`` threads send ``--requests`` labels in total, drawn with a
+Zipf-like skew from ``--distinct`` labels of a synthetic database, against
+local mock EPPO and Groq servers with fixed latencies. Each mode starts
+from empty EPPO and response caches. Reports throughput, latency
+percentiles, LLM and EPPO API calls, and for the coalescing mode its
+coalesce ratio, batch size and queueing delay. No API keys or network
+needed.
+
+Usage:
+    python benchmarks/synthetic_data.py --output synth.sqlite
+    python benchmarks/bench_coalesce.py --sqlite synth.sqlite --clients 32
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from bench_suite import _load_taxa
+from groq import Groq
+from mock_eppo_server import start_mock_server
+from mock_groq_server import start_mock_groq
+from synthetic_data import make_workload
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.cache import ResponseCache  # noqa: E402
+from src.coalescing import CoalescingDiagnoser  # noqa: E402
+from src.compiled_index import HAS_NUMPY, CompiledNameIndex  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.eppo_client import EPPOClient  # noqa: E402
+from src.generation import ResponseGenerator  # noqa: E402
+from src.instrumentation import _percentile  # noqa: E402
+from src.normalization import normalize_cv_label  # noqa: E402
+from src.pipeline import diagnose  # noqa: E402
+from src.rate_limit import RateLimiter  # noqa: E402
+from src.retrieval import RetrievalSession, select_best  # noqa: E402
+
+
+def make_requests(labels: List[str], count: int, skew: float, seed: int) -> List[str]:
+    """Draw ``count`` labels, the i-th distinct one with weight 1 / (i + 1) ** skew."""
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) ** skew for i in range(len(labels))]
+    return rng.choices(labels, weights, k=count)
+
+
+def run(mode: str, requests: List[str], args, retriever, eppo_url: str, groq_url: str):
+    """Send the requests from ``args.clients`` threads and print a summary."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        eppo_client = EPPOClient(
+            api_key="bench",
+            base_url=eppo_url,
+            cache_dir=Path(cache_dir),
+            rate_limiter=RateLimiter(rate=1e6, burst=1e6),
+        )
+        generator = ResponseGenerator(
+            api_key="bench",
+            response_cache=ResponseCache(Path(cache_dir) / "responses.sqlite"),
+        )
+        generator.client = Groq(api_key="bench", base_url=groq_url)
+        coalescer = None
+        if mode == "coalesce":
+            coalescer = CoalescingDiagnoser(
+                eppo_client=eppo_client,
+                generator=generator,
+                retriever=retriever,
+                window=args.window_ms / 1000,
+                workers=args.clients,
+                max_pending=len(requests),
+            )
+
+        latencies: List[float] = []
+        lock = threading.Lock()
+        chunks = [requests[i::args.clients] for i in range(args.clients)]
+
+        def client(labels: List[str]):
+            for label in labels:
+                start = time.perf_counter()
+                if coalescer is not None:
+                    coalescer.diagnose(label)
+                else:
+                    diagnose(
+                        label,
+                        eppo_client=eppo_client,
+                        generator=generator,
+                        retriever=retriever,
+                    )
+                seconds = time.perf_counter() - start
+                with lock:
+                    latencies.append(seconds)
+
+        threads = [threading.Thread(target=client, args=(chunk,)) for chunk in chunks]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        eppo_stats = eppo_client.get_stats()
+        groq_stats = generator.get_stats()
+        print(
+            f"{mode:9s} {len(requests) / elapsed:8.1f} req/s  "
+            f"p50 {_percentile(latencies, 50) * 1000:7.1f} ms  "
+            f"p95 {_percentile(latencies, 95) * 1000:7.1f} ms  "
+            f"LLM calls {groq_stats['call_count']:4d}  "
+            f"EPPO API calls {eppo_stats['api_calls']:4d}"
+        )
+        if coalescer is not None:
+            coalescer.close()
+            stats = coalescer.get_stats()
+            queue = stats["latency"].get("queue", {})
+            print(
+                f"          coalesced {stats['coalesce_ratio']:.1%} of requests, "
+                f"{stats['batches']} batches of {stats['mean_batch_size']:.1f}, "
+                f"{stats['fetches']} code fetches for {stats['dispatched']} requests, "
+                f"queue p50 {queue.get('p50', 0) * 1000:.1f} ms "
+                f"p95 {queue.get('p95', 0) * 1000:.1f} ms"
+            )
+        generator.close()
+
+
+def main():
+    """Run the coalescing benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sqlite", type=Path, default=Config.SQLITE_PATH)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--distinct", type=int, default=100)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--window-ms", type=float, default=Config.COALESCE_WINDOW * 1000)
+    parser.add_argument("--eppo-latency-ms", type=float, default=30.0)
+    parser.add_argument("--groq-latency-ms", type=float, default=200.0)
+    parser.add_argument("--groq-tokens", type=int, default=100)
+    parser.add_argument("--groq-token-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not args.sqlite.exists():
+        print(f"❌ SQLite database not found at {args.sqlite}")
+        sys.exit(1)
+
+    retriever = (
+        CompiledNameIndex.open(args.sqlite) if HAS_NUMPY else RetrievalSession(args.sqlite)
+    )
+    labels = list(
+        dict.fromkeys(label for _, label in make_workload(args.sqlite, args.distinct * 2))
+    )[: args.distinct]
+    requests = make_requests(labels, args.requests, args.skew, args.seed)
+    # Serve real names so that the facts pass validation
+    codes = {
+        best.eppocode
+        for best in (select_best(retriever.query(normalize_cv_label(label))) for label in labels)
+        if best is not None
+    }
+
+    eppo_server, eppo_url = start_mock_server(
+        latency_ms=args.eppo_latency_ms, taxa=_load_taxa(args.sqlite, sorted(codes))
+    )
+    groq_server, groq_url = start_mock_groq(
+        tokens=args.groq_tokens,
+        token_ms=args.groq_token_ms,
+        latency_ms=args.groq_latency_ms,
+    )
+    print(
+        f"{len(requests)} requests over {len(labels)} labels (skew {args.skew}) "
+        f"from {args.clients} threads, {type(retriever).__name__}\n"
+    )
+    try:
+        for mode in ("direct", "coalesce"):
+            run(mode, requests, args, retriever, eppo_url, groq_url)
+    finally:
+        eppo_server.shutdown()
+        groq_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
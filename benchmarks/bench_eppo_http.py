@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Per-call EPPO request latency with and without connection reuse.
+
+Starts a local HTTP/1.1 stand-in for api.eppo.int, then times the same
+requests through module-level ``requests.get`` (new connection per call)
+and through EPPOClient's pooled session. ``--handshake-ms`` delays every
+new connection to stand in for the TCP+TLS setup to the real API. No API
+key or network needed.
+
+Usage:
+    python benchmarks/bench_eppo_http.py --calls 300 --handshake-ms 30
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.eppo_client import EPPOClient  # noqa: E402
+from src.rate_limit import RateLimiter  # noqa: E402
+
+OVERVIEW = json.dumps(
+    {"eppocode": "PHYTIN", "prefname": "Phytophthora infestans"}
+).encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves a fixed overview payload with keep-alive enabled."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    handshake_seconds = 0.0
+
+    def setup(self):
+        time.sleep(self.handshake_seconds)
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(OVERVIEW)))
+        self.end_headers()
+        self.wfile.write(OVERVIEW)
+
+    def log_message(self, *args):
+        pass
+
+
+def _median_ms(fn, calls: int) -> float:
+    """Return the median wall time of ``fn()`` in milliseconds."""
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    """Run the connection reuse benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    StandInHandler.handshake_seconds = args.handshake_ms / 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    url = f"{base_url}/taxons/taxon/PHYTIN/overview"
+
+    client = EPPOClient(
+        api_key="bench",
+        base_url=base_url,
+        use_cache=False,
+        rate_limiter=RateLimiter(rate=1e9, burst=1e9),
+    )
+    try:
+        fresh = _median_ms(
+            lambda: requests.get(url, headers={"X-Api-Key": "bench"}, timeout=30),
+            args.calls,
+        )
+        pooled = _median_ms(
+            lambda: client._get_endpoint("PHYTIN", "overview"), args.calls
+        )
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(f"requests.get (new connection)  median {fresh:7.3f} ms")
+    print(f"EPPOClient session (keep-alive) median {pooled:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
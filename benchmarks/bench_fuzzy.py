@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Latency and recall of the fuzzy token resolver on perturbed EPPO names.
+
+Active names are sampled from the database and one token of each gets
+typos: one edit (substitution, insertion, deletion or transposition), two
+for tokens of 7+ characters in a share of cases. Typos that produce another
+vocabulary word are skipped, since no resolver can see them. Reports:
+
+- token recall: the resolver returns the original token (top-1 / top-5)
+- latency of uncached, memoized and known-token lookups
+- retrieval hit rate of the name's EPPO code for the clean name, the
+  perturbed name as is, and the perturbed name after ``correct``
+
+Usage:
+    python benchmarks/synthetic_data.py --output synth.sqlite
+    python build_index.py --sqlite synth.sqlite
+    python benchmarks/bench_fuzzy.py --sqlite synth.sqlite --labels 1000
+"""
+
+import argparse
+import random
+import sqlite3
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.compiled_index import HAS_NUMPY, CompiledNameIndex  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.fuzzy import FuzzyTokenResolver  # noqa: E402
+from src.instrumentation import _percentile  # noqa: E402
+from src.normalization import normalize_cv_label  # noqa: E402
+from src.retrieval import RetrievalSession  # noqa: E402
+
+
+def _edit(rng: random.Random, token: str) -> str:
+    """Apply one random edit to a token."""
+    i = rng.randrange(len(token))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return token[:i] + rng.choice(string.ascii_lowercase) + token[i + 1:]
+    if kind == 1:
+        return token[:i] + rng.choice(string.ascii_lowercase) + token[i:]
+    if kind == 2:
+        return token[:i] + token[i + 1:]
+    i = min(i, len(token) - 2)
+    return token[:i] + token[i + 1] + token[i] + token[i + 2:]
+
+
+def make_cases(
+    sqlite_path: Path,
+    resolver: FuzzyTokenResolver,
+    size: int,
+    two_edit_share: float,
+    seed: int,
+) -> List[Tuple[str, str, str, str, str]]:
+    """Sample perturbed names.
+
+    Returns:
+        List of (eppocode, clean name, perturbed name, token, typo)
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(str(sqlite_path))
+    try:
+        rows = conn.execute(
+            """
+            SELECT c.eppocode, n.fullname
+            FROM t_codes c JOIN t_names n ON c.codeid = n.codeid
+            WHERE c.status = 'A' AND n.status = 'A'
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+
+    cases = []
+    while len(cases) < size:
+        eppocode, fullname = rng.choice(rows)
+        tokens = [
+            t for t in normalize_cv_label(fullname).tokens
+            if len(t) >= resolver.min_token_len
+        ]
+        if not tokens:
+            continue
+        token = rng.choice(tokens)
+        typo = _edit(rng, token)
+        if len(token) >= 7 and rng.random() < two_edit_share:
+            typo = _edit(rng, typo)
+        if typo in resolver or len(typo) < resolver.min_token_len:
+            continue
+        perturbed = " ".join(typo if w.lower() == token else w for w in fullname.split())
+        cases.append((eppocode, fullname, perturbed, token, typo))
+    return cases
+
+
+def _hit_rates(retriever, labels: List[str], codes: List[str], correct=None):
+    """Share of labels whose code ranks first and in the top 5."""
+    top1 = top5 = 0
+    for label, code in zip(labels, codes):
+        norm = normalize_cv_label(label)
+        if correct is not None:
+            norm = correct(norm)
+        ranked = [c.eppocode for c in retriever.query(norm, 5)]
+        top1 += bool(ranked) and ranked[0] == code
+        top5 += code in ranked
+    return top1 / len(labels), top5 / len(labels)
+
+
+def _us(samples: List[float]) -> str:
+    samples = sorted(samples)
+    return (
+        f"p50 {_percentile(samples, 50) * 1e6:7.1f} µs  "
+        f"p95 {_percentile(samples, 95) * 1e6:7.1f} µs  "
+        f"p99 {_percentile(samples, 99) * 1e6:7.1f} µs"
+    )
+
+
+def main():
+    """Run the fuzzy resolver benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sqlite", type=Path, default=Config.SQLITE_PATH)
+    parser.add_argument("--labels", type=int, default=1000)
+    parser.add_argument("--two-edit-share", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not args.sqlite.exists():
+        print(f"❌ SQLite database not found at {args.sqlite}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    resolver = FuzzyTokenResolver.from_sqlite(args.sqlite)
+    print(
+        f"🔨 Resolver over {len(resolver)} tokens, {len(resolver._deletes)} deletes "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    cases = make_cases(args.sqlite, resolver, args.labels, args.two_edit_share, args.seed)
+
+    # Token recall and uncached latency of the top-1 lookup the pipeline uses
+    top1 = top5 = 0
+    cold: List[float] = []
+    for _, _, _, token, typo in cases:
+        t0 = time.perf_counter()
+        best = resolver.suggest(typo, 1)
+        cold.append(time.perf_counter() - t0)
+        top1 += bool(best) and best[0][0] == token
+        top5 += token in [word for word, _ in resolver.suggest(typo, 5)]
+    n = len(cases)
+    print(f"\n🔤 Token recall over {n} typos: top-1 {top1 / n:.1%}  top-5 {top5 / n:.1%}")
+    print(f"   lookup (uncached)   {_us(cold)}")
+
+    warm: List[float] = []
+    for _ in range(2):
+        warm.clear()
+        for _, _, _, _, typo in cases:
+            t0 = time.perf_counter()
+            resolver.lookup(typo)
+            warm.append(time.perf_counter() - t0)
+    known: List[float] = []
+    for _, _, _, token, _ in cases:
+        t0 = time.perf_counter()
+        resolver.lookup(token)
+        known.append(time.perf_counter() - t0)
+    print(f"   lookup (memoized)   {_us(warm)}")
+    print(f"   lookup (known)      {_us(known)}")
+
+    if HAS_NUMPY:
+        retriever = CompiledNameIndex.open(args.sqlite)
+    else:
+        retriever = RetrievalSession(args.sqlite)
+    codes = [case[0] for case in cases]
+    print(f"\n🎯 Retrieval hit rate ({type(retriever).__name__}), top-1 / top-5:")
+    for name, labels, correct in (
+        ("clean name", [case[1] for case in cases], None),
+        ("perturbed", [case[2] for case in cases], None),
+        ("perturbed + fuzzy", [case[2] for case in cases], resolver.correct),
+    ):
+        hit1, hit5 = _hit_rates(retriever, labels, codes, correct)
+        print(f"   {name:18s} {hit1:6.1%} / {hit5:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
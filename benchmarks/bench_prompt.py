@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Prompt size and LLM latency: full vs compact prompt mode.
+
+Runs ``ResponseGenerator.generate`` in both modes against a local stand-in
+for the Groq endpoint that charges ``--prompt-token-us`` per prompt token
+before the first word, then emits ``--answer-tokens`` words (capped at the
+request's ``max_completion_tokens``). Facts come with a growing number of
+hosts. Reports the estimated and reported prompt tokens,
+max_completion_tokens and median latency of each mode, and the local cost
+of formatting the facts. No API key or network needed.
+
+The mock emits the same answer in both modes, so latency differences are
+prompt-side only; a real model also answers shorter when asked for at most
+Config.GROQ_COMPACT_ANSWER_WORDS words, which the token usage logged by the
+generator (``usage_log``) measures in production.
+
+Usage:
+    python benchmarks/bench_prompt.py --prompt-token-us 150 --answer-tokens 400
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from groq import Groq
+from mock_groq_server import start_mock_groq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.generation import ResponseGenerator  # noqa: E402
+
+
+def make_facts(hosts: int) -> dict:
+    """Facts for PHYTIN with ``hosts`` host entries."""
+    return {
+        "overview": {"eppocode": "PHYTIN", "prefname": "Phytophthora infestans"},
+        "names": [
+            {"fullname": name}
+            for name in (
+                "Phytophthora infestans",
+                "late blight of potato",
+                "late blight of tomato",
+                "potato blight",
+                "Kraut- und Knollenfäule der Kartoffel",
+                "mildiou de la pomme de terre",
+            )
+        ],
+        "hosts": [
+            {
+                "prefname": f"Solanum species {i}",
+                "class_label": "Major host" if i % 4 == 0 else "Host",
+            }
+            for i in range(hosts)
+        ],
+    }
+
+
+def main():
+    """Run the prompt mode benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--answer-tokens", type=int, default=400)
+    parser.add_argument("--token-ms", type=float, default=1.0)
+    parser.add_argument("--prompt-token-us", type=float, default=150.0)
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_groq(
+        tokens=args.answer_tokens,
+        token_ms=args.token_ms,
+        prompt_token_us=args.prompt_token_us,
+    )
+    generators = {}
+    for mode in ("full", "compact"):
+        generator = ResponseGenerator(
+            api_key="bench", use_response_cache=False, compact=mode == "compact"
+        )
+        generator.client = Groq(api_key="bench", base_url=base_url)
+        generators[mode] = generator
+
+    print(
+        f"{args.answer_tokens} answer tokens at {args.token_ms} ms/token, "
+        f"{args.prompt_token_us} µs/prompt token, median of {args.repeats}\n"
+    )
+    print(
+        f"{'hosts':>5s} {'mode':8s} {'est. prompt':>11s} {'prompt':>7s} "
+        f"{'max compl.':>10s} {'format':>9s} {'latency':>10s}"
+    )
+    try:
+        for hosts in args.hosts:
+            facts = make_facts(hosts)
+            for mode, generator in generators.items():
+                start = time.perf_counter()
+                for _ in range(200):
+                    generator._format_facts(facts)
+                format_us = (time.perf_counter() - start) / 200 * 1e6
+
+                latencies = []
+                for _ in range(args.repeats):
+                    start = time.perf_counter()
+                    generator.generate("Potato late blight", facts)
+                    latencies.append(time.perf_counter() - start)
+                usage = generator.usage_log[-1]
+                print(
+                    f"{hosts:5d} {mode:8s} {usage['estimated_prompt_tokens']:11d} "
+                    f"{usage['prompt_tokens']:7d} {usage['max_completion_tokens']:10d} "
+                    f"{format_us:7.1f}µs {statistics.median(latencies) * 1000:8.1f}ms"
+                )
+    finally:
+        server.shutdown()
+
+    for mode, generator in generators.items():
+        stats = generator.get_stats()
+        print(
+            f"\n{mode}: {stats['call_count']} calls, {stats['prompt_tokens']} prompt "
+            f"and {stats['completion_tokens']} completion tokens, "
+            f"{stats['truncated']} truncated"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Compare LIKE-scan and token-index latency of query_candidates.
+
+Usage:
+    python benchmarks/bench_retrieval.py --sqlite eppocodes_all.sqlite
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config  # noqa: E402
+from src.normalization import normalize_cv_label  # noqa: E402
+from src.retrieval import index_path_for, query_candidates  # noqa: E402
+
+LABELS = [
+    "Rice leaf blast",
+    "Wheat leaf rust",
+    "Potato leaf late blight",
+    "Tomato mosaic virus",
+    "Apple scab",
+    "Maize stem rot",
+]
+
+
+def _time_ms(sqlite_path: Path, use_index: bool, repeats: int):
+    """Return per-call latencies in milliseconds over all labels."""
+    samples = []
+    norms = [normalize_cv_label(label) for label in LABELS]
+    for _ in range(repeats):
+        for norm in norms:
+            start = time.perf_counter()
+            query_candidates(sqlite_path, norm, use_index=use_index)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    """Run the retrieval benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sqlite", type=Path, default=Config.SQLITE_PATH)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if not index_path_for(args.sqlite).exists():
+        print("❌ Token index missing; run build_index.py first")
+        sys.exit(1)
+
+    for label, use_index in (("LIKE scan", False), ("token index", True)):
+        samples = _time_ms(args.sqlite, use_index, args.repeats)
+        print(
+            f"{label:12s}  mean {statistics.mean(samples):8.2f} ms"
+            f"  median {statistics.median(samples):8.2f} ms"
+            f"  max {max(samples):8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
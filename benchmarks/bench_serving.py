@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Retrieval-only throughput of serve_lines with 1, 2, 4 and 8 workers.
+
+Loads the index once, then pushes the same JSON-line requests through
+forked workers. EPPO and Groq are never called, so this measures the CPU
+bound part of serving. Scaling is capped by the cores on the machine.
+
+Usage:
+    python benchmarks/bench_serving.py --sqlite eppocodes_all.sqlite --labels 5000
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config  # noqa: E402
+from src.serving import load_retriever, serve_lines  # noqa: E402
+
+
+def _sample_labels(sqlite_path: Path, count: int):
+    """Take active names from the database as request labels."""
+    conn = sqlite3.connect(str(sqlite_path))
+    try:
+        rows = conn.execute(
+            "SELECT fullname FROM t_names WHERE status = 'A' LIMIT ?", (count,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def main():
+    """Run the serving scaling benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sqlite", type=Path, default=Config.SQLITE_PATH)
+    parser.add_argument("--labels", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--no-compiled", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    retriever = load_retriever(args.sqlite, compiled=not args.no_compiled)
+    load_seconds = time.perf_counter() - start
+    lines = [json.dumps({"label": label}) for label in _sample_labels(args.sqlite, args.labels)]
+
+    print(
+        f"{type(retriever).__name__} loaded once in {load_seconds:.2f}s; "
+        f"{len(lines)} labels; {os.cpu_count()} CPU(s)"
+    )
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        count = sum(1 for _ in serve_lines(lines, retriever, workers, retrieval_only=True))
+        seconds = time.perf_counter() - start
+        rate = count / seconds
+        baseline = baseline or rate
+        print(f"{workers:2d} worker(s): {rate:9.0f} labels/s  ({rate / baseline:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
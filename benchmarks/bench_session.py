@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Measure connection setup cost: query_candidates vs RetrievalSession.
+
+Usage:
+    python benchmarks/bench_session.py --sqlite eppocodes_all.sqlite
+"""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config  # noqa: E402
+from src.normalization import normalize_cv_label  # noqa: E402
+from src.retrieval import RetrievalSession, index_path_for, query_candidates  # noqa: E402
+
+
+def _median_us(fn, repeats: int) -> float:
+    """Return the median wall time of ``fn()`` in microseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    """Run the session microbenchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sqlite", type=Path, default=Config.SQLITE_PATH)
+    parser.add_argument("--label", default="Apple scab")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = index_path_for(args.sqlite)
+    if not db_path.exists():
+        db_path = args.sqlite
+    norm = normalize_cv_label(args.label)
+
+    def connect_only():
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        conn.close()
+
+    with RetrievalSession(args.sqlite) as session:
+        session.query(norm)  # open the first pooled connection
+        rows = [
+            ("connect + schema + close", _median_us(connect_only, args.repeats)),
+            (
+                "query_candidates",
+                _median_us(lambda: query_candidates(args.sqlite, norm), args.repeats),
+            ),
+            (
+                "RetrievalSession.query",
+                _median_us(lambda: session.query(norm), args.repeats),
+            ),
+        ]
+
+    print(f"Label: {args.label!r}  ({'token index' if session.indexed else 'LIKE scan'})")
+    for name, us in rows:
+        print(f"{name:26s} median {us:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
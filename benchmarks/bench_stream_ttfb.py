@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Time to first byte: blocking ``generate`` vs ``generate_stream``.
+
+Starts a local stand-in for the Groq chat completions endpoint that emits
+one token every ``--token-ms`` (as server-sent events when streaming, or
+all at once otherwise), then times the first text each path returns.
+No API key or network needed.
+
+Usage:
+    python benchmarks/bench_stream_ttfb.py --tokens 400 --token-ms 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from groq import Groq
+from mock_groq_server import start_mock_groq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.generation import ResponseGenerator  # noqa: E402
+
+FACTS = {
+    "overview": {"eppocode": "PHYTIN", "prefname": "Phytophthora infestans"},
+    "names": [{"fullname": "late blight of potato"}],
+    "hosts": [{"prefname": "Solanum tuberosum", "class_label": "Major host"}],
+}
+
+
+def main():
+    """Run the time-to-first-byte benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-ms", type=float, default=5.0)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_groq(tokens=args.tokens, token_ms=args.token_ms)
+
+    generator = ResponseGenerator(api_key="bench", use_response_cache=False)
+    generator.client = Groq(api_key="bench", base_url=base_url)
+
+    blocking, first, full = [], [], []
+    try:
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            generator.generate("Potato late blight", FACTS)
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            stream = generator.generate_stream("Potato late blight", FACTS)
+            next(stream)
+            first.append(time.perf_counter() - start)
+            for _ in stream:
+                pass
+            full.append(time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+    print(f"{args.tokens} tokens at {args.token_ms} ms/token, median of {args.repeats}")
+    print(f"generate         first text {statistics.median(blocking) * 1000:8.1f} ms")
+    print(f"generate_stream  first text {statistics.median(first) * 1000:8.1f} ms")
+    print(f"generate_stream  complete   {statistics.median(full) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Regression benchmark suite for the retrieval and pipeline hot paths.
+
+Generates (or reuses) a synthetic EPPO database of ``--codes`` rows, builds a
+label workload mixing common, rare, noisy and duplicate labels, and times:
+
+- ``normalize_cv_label``
+- ``query_candidates`` (per workload kind) and ``RetrievalSession.query``
+- ``validate_eppo_against_label`` on each label's best candidate
+- ``diagnose`` end to end against local mock EPPO and Groq servers, once
+  with empty caches (cold) and once more with the caches filled (warm)
+
+Results are written as JSON. ``--baseline`` compares the run against an
+earlier results file and ``--compare OLD NEW`` compares two files without
+running; both exit with status 1 when a benchmark's median regressed by
+more than ``--tolerance``. No API keys or network needed.
+
+Usage:
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --codes 20000 --baseline results.json
+    python benchmarks/bench_suite.py --compare old.json new.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from groq import Groq
+from mock_eppo_server import start_mock_server
+from mock_groq_server import start_mock_groq
+from synthetic_data import FULL_SIZE, WORKLOAD_MIX, generate_db, make_workload
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.cache import ResponseCache  # noqa: E402
+from src.eppo_client import EPPOClient  # noqa: E402
+from src.generation import ResponseGenerator  # noqa: E402
+from src.instrumentation import LatencyStats, add_hook, remove_hook  # noqa: E402
+from src.name_index import build_name_index  # noqa: E402
+from src.normalization import normalize_cv_label  # noqa: E402
+from src.pipeline import diagnose  # noqa: E402
+from src.rate_limit import RateLimiter  # noqa: E402
+from src.retrieval import (  # noqa: E402
+    RetrievalSession,
+    index_path_for,
+    query_candidates,
+    select_best,
+)
+from src.validation import validate_eppo_against_label  # noqa: E402
+
+# Samples kept per benchmark; larger than any default run
+_WINDOW = 1_000_000
+
+
+def _summarize(stats: LatencyStats) -> Dict[str, Dict[str, float]]:
+    """Convert a LatencyStats summary to milliseconds with throughput."""
+    return {
+        name: {
+            "count": row["count"],
+            "mean_ms": row["mean"] * 1000,
+            "p50_ms": row["p50"] * 1000,
+            "p95_ms": row["p95"] * 1000,
+            "p99_ms": row["p99"] * 1000,
+            "ops_per_sec": 1 / row["mean"] if row["mean"] > 0 else 0.0,
+        }
+        for name, row in stats.summary().items()
+    }
+
+
+def _load_taxa(sqlite_path: Path, codes: Sequence[str]) -> Dict[str, List[str]]:
+    """Active names per code, preferred name first."""
+    conn = sqlite3.connect(str(sqlite_path))
+    try:
+        taxa: Dict[str, List[str]] = {}
+        for code in codes:
+            rows = conn.execute(
+                """
+                SELECT n.fullname FROM t_codes c JOIN t_names n ON c.codeid = n.codeid
+                WHERE c.eppocode = ? AND n.status = 'A'
+                ORDER BY n.preferred DESC, n.nameid
+                """,
+                (code,),
+            ).fetchall()
+            taxa[code] = [row[0] for row in rows]
+        return taxa
+    finally:
+        conn.close()
+
+
+def _facts(code: str, names: List[str]) -> Dict[str, Any]:
+    """Facts shaped like ``EPPOClient.fetch_facts`` output."""
+    return {
+        "overview": {"eppocode": code, "prefname": names[0] if names else code},
+        "names": [{"fullname": name} for name in names],
+        "hosts": [],
+    }
+
+
+def _time_calls(
+    stats: LatencyStats, names: Sequence[str], fn, calls: Sequence[tuple], repeats: int
+) -> list:
+    """Time ``fn(*args)`` for every call after one untimed warm-up pass.
+
+    Each sample is recorded under every name in ``names`` for its call
+    (a string applies to all calls). Returns the results of the last pass.
+    """
+    for args in calls:
+        fn(*args)
+    clock = time.perf_counter
+    results = []
+    for _ in range(repeats):
+        results = []
+        for i, args in enumerate(calls):
+            start = clock()
+            results.append(fn(*args))
+            seconds = clock() - start
+            for name in (names,) if isinstance(names, str) else names[i]:
+                stats.record(name, seconds)
+    return results
+
+
+def bench_micro(
+    sqlite_path: Path, workload: List[Tuple[str, str]], repeats: int
+) -> Tuple[LatencyStats, Dict[str, List[str]]]:
+    """Time normalization, retrieval and validation on every workload label.
+
+    The garbage collector is paused while timing, as ``timeit`` does.
+
+    Returns:
+        Tuple of (stats, active names per best-candidate code)
+    """
+    stats = LatencyStats(window=_WINDOW)
+    labels = [(label,) for _, label in workload]
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        norms = _time_calls(stats, "normalize_cv_label", normalize_cv_label, labels, repeats)
+
+        kinds = [("query_candidates", f"query_candidates.{kind}") for kind, _ in workload]
+        candidate_lists = _time_calls(
+            stats, kinds, query_candidates, [(sqlite_path, norm) for norm in norms], repeats
+        )
+        with RetrievalSession(sqlite_path) as session:
+            _time_calls(
+                stats, "RetrievalSession.query", session.query, [(n,) for n in norms], repeats
+            )
+
+        best = [select_best(candidates) for candidates in candidate_lists]
+        taxa = _load_taxa(sqlite_path, sorted({c.eppocode for c in best if c}))
+        checks = [
+            (_facts(c.eppocode, taxa[c.eppocode]), norm)
+            for c, norm in zip(best, norms)
+            if c is not None
+        ]
+        _time_calls(
+            stats, "validate_eppo_against_label", validate_eppo_against_label, checks, repeats
+        )
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return stats, taxa
+
+
+def bench_diagnose(
+    sqlite_path: Path,
+    labels: List[str],
+    taxa: Dict[str, List[str]],
+    args: argparse.Namespace,
+) -> Tuple[LatencyStats, Dict[str, Dict[str, Any]]]:
+    """Run ``diagnose`` over the labels against mock servers.
+
+    The cold pass starts from empty EPPO and response caches; the warm
+    passes (``args.repeats`` of them) repeat the labels with both filled.
+
+    Returns:
+        Tuple of (stats with diagnose.cold/diagnose.warm, per-pass stage
+        summaries and client counters)
+    """
+    eppo_server, eppo_url = start_mock_server(
+        latency_ms=args.eppo_latency_ms, taxa=taxa
+    )
+    groq_server, groq_url = start_mock_groq(
+        tokens=args.groq_tokens,
+        token_ms=args.groq_token_ms,
+        latency_ms=args.groq_latency_ms,
+    )
+    stats = LatencyStats(window=_WINDOW)
+    passes: Dict[str, Dict[str, Any]] = {}
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            eppo_client = EPPOClient(
+                api_key="bench",
+                base_url=eppo_url,
+                cache_dir=Path(cache_dir),
+                rate_limiter=RateLimiter(rate=1e6, burst=1e6),
+            )
+            generator = ResponseGenerator(
+                api_key="bench",
+                response_cache=ResponseCache(Path(cache_dir) / "responses.sqlite"),
+            )
+            generator.client = Groq(api_key="bench", base_url=groq_url)
+            retriever = RetrievalSession(sqlite_path)
+
+            for name, passes_over in (("cold", 1), ("warm", args.repeats)):
+                stages = LatencyStats(window=_WINDOW)
+                add_hook(stages)
+                try:
+                    for label in labels * passes_over:
+                        start = time.perf_counter()
+                        diagnose(
+                            label,
+                            eppo_client=eppo_client,
+                            generator=generator,
+                            retriever=retriever,
+                        )
+                        stats.record(f"diagnose.{name}", time.perf_counter() - start)
+                finally:
+                    remove_hook(stages)
+                passes[name] = {
+                    "stages": _summarize(stages),
+                    "eppo": eppo_client.get_stats(),
+                    "groq": generator.get_stats(),
+                }
+            # Client counters are cumulative; report the warm pass on its own
+            for client in ("eppo", "groq"):
+                passes["warm"][client] = {
+                    key: value - passes["cold"][client].get(key, 0)
+                    for key, value in passes["warm"][client].items()
+                }
+            retriever.close()
+            generator.close()
+            eppo_client.close()
+    finally:
+        eppo_server.shutdown()
+        groq_server.shutdown()
+    return stats, passes
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare_results(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    tolerance: float,
+    min_delta_ms: float = 0.0,
+) -> Tuple[List[Tuple[str, float, float, float, bool]], bool]:
+    """Compare median latencies of two results files.
+
+    Args:
+        old: Baseline results
+        new: Candidate results
+        tolerance: Allowed relative slowdown of p50 (0.1 = 10%)
+        min_delta_ms: Slowdowns smaller than this are never regressions,
+            so microsecond jitter in the fastest benchmarks is ignored
+
+    Returns:
+        Tuple of (rows of (benchmark, old p50 ms, new p50 ms, change,
+        regressed), whether any benchmark regressed)
+    """
+    rows = []
+    for name, after in new["results"].items():
+        before = old["results"].get(name)
+        if before is None or before["p50_ms"] <= 0:
+            continue
+        change = after["p50_ms"] / before["p50_ms"] - 1
+        worse = change > tolerance and after["p50_ms"] - before["p50_ms"] > min_delta_ms
+        rows.append((name, before["p50_ms"], after["p50_ms"], change, worse))
+    return rows, any(row[4] for row in rows)
+
+
+def print_comparison(
+    old: Dict[str, Any], new: Dict[str, Any], tolerance: float, min_delta_ms: float
+) -> bool:
+    """Print a comparison table; return whether anything regressed."""
+    changed = {
+        key: (old["meta"]["params"].get(key), value)
+        for key, value in new["meta"]["params"].items()
+        if old["meta"]["params"].get(key) != value
+    }
+    if changed:
+        print(f"⚠️  Parameters differ between runs: {changed}")
+    rows, regressed = compare_results(old, new, tolerance, min_delta_ms)
+    print(f"{'benchmark':32s} {'old p50':>11s} {'new p50':>11s} {'change':>8s}")
+    for name, before, after, change, worse in rows:
+        flag = "  ❌ REGRESSION" if worse else ""
+        print(f"{name:32s} {before:9.3f}ms {after:9.3f}ms {change:+7.1%}{flag}")
+    return regressed
+
+
+def _print_results(results: Dict[str, Dict[str, float]]):
+    print(f"{'benchmark':32s} {'p50':>11s} {'p95':>11s} {'p99':>11s} {'ops/s':>10s}")
+    for name, row in results.items():
+        print(
+            f"{name:32s} {row['p50_ms']:9.3f}ms {row['p95_ms']:9.3f}ms "
+            f"{row['p99_ms']:9.3f}ms {row['ops_per_sec']:10.1f}"
+        )
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--codes", type=int, default=FULL_SIZE, help="Synthetic database size")
+    parser.add_argument("--sqlite", type=Path, help="Use this database instead of a synthetic one")
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "greenretrieval_bench",
+        help="Where synthetic databases are kept between runs",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workload", type=int, default=2000, help="Labels in the workload")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the workload")
+    parser.add_argument(
+        "--e2e-labels", type=int, default=200, help="Workload labels run through diagnose"
+    )
+    parser.add_argument("--eppo-latency-ms", type=float, default=5.0)
+    parser.add_argument("--groq-latency-ms", type=float, default=50.0)
+    parser.add_argument("--groq-tokens", type=int, default=50)
+    parser.add_argument("--groq-token-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, help="Compare this run against a results file")
+    parser.add_argument(
+        "--compare", type=Path, nargs=2, metavar=("OLD", "NEW"), help="Compare two results files"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.15, help="Allowed p50 slowdown before failing"
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.002,
+        help="Ignore p50 slowdowns smaller than this",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (_load_json(path) for path in args.compare)
+        regressed = print_comparison(old, new, args.tolerance, args.min_delta_ms)
+        sys.exit(1 if regressed else 0)
+
+    sqlite_path = args.sqlite
+    if sqlite_path is None:
+        args.work_dir.mkdir(parents=True, exist_ok=True)
+        sqlite_path = args.work_dir / f"eppo_synth_{args.codes}_{args.seed}.sqlite"
+        if not sqlite_path.exists():
+            print(f"🧪 Generating {args.codes} synthetic codes at {sqlite_path}")
+            generate_db(sqlite_path, args.codes, args.seed)
+    if not index_path_for(sqlite_path).exists():
+        print("🔨 Building token index")
+        build_name_index(sqlite_path)
+
+    workload = make_workload(sqlite_path, args.workload, seed=args.seed)
+    print(f"📋 {len(workload)} labels, {args.repeats} passes; {os.cpu_count()} CPU(s)")
+
+    micro, taxa = bench_micro(sqlite_path, workload, args.repeats)
+    e2e_labels = [label for _, label in workload[: args.e2e_labels]]
+    e2e, passes = bench_diagnose(sqlite_path, e2e_labels, taxa, args)
+
+    with sqlite3.connect(str(sqlite_path)) as conn:
+        (codes,) = conn.execute("SELECT COUNT(*) FROM t_codes").fetchone()
+    params = {
+        key: getattr(args, key)
+        for key in (
+            "seed", "workload", "repeats", "e2e_labels", "eppo_latency_ms",
+            "groq_latency_ms", "groq_tokens", "groq_token_ms",
+        )
+    }
+    params.update(codes=codes, mix=WORKLOAD_MIX, sqlite=str(sqlite_path) if args.sqlite else None)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": params,
+        },
+        "results": {**_summarize(micro), **_summarize(e2e)},
+        "diagnose_passes": passes,
+    }
+
+    _print_results(report["results"])
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Wrote {args.output}")
+
+    if args.baseline:
+        print(f"\n📊 Against {args.baseline}")
+        baseline = _load_json(args.baseline)
+        regressed = print_comparison(baseline, report, args.tolerance, args.min_delta_ms)
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
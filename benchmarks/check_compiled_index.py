@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Check that CompiledNameIndex ranks exactly like query_candidates.
+
+Compares both engines on a label corpus (one label per line, or the
+built-in list) and reports per-engine latency. Exits non-zero on any
+difference. Requires the token index (build_index.py).
+
+Usage:
+    python benchmarks/check_compiled_index.py --sqlite eppocodes_all.sqlite
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.compiled_index import CompiledNameIndex  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.normalization import normalize_cv_label  # noqa: E402
+from src.retrieval import index_path_for, query_candidates  # noqa: E402
+
+CORPUS = [
+    "Rice leaf blast",
+    "Wheat leaf rust",
+    "Wheat stem rust",
+    "Potato leaf late blight",
+    "Tomato late blight",
+    "Tomato mosaic virus",
+    "Tomato yellow leaf curl virus",
+    "Apple scab",
+    "Apple fruit rot",
+    "Grape downy mildew",
+    "Cucumber powdery mildew",
+    "Maize stem rot",
+    "Citrus canker",
+    "Banana bacterial wilt",
+    "Bean root rot",
+    "Pepper leaf spot",
+    "Corn leaf blight",
+    "Strawberry fruit rot",
+    "Cassava mosaic",
+    "Soybean rust",
+    "leaf",
+    "blight",
+    "of the plant",
+]
+
+
+def main():
+    """Run the parity check."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sqlite", type=Path, default=Config.SQLITE_PATH)
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--max-candidates", type=int, default=Config.MAX_CANDIDATES)
+    args = parser.parse_args()
+
+    if not index_path_for(args.sqlite).exists():
+        print("❌ Token index missing; run build_index.py first")
+        sys.exit(1)
+
+    labels = CORPUS
+    if args.labels:
+        labels = [
+            line.strip()
+            for line in args.labels.read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
+
+    start = time.perf_counter()
+    index = CompiledNameIndex.from_sqlite(args.sqlite)
+    print(f"Compiled index loaded in {time.perf_counter() - start:.2f}s")
+
+    sql_ms, compiled_ms, mismatches = [], [], 0
+    for label in labels:
+        norm = normalize_cv_label(label)
+
+        start = time.perf_counter()
+        expected = query_candidates(args.sqlite, norm, args.max_candidates)
+        sql_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        actual = index.query(norm, args.max_candidates)
+        compiled_ms.append((time.perf_counter() - start) * 1000)
+
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ Mismatch: {label!r}")
+
+    print(
+        f"query_candidates  median {statistics.median(sql_ms):8.3f} ms"
+        f"  max {max(sql_ms):8.3f} ms"
+    )
+    print(
+        f"CompiledNameIndex median {statistics.median(compiled_ms):8.3f} ms"
+        f"  max {max(compiled_ms):8.3f} ms"
+    )
+    print(f"{len(labels) - mismatches}/{len(labels)} labels identical")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
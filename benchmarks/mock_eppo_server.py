@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Local stand-in for the EPPO taxon endpoints.
+
+Serves ``/taxons/taxon/<code>/{overview,names,hosts}`` with small
+synthetic payloads so prefetch.py and the async client can be exercised
+without an API key. Codes listed with ``--fail`` return 404, and
+``--throttle-every N`` answers every Nth request with 429. Callers of
+``start_mock_server`` can pass real names per code (``taxa``) so that
+validation against labels behaves as with the live API.
+
+Usage:
+    python benchmarks/mock_eppo_server.py --port 8765 --latency-ms 50
+    python prefetch.py --codes codes.txt --base-url http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class MockEPPOHandler(BaseHTTPRequestHandler):
+    """Answers taxon endpoint requests with synthetic JSON."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency_seconds = 0.0
+    fail_codes: Set[str] = set()
+    throttle_every = 0
+    taxa: Dict[str, List[str]] = {}
+    hosts_per_code = 1
+    requests_served = 0
+    _count_lock = threading.Lock()
+
+    def _payload(self, code: str, endpoint: str):
+        names = self.taxa.get(code) or [f"Taxon {code}"]
+        if endpoint == "overview":
+            return {"eppocode": code, "prefname": names[0]}
+        if endpoint == "names":
+            return [{"fullname": name, "codelang": "la"} for name in names]
+        if endpoint == "hosts":
+            hosts = [{"eppocode": "TRZAX", "full_name": "Triticum aestivum"}]
+            hosts += [
+                {"eppocode": f"H{i:05d}", "prefname": f"Hostus {code.lower()} var{i}"}
+                for i in range(1, self.hosts_per_code)
+            ]
+            return hosts
+        return None
+
+    def _send(self, status: int, body: Optional[bytes] = None, headers=()):
+        body = body or b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls._count_lock:
+            cls.requests_served += 1
+            count = cls.requests_served
+        time.sleep(self.latency_seconds)
+
+        if self.throttle_every and count % self.throttle_every == 0:
+            self._send(429, headers=[("Retry-After", "0")])
+            return
+
+        parts = self.path.split("?")[0].strip("/").split("/")
+        code, endpoint = parts[-2], parts[-1]
+        payload = self._payload(code, endpoint)
+        if code in self.fail_codes or payload is None:
+            self._send(404)
+            return
+        self._send(200, json.dumps(payload).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_server(
+    port: int = 0,
+    latency_ms: float = 0.0,
+    fail_codes: Set[str] = frozenset(),
+    throttle_every: int = 0,
+    taxa: Optional[Dict[str, List[str]]] = None,
+    hosts_per_code: int = 1,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock server on a background thread.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        latency_ms: Delay added to every response
+        fail_codes: Codes answered with 404
+        throttle_every: Answer every Nth request with 429 (0 disables)
+        taxa: Names per code, preferred name first (others get "Taxon <code>")
+        hosts_per_code: Host entries returned per code
+
+    Returns:
+        Tuple of (server, base_url); call ``server.shutdown()`` to stop
+    """
+    MockEPPOHandler.latency_seconds = latency_ms / 1000
+    MockEPPOHandler.fail_codes = set(fail_codes)
+    MockEPPOHandler.throttle_every = throttle_every
+    MockEPPOHandler.taxa = dict(taxa or {})
+    MockEPPOHandler.hosts_per_code = hosts_per_code
+    MockEPPOHandler.requests_served = 0
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockEPPOHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail", nargs="*", default=[], help="Codes to answer with 404")
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--hosts", type=int, default=1, help="Host entries per code")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        args.port,
+        args.latency_ms,
+        set(args.fail),
+        args.throttle_every,
+        hosts_per_code=args.hosts,
+    )
+    print(f"Mock EPPO API at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
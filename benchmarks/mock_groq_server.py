@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Groq chat completions endpoint.
+
+Answers ``POST /openai/v1/chat/completions`` after ``--latency-ms`` plus
+``--prompt-token-us`` per prompt token (about 4 characters each), then
+emits ``--tokens`` words at ``--token-ms`` each, stopping early with
+``finish_reason`` "length" at the request's ``max_completion_tokens``: as
+server-sent events when the request streams, or as one completion
+otherwise. Usage is reported like Groq does (on the last chunk, under
+``x_groq``, when streaming). Point a ``Groq`` client at it with
+``base_url``; no API key or network needed.
+
+Usage:
+    python benchmarks/mock_groq_server.py --port 8766 --latency-ms 200
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions with a fixed per-token delay."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    tokens = 400
+    token_seconds = 0.005
+    latency_seconds = 0.0
+    prompt_token_seconds = 0.0
+    requests_served = 0
+    _count_lock = threading.Lock()
+
+    def _usage(self, prompt_tokens: int, completion_tokens: int) -> dict:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _completion(
+        self, content: str, prompt_tokens: int, completion_tokens: int, finish_reason: str
+    ) -> dict:
+        return {
+            "id": "bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "bench",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+            "usage": self._usage(prompt_tokens, completion_tokens),
+        }
+
+    def _chunk(self, content: str, finish_reason: str = None, usage: dict = None) -> bytes:
+        event = {
+            "id": "bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "bench",
+            "choices": [
+                {"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}
+            ],
+        }
+        if usage is not None:
+            event["x_groq"] = {"id": "bench", "usage": usage}
+        return f"data: {json.dumps(event)}\n\n".encode()
+
+    def do_POST(self):
+        cls = type(self)
+        with cls._count_lock:
+            cls.requests_served += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        # Roughly 4 characters per token
+        prompt_chars = sum(len(m.get("content") or "") for m in body["messages"])
+        prompt_tokens = prompt_chars // 4
+        tokens = self.tokens
+        finish_reason = "stop"
+        limit = body.get("max_completion_tokens") or body.get("max_tokens")
+        if limit is not None and limit < tokens:
+            tokens, finish_reason = limit, "length"
+        time.sleep(self.latency_seconds + prompt_tokens * self.prompt_token_seconds)
+        if not body.get("stream"):
+            time.sleep(tokens * self.token_seconds)
+            completion = self._completion(
+                "word " * tokens, prompt_tokens, tokens, finish_reason
+            )
+            payload = json.dumps(completion).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for _ in range(tokens):
+            time.sleep(self.token_seconds)
+            self.wfile.write(self._chunk("word "))
+            self.wfile.flush()
+        self.wfile.write(
+            self._chunk("", finish_reason, self._usage(prompt_tokens, tokens))
+        )
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_groq(
+    port: int = 0,
+    tokens: int = 400,
+    token_ms: float = 5.0,
+    latency_ms: float = 0.0,
+    prompt_token_us: float = 0.0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock server on a background thread.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        tokens: Words in every completion
+        token_ms: Delay per word
+        latency_ms: Delay before the first word
+        prompt_token_us: Extra delay before the first word per prompt token
+
+    Returns:
+        Tuple of (server, base_url); call ``server.shutdown()`` to stop
+    """
+    FakeCompletionHandler.tokens = tokens
+    FakeCompletionHandler.token_seconds = token_ms / 1000
+    FakeCompletionHandler.latency_seconds = latency_ms / 1000
+    FakeCompletionHandler.prompt_token_seconds = prompt_token_us / 1e6
+    FakeCompletionHandler.requests_served = 0
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-ms", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--prompt-token-us", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_groq(
+        args.port, args.tokens, args.token_ms, args.latency_ms, args.prompt_token_us
+    )
+    print(f"Mock Groq API at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
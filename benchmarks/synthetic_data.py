@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Synthetic EPPO-shaped database and CV label workloads for benchmarks.
+
+The database has the t_codes/t_names tables the pipeline reads. It holds a
+handful of well-known diseases and hosts plus generated taxa with Latin
+binomials and "<symptom> of <host>" common names, so that shared words
+such as "leaf" or "rot" produce posting lists of realistic length. Output
+depends only on the size and seed.
+
+Usage:
+    python benchmarks/synthetic_data.py --codes 121000 --output synth.sqlite
+    python benchmarks/synthetic_data.py --sqlite synth.sqlite --workload 2000
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import string
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Size of the real EPPO code table
+FULL_SIZE = 121000
+
+HOSTS = [
+    ("ORYSA", "Oryza sativa", "rice"),
+    ("TRZAX", "Triticum aestivum", "wheat"),
+    ("SOLTU", "Solanum tuberosum", "potato"),
+    ("LYPES", "Solanum lycopersicum", "tomato"),
+    ("ZEAMX", "Zea mays", "maize"),
+    ("MABSD", "Malus domestica", "apple"),
+    ("VITVI", "Vitis vinifera", "grapevine"),
+    ("1CIDG", "Citrus", "citrus"),
+    ("GLYMA", "Glycine max", "soybean"),
+    ("HORVX", "Hordeum vulgare", "barley"),
+    ("CUMSA", "Cucumis sativus", "cucumber"),
+    ("CPSAN", "Capsicum annuum", "pepper"),
+    ("FRAAN", "Fragaria ananassa", "strawberry"),
+    ("GOSHI", "Gossypium hirsutum", "cotton"),
+]
+
+# (code, preferred name, common names) of diseases CV models often predict
+DISEASES = [
+    ("PYRIOR", "Pyricularia oryzae", ["rice blast", "leaf blast of rice"]),
+    ("PUCCRT", "Puccinia triticina", ["wheat leaf rust", "brown rust of wheat"]),
+    ("PHYTIN", "Phytophthora infestans", ["late blight of potato", "late blight of tomato"]),
+    ("TOMV00", "Tomato mosaic virus", ["tomato mosaic"]),
+    ("VENTIN", "Venturia inaequalis", ["apple scab"]),
+    ("ALTESO", "Alternaria solani", ["early blight of potato", "early blight of tomato"]),
+    ("PLASVI", "Plasmopara viticola", ["downy mildew of grapevine"]),
+    ("UNCINE", "Erysiphe necator", ["powdery mildew of grapevine"]),
+    ("SETOTU", "Setosphaeria turcica", ["northern leaf blight of maize"]),
+    ("XANTCI", "Xanthomonas citri", ["citrus canker"]),
+    ("PSDMTO", "Pseudomonas syringae pv. tomato", ["bacterial speck of tomato"]),
+    ("TYLCV0", "Tomato yellow leaf curl virus", ["tomato yellow leaf curl"]),
+]
+
+# Labels as a CV model would emit them for DISEASES
+COMMON_LABELS = [
+    "Rice leaf blast",
+    "Wheat leaf rust",
+    "Potato late blight",
+    "Tomato mosaic virus",
+    "Apple scab",
+    "Potato early blight",
+    "Grape downy mildew",
+    "Grape powdery mildew",
+    "Corn northern leaf blight",
+    "Citrus canker",
+    "Tomato bacterial speck",
+    "Tomato yellow leaf curl virus",
+]
+
+SYMPTOMS = [
+    "blight", "rust", "rot", "spot", "wilt", "mosaic", "mildew", "scab",
+    "canker", "smut", "blast", "mould", "curl", "streak", "dieback", "gall",
+]
+QUALIFIERS = [
+    "leaf", "stem", "root", "fruit", "seed", "crown", "black", "brown",
+    "white", "powdery", "downy", "bacterial", "early", "late", "soft", "dry",
+]
+_SYLLABLES = [
+    "ra", "po", "ci", "la", "mi", "to", "sa", "phy", "co", "cus", "ri", "na",
+    "tri", "ster", "mo", "ni", "lia", "spo", "ro", "gal", "ver", "ti", "cil",
+    "fu", "sa", "ri", "um", "bo", "tryt", "ce", "cer", "pe", "ro", "xan", "tho",
+]
+
+WORKLOAD_MIX = {"common": 0.4, "rare": 0.3, "noisy": 0.2, "duplicate": 0.1}
+
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(syllables))
+
+
+def _code(rng: random.Random, used: set) -> str:
+    while True:
+        code = "".join(rng.choice(string.ascii_uppercase) for _ in range(6))
+        if code not in used:
+            used.add(code)
+            return code
+
+
+def _taxon_names(rng: random.Random) -> Tuple[str, List[str]]:
+    """Preferred binomial and extra names for one generated taxon."""
+    genus = _word(rng, rng.randint(2, 4)).capitalize()
+    binomial = f"{genus} {_word(rng, rng.randint(2, 3))}"
+    names = []
+    if rng.random() < 0.3:
+        names.append(f"{genus} {_word(rng, rng.randint(2, 3))}")
+    if rng.random() < 0.4:
+        host = rng.choice(HOSTS)[2]
+        symptom = rng.choice(SYMPTOMS)
+        if rng.random() < 0.5:
+            names.append(f"{rng.choice(QUALIFIERS)} {symptom} of {host}")
+        else:
+            names.append(f"{host} {symptom}")
+    return binomial, names
+
+
+def generate_db(path: Path, codes: int = FULL_SIZE, seed: int = 7) -> Dict[str, int]:
+    """Write a synthetic EPPO database.
+
+    Args:
+        path: Output SQLite file (replaced if it exists)
+        codes: Number of rows in t_codes, including the fixed diseases and hosts
+        seed: Random seed
+
+    Returns:
+        Dictionary with codes and names written
+    """
+    rng = random.Random(seed)
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+
+    used = {code for code, _, _ in HOSTS} | {code for code, _, _ in DISEASES}
+    taxa: List[Tuple[str, str, List[str]]] = [
+        (code, "PFL", [latin, common]) for code, latin, common in HOSTS
+    ]
+    taxa += [(code, "GAF", [pref] + common) for code, pref, common in DISEASES]
+    while len(taxa) < codes:
+        binomial, extra = _taxon_names(rng)
+        dtcode = rng.choice(("GAF", "GAI", "PFL", "SPT"))
+        taxa.append((_code(rng, used), dtcode, [binomial] + extra))
+
+    # The fixed diseases and hosts stay active; ~5% of other codes and
+    # ~3% of non-preferred names are inactive, as in the real database
+    fixed = len(HOSTS) + len(DISEASES)
+    code_rows, name_rows = [], []
+    for codeid, (code, dtcode, names) in enumerate(taxa, 1):
+        status = "A" if codeid <= fixed or rng.random() < 0.95 else "I"
+        code_rows.append((codeid, code, dtcode, status))
+        for i, name in enumerate(names):
+            lang = "la" if i == 0 else "en"
+            name_status = "A" if i == 0 or rng.random() < 0.97 else "I"
+            name_rows.append(
+                (len(name_rows) + 1, codeid, name, lang, int(i == 0), name_status)
+            )
+
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE t_codes (
+                codeid INTEGER PRIMARY KEY, eppocode TEXT, dtcode TEXT, status TEXT
+            );
+            CREATE TABLE t_names (
+                nameid INTEGER PRIMARY KEY, codeid INTEGER, fullname TEXT,
+                codelang TEXT, preferred INTEGER, status TEXT
+            );
+            """
+        )
+        conn.executemany("INSERT INTO t_codes VALUES (?, ?, ?, ?)", code_rows)
+        conn.executemany("INSERT INTO t_names VALUES (?, ?, ?, ?, ?, ?)", name_rows)
+        conn.execute("CREATE INDEX idx_names_codeid ON t_names(codeid)")
+        conn.commit()
+    finally:
+        conn.close()
+    return {"codes": len(code_rows), "names": len(name_rows)}
+
+
+def _perturb(rng: random.Random, label: str) -> str:
+    """Apply the kind of noise seen in CV class names."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        # PlantVillage style: "Tomato___Late_blight"
+        head, _, tail = label.partition(" ")
+        return f"{head}___{tail.replace(' ', '_')}"
+    if kind == 1:
+        return label.upper() if rng.random() < 0.5 else label.lower()
+    if kind == 2:
+        return f"{label} on {rng.choice(('leaves', 'stems', 'fruit'))}"
+    # One-character typo
+    i = rng.randrange(len(label))
+    return label[:i] + rng.choice(string.ascii_lowercase) + label[i + 1:]
+
+
+def make_workload(
+    sqlite_path: Path,
+    size: int,
+    mix: Dict[str, float] = None,
+    seed: int = 7,
+) -> List[Tuple[str, str]]:
+    """Build a label workload from a database.
+
+    Args:
+        sqlite_path: Database from ``generate_db`` (or the real EPPO file)
+        size: Number of labels
+        mix: Share of "common" (COMMON_LABELS), "rare" (random active
+            names), "noisy" (perturbed common or rare labels) and "duplicate"
+            (exact repeats of earlier labels); defaults to WORKLOAD_MIX
+        seed: Random seed
+
+    Returns:
+        List of (kind, label) in request order
+    """
+    rng = random.Random(seed)
+    mix = mix or WORKLOAD_MIX
+    counts = {kind: int(size * share) for kind, share in mix.items()}
+    counts["common"] = counts.get("common", 0) + size - sum(counts.values())
+
+    conn = sqlite3.connect(str(sqlite_path))
+    try:
+        (max_id,) = conn.execute("SELECT MAX(nameid) FROM t_names").fetchone()
+        rare = []
+        while len(rare) < counts.get("rare", 0) + counts.get("noisy", 0):
+            row = conn.execute(
+                "SELECT fullname FROM t_names WHERE nameid = ? AND status = 'A'",
+                (rng.randint(1, max_id),),
+            ).fetchone()
+            if row:
+                rare.append(row[0])
+    finally:
+        conn.close()
+
+    labels = [("common", rng.choice(COMMON_LABELS)) for _ in range(counts["common"])]
+    labels += [("rare", name) for name in rare[: counts.get("rare", 0)]]
+    for name in rare[counts.get("rare", 0):]:
+        source = rng.choice(COMMON_LABELS) if rng.random() < 0.5 else name
+        labels.append(("noisy", _perturb(rng, source)))
+    rng.shuffle(labels)
+
+    for _ in range(counts.get("duplicate", 0)):
+        i = rng.randrange(len(labels) + 1)
+        source = labels[rng.randrange(i)][1] if i else rng.choice(COMMON_LABELS)
+        labels.insert(i, ("duplicate", source))
+    return labels
+
+
+def main():
+    """Generate a database and/or a workload file."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--codes", type=int, default=FULL_SIZE)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Database to generate")
+    parser.add_argument("--sqlite", type=Path, help="Existing database for --workload")
+    parser.add_argument("--workload", type=int, default=0, help="Labels to print as JSON lines")
+    args = parser.parse_args()
+
+    sqlite_path = args.sqlite
+    if args.output:
+        stats = generate_db(args.output, args.codes, args.seed)
+        print(
+            f"✅ Wrote {stats['codes']} codes, {stats['names']} names to {args.output}",
+            file=sys.stderr,
+        )
+        sqlite_path = sqlite_path or args.output
+    if args.workload:
+        if sqlite_path is None:
+            parser.error("--workload needs --sqlite or --output")
+        for kind, label in make_workload(sqlite_path, args.workload, seed=args.seed):
+            print(json.dumps({"kind": kind, "label": label}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Build the retrieval token index for an EPPO SQLite database.
+
+With ``--compiled``, also write the memory-mappable compiled name index
+used by CompiledNameIndex.open (and serve.py).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.compiled_index import HAS_NUMPY, CompiledNameIndex, compiled_path_for
+from src.config import Config
+from src.name_index import build_name_index
+from src.retrieval import index_path_for
+
+
+def main():
+    """Build the token index used by query_candidates."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        default=Config.SQLITE_PATH,
+        help="EPPO SQLite database (defaults to EPPO_SQLITE_PATH)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Index path (defaults to <db stem>.tokens.sqlite next to the database)",
+    )
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="Also write the compiled binary index (requires numpy)",
+    )
+    parser.add_argument(
+        "--compiled-output",
+        type=Path,
+        default=None,
+        help="Compiled index path (defaults to <db stem>.names.idx next to the database)",
+    )
+    args = parser.parse_args()
+
+    if not args.sqlite.exists():
+        print(f"❌ SQLite database not found at {args.sqlite}")
+        sys.exit(1)
+
+    output = args.output or index_path_for(args.sqlite)
+    print(f"🔨 Building token index: {args.sqlite} → {output}")
+    stats = build_name_index(args.sqlite, output)
+    print(f"   Names: {stats['names']}")
+    print(f"   Distinct tokens: {stats['tokens']}")
+    print(f"   Postings: {stats['postings']}")
+    print(f"   Time: {stats['seconds']:.1f}s")
+
+    if not args.compiled:
+        return
+    if not HAS_NUMPY:
+        print("❌ The compiled index requires numpy (pip install numpy)")
+        sys.exit(1)
+    compiled_output = args.compiled_output or compiled_path_for(args.sqlite)
+    print(f"\n🔨 Compiling name index: {output} → {compiled_output}")
+    stats = CompiledNameIndex.from_sqlite(args.sqlite).save(compiled_output, args.sqlite)
+    print(f"   Tokens: {stats['tokens']}, names: {stats['names']}, codes: {stats['codes']}")
+    print(f"   Size: {stats['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Import a directory EPPO cache into the single-file SQLite cache."""
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.cache import SQLITE_CACHE_FILENAME, SQLiteCache, migrate_directory_cache
+from src.config import Config
+
+
+def main():
+    """Copy ``<cache>/taxons/<code>/<endpoint>.json`` files into SQLite."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--source",
+        type=Path,
+        default=Config.EPPO_CACHE_DIR,
+        help="Directory cache root (defaults to EPPO_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--dest",
+        type=Path,
+        default=None,
+        help=f"SQLite cache file (defaults to <source>/{SQLITE_CACHE_FILENAME})",
+    )
+    args = parser.parse_args()
+
+    if not (args.source / "taxons").is_dir():
+        print(f"❌ No directory cache found at {args.source}")
+        sys.exit(1)
+
+    dest_path = args.dest or args.source / SQLITE_CACHE_FILENAME
+    print(f"📦 Migrating {args.source} → {dest_path}")
+    dest = SQLiteCache(dest_path)
+    try:
+        stats = migrate_directory_cache(args.source, dest)
+    finally:
+        dest.close()
+
+    size = dest_path.stat().st_size
+    print(f"   Entries: {stats['entries']} (skipped {stats['skipped']})")
+    print(f"   Size: {stats['bytes_in'] / 1e6:.1f} MB JSON → {size / 1e6:.1f} MB SQLite")
+    print(f"   Time: {stats['seconds']:.1f}s")
+    print("\nSet EPPO_CACHE_BACKEND=sqlite to use it.")
+
+
+if __name__ == "__main__":
+    main()
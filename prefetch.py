@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Warm the EPPO facts cache for a label vocabulary or a list of codes.
+
+Usage:
+    python prefetch.py --labels labels.txt
+    python prefetch.py --codes codes.txt --base-url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+try:
+    from tqdm import tqdm
+
+    HAS_TQDM = True
+except ImportError:
+    HAS_TQDM = False
+
+from src.config import Config
+from src.eppo_client import AsyncEPPOClient
+from src.fuzzy import load_resolver
+from src.prefetch import prefetch_codes, resolve_labels, write_manifest
+from src.rate_limit import RateLimiter
+
+
+def _read_lines(path: Path):
+    """Read non-empty, non-comment lines from a text file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        ]
+
+
+def main():
+    """Resolve codes and fetch overview/names/hosts for each into the cache."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--labels", type=Path, help="File with one CV label per line")
+    source.add_argument("--codes", type=Path, help="File with one EPPO code per line")
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        default=Config.SQLITE_PATH,
+        help="EPPO SQLite database for resolving labels (defaults to EPPO_SQLITE_PATH)",
+    )
+    parser.add_argument(
+        "--top-k", type=int, default=1, help="Candidate codes to warm per label"
+    )
+    parser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        default=Config.FUZZY_TOKENS,
+        help="Correct misspelled label tokens against the EPPO vocabulary (or FUZZY_TOKENS=1)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Config.EPPO_CACHE_DIR,
+        help="Cache to warm (defaults to EPPO_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--progress",
+        type=Path,
+        default=None,
+        help="Resume file (defaults to <cache-dir>/prefetch_progress.jsonl)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=Path("prefetch_failed.json"),
+        help="Where to write failed codes and unresolved labels",
+    )
+    parser.add_argument("--base-url", default=None, help="EPPO API base URL (e.g. a mock server)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=Config.ASYNC_MAX_CONCURRENCY,
+        help="Codes fetched concurrently",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=Config.EPPO_RATE_PER_SECOND,
+        help="API requests per second",
+    )
+    args = parser.parse_args()
+
+    unresolved = []
+    if args.labels:
+        if not args.sqlite.exists():
+            print(f"❌ SQLite database not found at {args.sqlite}")
+            sys.exit(1)
+        labels = _read_lines(args.labels)
+        if args.fuzzy:
+            load_resolver(args.sqlite)
+        print(f"🔎 Resolving {len(labels)} labels against {args.sqlite}")
+        codes, unresolved = resolve_labels(labels, args.sqlite, top_k=args.top_k)
+        print(f"   {len(codes)} codes, {len(unresolved)} labels unresolved")
+    else:
+        codes = list(dict.fromkeys(_read_lines(args.codes)))
+
+    if not Config.EPPO_API_KEY and args.base_url is None:
+        print("⚠️  EPPO_API_KEY is not set; requests will likely be rejected")
+
+    progress_file = args.progress or args.cache_dir / "prefetch_progress.jsonl"
+    rate_limiter = RateLimiter(
+        rate=args.rate,
+        burst=Config.EPPO_RATE_BURST,
+        state_file=Config.EPPO_RATE_LIMIT_FILE,
+    )
+
+    async def run():
+        bar = tqdm(desc="📥 Prefetching", unit="code") if HAS_TQDM else None
+
+        def on_progress(done, total):
+            if bar is not None:
+                bar.total = total
+                bar.update(1)
+
+        async with AsyncEPPOClient(
+            base_url=args.base_url,
+            cache_dir=args.cache_dir,
+            rate_limiter=rate_limiter,
+        ) as client:
+            stats = await prefetch_codes(
+                codes,
+                client,
+                progress_file=progress_file,
+                workers=args.workers,
+                on_progress=on_progress,
+            )
+            client_stats = client.get_stats()
+        if bar is not None:
+            bar.close()
+        return stats, client_stats
+
+    stats, client_stats = asyncio.run(run())
+
+    print("\n📊 Prefetch Summary")
+    print("=" * 80)
+    print(f"Codes: {stats['total']} ({stats['skipped']} already done)")
+    print(f"✅ Fetched: {stats['fetched']}")
+    print(f"❌ Failed: {len(stats['failed'])}")
+    print(f"Time: {stats['seconds']:.1f}s ({stats['codes_per_second']:.2f} codes/s)")
+    print(
+        f"API calls: {client_stats['api_calls']}, "
+        f"cache hits: {client_stats['cache_hits']}, "
+        f"throttled: {client_stats['throttled']}"
+    )
+
+    if stats["failed"] or unresolved:
+        write_manifest(args.manifest, stats["failed"], unresolved)
+        print(f"\n📝 Wrote missing/failed manifest to {args.manifest}")
+        sys.exit(2 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,10 @@ except ImportError:
 from src import diagnose
 from src.config import Config
 from src.eppo_client import EPPOClient
+from src.fuzzy import load_resolver
 from src.generation import ResponseGenerator
+from src.instrumentation import LatencyStats
+from src.retrieval import RetrievalSession
 
 
 def main():
@@ -40,6 +43,9 @@ def main():
     # Initialize shared clients
     eppo_client = EPPOClient()
     generator = ResponseGenerator()
+    retriever = RetrievalSession(Config.SQLITE_PATH)
+    if Config.FUZZY_TOKENS:
+        load_resolver(Config.SQLITE_PATH)
 
     print("🌿 GreenRetrieval - Plant Disease Diagnosis")
     print("=" * 80)
@@ -50,6 +56,7 @@ def main():
 
     # Process labels
     results = []
+    latency = LatencyStats()
     iterator = tqdm(labels, desc="🔬 Diagnosing") if HAS_TQDM else labels
 
     for label in iterator:
@@ -60,8 +67,11 @@ def main():
             label,
             eppo_client=eppo_client,
             generator=generator,
+            retriever=retriever,
+            timings=True,
         )
         results.append((label, result))
+        latency.record_timings(result.timings)
 
         # Display result
         status = "🚫 REFUSED" if result.refused else "✅ VERIFIED"
@@ -98,8 +108,22 @@ def main():
     print(f"   Misses: {eppo_stats['cache_misses']} (fetched from API)")
     print(f"   Total API Calls: {eppo_stats['api_calls']}")
     print(f"\n🤖 Groq LLM Calls: {gen_stats['call_count']}")
+    print(f"   Response Cache Hits: {gen_stats['cache_hits']} (LLM skipped)")
+    print(
+        f"   Tokens: {gen_stats['prompt_tokens']} prompt, "
+        f"{gen_stats['completion_tokens']} completion"
+        f"{' (compact prompt)' if generator.compact else ''}"
+    )
+    if gen_stats["truncated"]:
+        print(f"   ⚠️  Truncated answers: {gen_stats['truncated']} (hit max_completion_tokens)")
+    print("\n⏱️  Stage Latency:")
+    print(latency.format_table())
     print("=" * 80)
 
+    eppo_client.close()
+    generator.close()
+    retriever.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
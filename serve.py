@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Serve diagnoses from pre-forked workers over JSON lines or HTTP.
+
+The retrieval index is loaded once and shared by all workers; each worker
+opens its own pooled EPPO and Groq clients.
+
+Usage:
+    python serve.py --mode jsonl --workers 4 < requests.jsonl > responses.jsonl
+    python serve.py --mode http --port 8080 --workers 4
+    curl -d '{"label": "Rice leaf blast"}' localhost:8080/diagnose
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.config import Config
+from src.fuzzy import load_resolver
+from src.normalization import load_vocabulary
+from src.serving import load_retriever, serve_http, serve_lines, worker_count
+
+
+def main():
+    """Load the index, fork workers and serve until input ends or Ctrl+C."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mode", choices=("jsonl", "http"), default="jsonl")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (defaults to CPU count)"
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        default=Config.SQLITE_PATH,
+        help="EPPO SQLite database (defaults to EPPO_SQLITE_PATH)",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--retrieval-only",
+        action="store_true",
+        help="Return ranked candidates without EPPO or LLM calls",
+    )
+    parser.add_argument(
+        "--no-compiled",
+        action="store_true",
+        help="Query SQLite instead of the in-memory compiled index",
+    )
+    parser.add_argument(
+        "--classes",
+        type=Path,
+        default=Config.CV_CLASSES_PATH,
+        help="CV class list to pre-normalize, one per line (defaults to CV_CLASSES_PATH)",
+    )
+    parser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        default=Config.FUZZY_TOKENS,
+        help="Correct misspelled label tokens against the EPPO vocabulary (or FUZZY_TOKENS=1)",
+    )
+    parser.add_argument(
+        "--coalesce",
+        action="store_true",
+        help="HTTP mode: serve on threads, merging identical in-flight labels and "
+        "batching retrieval (see Config.COALESCE_*)",
+    )
+    parser.add_argument(
+        "--compact-prompt",
+        action="store_true",
+        default=Config.GROQ_COMPACT_PROMPT,
+        help="Use the token-budgeted compact LLM prompt (or GROQ_COMPACT_PROMPT=1)",
+    )
+    args = parser.parse_args()
+    # Workers build their generators after the fork and read it from Config
+    Config.GROQ_COMPACT_PROMPT = args.compact_prompt
+
+    if not args.sqlite.exists():
+        print(f"❌ SQLite database not found at {args.sqlite}", file=sys.stderr)
+        sys.exit(1)
+
+    workers = worker_count(args.workers)
+    retriever = load_retriever(args.sqlite, compiled=not args.no_compiled)
+    vocabulary = load_vocabulary(args.classes)
+    if vocabulary is not None:
+        print(f"📚 {len(vocabulary)} CV classes pre-normalized", file=sys.stderr)
+    if args.fuzzy:
+        resolver = load_resolver(args.sqlite, index=retriever)
+        print(f"🔤 Fuzzy token resolver over {len(resolver)} tokens", file=sys.stderr)
+    print(
+        f"🌿 Serving {args.mode} with {workers} worker(s) "
+        f"({type(retriever).__name__})",
+        file=sys.stderr,
+    )
+
+    if args.mode == "http":
+        print(f"   Listening on http://{args.host}:{args.port}/diagnose", file=sys.stderr)
+        serve_http(
+            retriever,
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            retrieval_only=args.retrieval_only,
+            coalesce=args.coalesce,
+        )
+        return
+
+    for response in serve_lines(
+        sys.stdin, retriever, workers=workers, retrieval_only=args.retrieval_only
+    ):
+        sys.stdout.write(response + "\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,30 @@
 
 __version__ = "1.0.0"
 
-from .pipeline import diagnose, DiagnosisResult
+from .pipeline import (
+    adiagnose,
+    diagnose,
+    diagnose_batch,
+    diagnose_stream,
+    DiagnosisResult,
+)
+from .coalescing import CoalescingDiagnoser, QueueFullError
 from .normalization import normalize_cv_label, NormalizedLabel
+from .instrumentation import add_hook, remove_hook, LatencyStats
 from .config import Config
 
 __all__ = [
+    "adiagnose",
     "diagnose",
+    "diagnose_batch",
+    "diagnose_stream",
     "DiagnosisResult",
+    "CoalescingDiagnoser",
+    "QueueFullError",
     "normalize_cv_label",
     "NormalizedLabel",
+    "add_hook",
+    "remove_hook",
+    "LatencyStats",
     "Config",
 ]
\ No newline at end of file
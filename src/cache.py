@@ -0,0 +1,750 @@
+"""Storage backends for cached EPPO API responses."""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .config import Config
+
+# Entries are only refreshed in the LRU order once per this many seconds,
+# so hot keys do not turn every read into a write.
+_ACCESS_RESOLUTION = 60.0
+
+# Eviction trims the cache to this fraction of max_bytes.
+_EVICT_TARGET = 0.9
+
+
+class CacheEntry(NamedTuple):
+    """Cached response with the time it was stored."""
+
+    data: Any
+    stored_at: float
+
+
+class CacheBackend:
+    """Key-value store for EPPO responses keyed by (eppocode, endpoint).
+
+    Backends bump ``SCHEMA_VERSION`` when their on-disk format changes;
+    entries written under another version are discarded on open. With
+    ``max_bytes`` set, least recently used entries are evicted once the
+    cache grows past the limit and counted in ``evictions``.
+    """
+
+    SCHEMA_VERSION = 1
+    max_bytes: Optional[int] = None
+    evictions = 0
+
+    def get(self, eppocode: str, endpoint: str) -> Optional[CacheEntry]:
+        """Return the cached entry, or None if absent."""
+        raise NotImplementedError
+
+    def set(self, eppocode: str, endpoint: str, data: Any) -> Optional[float]:
+        """Store a response; return its ``stored_at``, or None if not stored."""
+        raise NotImplementedError
+
+    def delete(self, eppocode: str) -> int:
+        """Remove every cached endpoint of a code; return entries removed."""
+        raise NotImplementedError
+
+    def items(self) -> Iterator[Tuple[str, str, Any]]:
+        """Yield (eppocode, endpoint, data) for every entry."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any open resources."""
+
+
+class DirectoryCache(CacheBackend):
+    """One JSON file per endpoint: ``<root>/taxons/<code>/<endpoint>.json``.
+
+    File mtime is the entry's store time and atime its last use. A
+    ``VERSION`` file at the root records the schema version.
+    """
+
+    def __init__(self, root: Path, max_bytes: Optional[int] = None):
+        """Initialize directory cache.
+
+        Args:
+            root: Cache root directory
+            max_bytes: Size limit for cached files (defaults to Config.EPPO_CACHE_MAX_BYTES)
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes if max_bytes is not None else Config.EPPO_CACHE_MAX_BYTES
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self._check_version()
+
+    def _check_version(self):
+        """Discard the tree if it was written under another schema version."""
+        version_file = self.root / "VERSION"
+        try:
+            version = int(version_file.read_text().strip())
+        except (OSError, ValueError):
+            version = None
+
+        if version == self.SCHEMA_VERSION:
+            return
+        # Trees without a VERSION file predate versioning and use the
+        # version 1 layout, so they are kept.
+        if version is not None:
+            shutil.rmtree(self.root / "taxons", ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        version_file.write_text(str(self.SCHEMA_VERSION))
+
+    def _path(self, eppocode: str, endpoint: str) -> Path:
+        return self.root / "taxons" / eppocode / f"{endpoint}.json"
+
+    def _files(self) -> Iterator[Path]:
+        return (self.root / "taxons").glob("*/*.json")
+
+    def get(self, eppocode: str, endpoint: str) -> Optional[CacheEntry]:
+        cache_file = self._path(eppocode, endpoint)
+        try:
+            st = cache_file.stat()
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return None
+
+        now = time.time()
+        if self.max_bytes and now - st.st_atime > _ACCESS_RESOLUTION:
+            try:
+                os.utime(cache_file, (now, st.st_mtime))
+            except OSError:
+                pass
+        return CacheEntry(data, st.st_mtime)
+
+    def set(self, eppocode: str, endpoint: str, data: Any) -> Optional[float]:
+        cache_file = self._path(eppocode, endpoint)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            old_size = cache_file.stat().st_size if cache_file.exists() else 0
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            st = cache_file.stat()
+        except Exception:
+            return None
+        new_size = st.st_size
+
+        if self.max_bytes:
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = sum(p.stat().st_size for p in self._files())
+                else:
+                    self._total_bytes += new_size - old_size
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        return st.st_mtime
+
+    def _evict(self):
+        """Delete least recently used files down to the eviction target."""
+        files = []
+        for path in self._files():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_atime, st.st_size, path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * _EVICT_TARGET
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def delete(self, eppocode: str) -> int:
+        code_dir = self.root / "taxons" / eppocode
+        removed = 0
+        for cache_file in code_dir.glob("*.json"):
+            cache_file.unlink(missing_ok=True)
+            removed += 1
+        if code_dir.exists() and not any(code_dir.iterdir()):
+            code_dir.rmdir()
+        with self._lock:
+            self._total_bytes = None
+        return removed
+
+    def items(self) -> Iterator[Tuple[str, str, Any]]:
+        for cache_file in sorted(self._files()):
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            yield cache_file.parent.name, cache_file.stem, data
+
+
+def _encode(data: Any) -> bytes:
+    """Serialize a response as zlib-compressed compact JSON."""
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return zlib.compress(text.encode("utf-8"))
+
+
+def _decode(payload: bytes) -> Any:
+    """Inverse of ``_encode``."""
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+class SQLiteCache(CacheBackend):
+    """All cached responses in one indexed SQLite file.
+
+    Replaces hundreds of thousands of small files with a single B-tree
+    keyed on (eppocode, endpoint). Payloads are compressed compact JSON.
+    WAL mode lets several processes read while one writes. Safe to share
+    between threads.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path: Path, max_bytes: Optional[int] = None):
+        """Initialize SQLite cache.
+
+        Args:
+            path: Cache database file (created if missing)
+            max_bytes: Size limit for payloads (defaults to Config.EPPO_CACHE_MAX_BYTES)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else Config.EPPO_CACHE_MAX_BYTES
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._check_version()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _check_version(self):
+        """Create the schema, dropping entries from another schema version."""
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+        if row is None or row[0] != str(self.SCHEMA_VERSION):
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                (str(self.SCHEMA_VERSION),),
+            )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                eppocode TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (eppocode, endpoint)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+        )
+
+    def get(self, eppocode: str, endpoint: str) -> Optional[CacheEntry]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, stored_at, accessed_at FROM entries"
+                " WHERE eppocode = ? AND endpoint = ?",
+                (eppocode, endpoint),
+            ).fetchone()
+            if row is not None and now - row[2] > _ACCESS_RESOLUTION:
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ?"
+                    " WHERE eppocode = ? AND endpoint = ?",
+                    (now, eppocode, endpoint),
+                )
+        if row is None:
+            return None
+        try:
+            return CacheEntry(_decode(row[0]), row[1])
+        except (zlib.error, ValueError):
+            return None
+
+    def set(self, eppocode: str, endpoint: str, data: Any) -> Optional[float]:
+        return self.set_many([(eppocode, endpoint, data)])
+
+    def set_many(
+        self, entries: List[Tuple[str, str, Any]], stored_at: float = None
+    ) -> float:
+        """Store several responses in one transaction.
+
+        Args:
+            entries: (eppocode, endpoint, data) tuples
+            stored_at: Timestamp to record (defaults to now)
+
+        Returns:
+            The ``stored_at`` recorded
+        """
+        stored_at = time.time() if stored_at is None else stored_at
+        self._write_rows(
+            [(code, ep, _encode(data), stored_at) for code, ep, data in entries]
+        )
+        return stored_at
+
+    def _write_rows(self, rows: List[Tuple[str, str, bytes, float]]):
+        """Insert encoded (eppocode, endpoint, payload, stored_at) rows."""
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                for eppocode, endpoint, payload, stored_at in rows:
+                    old = conn.execute(
+                        "SELECT size FROM entries WHERE eppocode = ? AND endpoint = ?",
+                        (eppocode, endpoint),
+                    ).fetchone()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                        (eppocode, endpoint, payload, len(payload), stored_at, now),
+                    )
+                    self._total_bytes += len(payload) - (old[0] if old else 0)
+                if self.max_bytes and self._total_bytes > self.max_bytes:
+                    self._evict()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                self._total_bytes = conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()[0]
+                raise
+
+    def _evict(self):
+        """Delete least recently used entries down to the eviction target."""
+        target = self.max_bytes * _EVICT_TARGET
+        victims = []
+        cur = self._conn.execute(
+            "SELECT eppocode, endpoint, size FROM entries ORDER BY accessed_at"
+        )
+        for eppocode, endpoint, size in cur:
+            if self._total_bytes <= target:
+                break
+            victims.append((eppocode, endpoint))
+            self._total_bytes -= size
+        cur.close()
+        self._conn.executemany(
+            "DELETE FROM entries WHERE eppocode = ? AND endpoint = ?", victims
+        )
+        self.evictions += len(victims)
+
+    def delete(self, eppocode: str) -> int:
+        with self._lock:
+            freed = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE eppocode = ?",
+                (eppocode,),
+            ).fetchone()[0]
+            removed = self._conn.execute(
+                "DELETE FROM entries WHERE eppocode = ?", (eppocode,)
+            ).rowcount
+            self._total_bytes -= freed
+            return removed
+
+    def items(self) -> Iterator[Tuple[str, str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT eppocode, endpoint, payload FROM entries"
+                " ORDER BY eppocode, endpoint"
+            ).fetchall()
+        for eppocode, endpoint, payload in rows:
+            yield eppocode, endpoint, _decode(payload)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Flight:
+    """Result slot for one in-progress MemoryLRU computation."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _approx_size(value: Any) -> int:
+    """Length of a value as compact JSON.
+
+    Objects JSON cannot encode count their ``approx_size()`` if they have
+    one (such as DerivedFacts) and their ``str`` otherwise.
+    """
+    extra = 0
+
+    def default(obj: Any) -> Any:
+        nonlocal extra
+        if hasattr(obj, "approx_size"):
+            extra += obj.approx_size()
+            return None
+        return str(obj)
+
+    return len(json.dumps(value, separators=(",", ":"), default=default)) + extra
+
+
+class MemoryLRU:
+    """Bounded in-process LRU of parsed values with single-flight loading.
+
+    Sits in front of a CacheBackend so hot keys skip the disk read and JSON
+    parse. Bounded by entry count, by approximate size (compact JSON length)
+    or both. ``get_or_load`` runs the loader once per key even when many
+    threads miss at the same time; the others wait for its result. Safe to
+    share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        """Initialize memory LRU.
+
+        Args:
+            max_entries: Entry limit (defaults to Config.EPPO_MEMO_MAX_ENTRIES)
+            max_bytes: Size limit (defaults to Config.EPPO_MEMO_MAX_BYTES)
+            ttl: Seconds an entry stays valid (defaults to Config.EPPO_MEMO_TTL)
+        """
+        self.max_entries = (
+            max_entries if max_entries is not None else Config.EPPO_MEMO_MAX_ENTRIES
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else Config.EPPO_MEMO_MAX_BYTES
+        self.ttl = ttl if ttl is not None else Config.EPPO_MEMO_TTL
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._ainflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value); call with the lock held."""
+        item = self._entries.get(key)
+        if item is None:
+            return False, None
+        value, size, stored_at = item
+        if self.ttl is not None and time.time() - stored_at >= self.ttl:
+            del self._entries[key]
+            self._bytes -= size
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if absent or expired."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries if needed."""
+        size = _approx_size(value)
+        with self._lock:
+            self._store(key, value, size)
+
+    def _store(self, key: Hashable, value: Any, size: int):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size, time.time())
+        self._bytes += size
+        while self._entries and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, (_, old_size, _) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Any],
+        should_store: Callable[[Any], bool] = None,
+    ) -> Any:
+        """Return the cached value or load it, once per key across threads.
+
+        Args:
+            key: Cache key
+            load: Called without arguments to produce the value on a miss
+            should_store: Predicate deciding whether a loaded value is kept
+                (e.g. to skip failed fetches); stores everything if None
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = load()
+            if should_store is None or should_store(value):
+                self.set(key, value)
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    async def aget_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Any],
+        should_store: Callable[[Any], bool] = None,
+    ) -> Any:
+        """Async ``get_or_load``: ``load`` returns an awaitable.
+
+        Concurrent tasks on the same event loop share one load per key. The
+        load runs as its own task, so cancelling the caller that started it
+        does not cancel it for the others (or stop it warming the memo).
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            task = self._ainflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._aload(key, load, should_store))
+                # Retrieve the exception even if every caller was cancelled
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                self._ainflight[key] = task
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _aload(
+        self, key: Hashable, load: Callable[[], Any], should_store: Callable[[Any], bool]
+    ) -> Any:
+        """Run one shared ``aget_or_load`` load and store its result."""
+        try:
+            value = await load()
+            if should_store is None or should_store(value):
+                self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._ainflight[key]
+
+    def invalidate(self, key: Hashable):
+        """Drop one entry."""
+        with self._lock:
+            item = self._entries.pop(key, None)
+            if item is not None:
+                self._bytes -= item[1]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class ResponseCache:
+    """Persistent store of generated answers, keyed by everything the prompt depends on.
+
+    Entries are grouped by EPPO code, so ``invalidate`` drops every answer
+    built from a code's facts. Because the formatted facts are part of the
+    key, answers built from outdated facts are never served once the facts
+    change; they age out through the TTL or the size bound. Backed by a
+    SQLiteCache with the code in place of the taxon and the key hash in
+    place of the endpoint, opened on first use.
+    """
+
+    def __init__(
+        self,
+        path: Path = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """Initialize response cache.
+
+        Args:
+            path: SQLite file (defaults to Config.RESPONSE_CACHE_PATH)
+            ttl: Seconds an answer stays valid (defaults to Config.RESPONSE_CACHE_TTL)
+            max_bytes: Size limit (defaults to Config.RESPONSE_CACHE_MAX_BYTES)
+        """
+        self.ttl = ttl if ttl is not None else Config.RESPONSE_CACHE_TTL
+        self.path = Path(path or Config.RESPONSE_CACHE_PATH)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else Config.RESPONSE_CACHE_MAX_BYTES
+        )
+        self._store: Optional[SQLiteCache] = None
+        self._store_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @property
+    def store(self) -> SQLiteCache:
+        """The backing SQLiteCache, created (with its file) on first access."""
+        with self._store_lock:
+            if self._store is None:
+                self._store = SQLiteCache(self.path, max_bytes=self.max_bytes)
+            return self._store
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash the inputs that determine a completion into a cache key."""
+        text = json.dumps(parts, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, eppocode: str, key: str) -> Optional[str]:
+        """Return the cached answer, or None if absent or expired."""
+        entry = self.store.get(eppocode, key)
+        if entry is not None and (
+            self.ttl is None or time.time() - entry.stored_at < self.ttl
+        ):
+            self.hits += 1
+            return entry.data
+        if entry is not None:
+            self.expired += 1
+        self.misses += 1
+        return None
+
+    def set(self, eppocode: str, key: str, answer: str):
+        """Store a generated answer."""
+        self.store.set(eppocode, key, answer)
+
+    def invalidate(self, eppocode: str) -> int:
+        """Drop every answer generated from a code's facts; return the count."""
+        return self.store.delete(eppocode)
+
+    @property
+    def evictions(self) -> int:
+        return self._store.evictions if self._store is not None else 0
+
+    def close(self):
+        with self._store_lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+
+SQLITE_CACHE_FILENAME = "eppo_cache.sqlite"
+
+
+def open_cache(backend: str = None, cache_dir: Path = None) -> CacheBackend:
+    """Open the configured cache backend.
+
+    Args:
+        backend: ``"dir"`` or ``"sqlite"`` (defaults to Config.EPPO_CACHE_BACKEND)
+        cache_dir: Cache directory (defaults to Config.EPPO_CACHE_DIR)
+
+    Returns:
+        CacheBackend instance
+    """
+    backend = backend or Config.EPPO_CACHE_BACKEND
+    cache_dir = Path(cache_dir or Config.EPPO_CACHE_DIR)
+    if backend == "dir":
+        return DirectoryCache(cache_dir)
+    if backend == "sqlite":
+        return SQLiteCache(cache_dir / SQLITE_CACHE_FILENAME)
+    raise ValueError(f"Unknown EPPO cache backend: {backend!r}")
+
+
+def migrate_directory_cache(
+    source: Path, dest: SQLiteCache, batch_size: int = 1000
+) -> Dict[str, float]:
+    """Import a directory cache tree into a SQLite cache.
+
+    Each entry keeps its file's modification time as ``stored_at``.
+
+    Args:
+        source: Directory cache root (containing ``taxons/``)
+        dest: Destination SQLite cache
+        batch_size: Entries per transaction
+
+    Returns:
+        Dictionary with entries, skipped, bytes_in and seconds
+    """
+    start = time.perf_counter()
+    imported = skipped = bytes_in = 0
+    rows: List[Tuple[str, str, bytes, float]] = []
+
+    for cache_file in sorted((Path(source) / "taxons").glob("*/*.json")):
+        try:
+            raw = cache_file.read_bytes()
+            data = json.loads(raw)
+            mtime = cache_file.stat().st_mtime
+        except (OSError, ValueError):
+            skipped += 1
+            continue
+        bytes_in += len(raw)
+        rows.append((cache_file.parent.name, cache_file.stem, _encode(data), mtime))
+        if len(rows) >= batch_size:
+            dest._write_rows(rows)
+            imported += len(rows)
+            rows.clear()
+    if rows:
+        dest._write_rows(rows)
+        imported += len(rows)
+
+    return {
+        "entries": imported,
+        "skipped": skipped,
+        "bytes_in": bytes_in,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,392 @@
+"""Request coalescing and micro-batching in front of the diagnosis pipeline."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import Config
+from .eppo_client import EPPOClient
+from .fuzzy import correct_label
+from .generation import ResponseGenerator
+from .instrumentation import LatencyStats
+from .normalization import NormalizedLabel, normalize_cv_label
+from .pipeline import (
+    REFUSAL_NO_CANDIDATES,
+    DiagnosisResult,
+    _check_facts,
+    _fetch_and_check,
+    _low_confidence,
+)
+from .retrieval import Candidate, get_session, select_best
+
+
+class QueueFullError(RuntimeError):
+    """Raised by ``CoalescingDiagnoser.submit`` when too much work is pending."""
+
+
+@dataclass
+class _Pending:
+    """One distinct in-flight label, with a future per caller that asked for it."""
+
+    label: str
+    norm: NormalizedLabel
+    futures: List[Future] = field(default_factory=lambda: [Future()])
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class CoalescingDiagnoser:
+    """Thread-safe front end that merges concurrent ``diagnose`` calls.
+
+    Requests for the same label while one is in flight join it, so only
+    the first runs the pipeline. Distinct labels are queued; labels that
+    only normalize alike share the batch's EPPO fetch but get their own
+    answer. A dispatcher thread starts a batch once the first
+    queued request has waited ``window`` seconds, or once ``max_batch`` are
+    queued. Each batch runs one ``query_many`` for all its labels and
+    fetches each EPPO code once. Validation and generation then run on a
+    worker pool, one task per code. Fallback to runners-up
+    (``prefetch_k``) works as in ``diagnose``.
+
+    At most ``max_pending`` distinct requests may be queued or running.
+    Beyond that, ``submit`` waits up to ``timeout`` for room and then raises
+    QueueFullError. Callers that join an in-flight request add no work and
+    are always admitted.
+
+    Every caller gets its own DiagnosisResult. ``timings`` is not filled
+    in; use ``get_stats`` for queueing delay and batch timings. From
+    asyncio, await ``asyncio.wrap_future(submit(label))``.
+    """
+
+    def __init__(
+        self,
+        eppo_client: Optional[EPPOClient] = None,
+        generator: Optional[ResponseGenerator] = None,
+        retriever=None,
+        sqlite_path: Optional[Path] = None,
+        confidence_threshold: float = None,
+        prefetch_k: int = None,
+        window: float = None,
+        max_batch: int = None,
+        max_pending: int = None,
+        workers: int = None,
+    ):
+        """Start the dispatcher thread and worker pool.
+
+        Args:
+            eppo_client: EPPO client instance (creates new if None)
+            generator: Response generator instance (creates new if None)
+            retriever: Candidate index with ``query``/``query_many`` methods
+                (uses the shared session for sqlite_path if None)
+            sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+            confidence_threshold: Minimum confidence threshold (defaults to
+                Config.CONFIDENCE_THRESHOLD)
+            prefetch_k: Candidates fetched per label for fallback (defaults
+                to Config.PREFETCH_TOP_K; 1 disables)
+            window: Seconds a batch collects requests after its first one
+                (defaults to Config.COALESCE_WINDOW; 0 dispatches at once)
+            max_batch: Largest batch (defaults to Config.COALESCE_MAX_BATCH)
+            max_pending: Distinct requests queued or running before new ones
+                are rejected (defaults to Config.COALESCE_MAX_PENDING)
+            workers: Threads running batches, EPPO fetches and generation
+                (defaults to Config.COALESCE_WORKERS)
+        """
+        # Clients created here are closed by ``close``
+        self._owned = []
+        if eppo_client is None:
+            eppo_client = EPPOClient()
+            self._owned.append(eppo_client)
+        if generator is None:
+            generator = ResponseGenerator()
+            self._owned.append(generator)
+        self.eppo_client = eppo_client
+        self.generator = generator
+        self.retriever = retriever or get_session(
+            Path(sqlite_path or Config.SQLITE_PATH)
+        )
+        self.confidence_threshold = confidence_threshold or Config.CONFIDENCE_THRESHOLD
+        self.prefetch_k = prefetch_k or Config.PREFETCH_TOP_K
+        self.window = Config.COALESCE_WINDOW if window is None else window
+        self.max_batch = max_batch or Config.COALESCE_MAX_BATCH
+        self.max_pending = max_pending or Config.COALESCE_MAX_PENDING
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.batches = 0
+        self.dispatched = 0
+        self.fetches = 0
+        self.completed = 0
+        self.failed = 0
+        self.latency = LatencyStats()
+
+        self._inflight: Dict[str, _Pending] = {}
+        self._queue: Deque[_Pending] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or Config.COALESCE_WORKERS,
+            thread_name_prefix="coalesce",
+        )
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop, name="coalesce-dispatch", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(self, cv_label: str, timeout: float = 0.0) -> Future:
+        """Queue a label for diagnosis, or join an identical one in flight.
+
+        Args:
+            cv_label: Disease label from computer vision model
+            timeout: Seconds to wait for room when ``max_pending`` distinct
+                requests are pending (0 rejects at once, None waits)
+
+        Returns:
+            Future resolving to the DiagnosisResult
+
+        Raises:
+            QueueFullError: No room within ``timeout``
+            RuntimeError: The diagnoser is closed
+        """
+        norm = correct_label(normalize_cv_label(cv_label))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("CoalescingDiagnoser is closed")
+            self.submitted += 1
+            if not norm.tokens:
+                self.completed += 1
+                future: Future = Future()
+                future.set_result(
+                    DiagnosisResult(refused=True, message=REFUSAL_NO_CANDIDATES)
+                )
+                return future
+            while True:
+                pending = self._inflight.get(cv_label)
+                if pending is not None:
+                    self.coalesced += 1
+                    future = Future()
+                    pending.futures.append(future)
+                    return future
+                if len(self._inflight) < self.max_pending:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.rejected += 1
+                    raise QueueFullError(
+                        f"{len(self._inflight)} distinct requests pending "
+                        f"(max_pending={self.max_pending})"
+                    )
+                self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("CoalescingDiagnoser is closed")
+
+            pending = _Pending(label=cv_label, norm=norm)
+            self._inflight[cv_label] = pending
+            self._queue.append(pending)
+            self._cond.notify_all()
+            return pending.futures[0]
+
+    def diagnose(
+        self, cv_label: str, timeout: Optional[float] = None, queue_timeout: float = 0.0
+    ) -> DiagnosisResult:
+        """Diagnose a label through the coalescing queue and wait for it.
+
+        Args:
+            cv_label: Disease label from computer vision model
+            timeout: Seconds to wait for the result (None waits)
+            queue_timeout: Seconds to wait for room in the queue (see ``submit``)
+
+        Returns:
+            DiagnosisResult with diagnosis information
+
+        Raises:
+            QueueFullError: No room in the queue within ``queue_timeout``
+        """
+        return self.submit(cv_label, queue_timeout).result(timeout)
+
+    def _dispatch_loop(self):
+        """Cut batches from the queue and hand them to the worker pool."""
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                deadline = self._queue[0].enqueued + self.window
+                while len(self._queue) < self.max_batch and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                size = min(len(self._queue), self.max_batch)
+                batch = [self._queue.popleft() for _ in range(size)]
+                self.batches += 1
+                self.dispatched += size
+            self._executor.submit(self._run_batch, batch)
+
+    def _resolve(self, pending: _Pending, result: Optional[DiagnosisResult], error=None):
+        """Complete a request, a copy of the result per caller, and make room."""
+        with self._cond:
+            self._inflight.pop(pending.label, None)
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._cond.notify_all()
+        self.latency.record("total", time.perf_counter() - pending.enqueued)
+        # No caller joins once the request has left _inflight
+        for future in pending.futures:
+            if error is None:
+                future.set_result(replace(result))
+            else:
+                future.set_exception(error)
+
+    def _run_batch(self, batch: List[_Pending]):
+        """Retrieve candidates for a batch and start one task per EPPO code."""
+        start = time.perf_counter()
+        for pending in batch:
+            self.latency.record("queue", start - pending.enqueued)
+        # Requests resolved or handed to a code task; any error before then
+        # must still reach the rest, or their callers wait forever
+        handled = set()
+        try:
+            norms = [pending.norm for pending in batch]
+            if hasattr(self.retriever, "query_many"):
+                candidate_lists = self.retriever.query_many(norms)
+            else:
+                candidate_lists = [self.retriever.query(norm) for norm in norms]
+            self.latency.record("retrieve", time.perf_counter() - start)
+
+            by_code: Dict[str, List[Tuple[_Pending, List[Candidate], Candidate]]] = {}
+            for pending, candidates in zip(batch, candidate_lists):
+                best = select_best(candidates, self.confidence_threshold)
+                if best is None:
+                    result = _low_confidence(candidates)
+                    handled.add(id(pending))
+                    self._resolve(pending, result)
+                else:
+                    by_code.setdefault(best.eppocode, []).append(
+                        (pending, candidates, best)
+                    )
+            with self._cond:
+                self.fetches += len(by_code)
+            for code, group in by_code.items():
+                self._executor.submit(self._run_code, code, group)
+                handled.update(id(pending) for pending, _, _ in group)
+        except Exception as e:
+            for pending in batch:
+                if id(pending) not in handled:
+                    self._resolve(pending, None, e)
+
+    def _run_code(
+        self, code: str, group: List[Tuple[_Pending, List[Candidate], Candidate]]
+    ):
+        """Fetch one code's facts and finish every request whose best it is."""
+        try:
+            facts = self.eppo_client.fetch_facts(code)
+        except Exception as e:
+            for pending, _, _ in group:
+                self._resolve(pending, None, e)
+            return
+        # Generation is the slow step: run all but the last on other workers
+        for i, entry in enumerate(group):
+            if i < len(group) - 1:
+                self._executor.submit(self._finish, facts, *entry)
+            else:
+                self._finish(facts, *entry)
+
+    def _finish(
+        self,
+        facts: Dict[str, Any],
+        pending: _Pending,
+        candidates: List[Candidate],
+        best: Candidate,
+    ):
+        """Validate, fall back to runners-up if needed, and generate."""
+        try:
+            refusal = _check_facts(facts, pending.norm, best.eppocode)
+            if refusal is not None and self.prefetch_k > 1:
+                best, facts, refusal = _fetch_and_check(
+                    self.eppo_client,
+                    pending.norm,
+                    candidates,
+                    best,
+                    self.prefetch_k,
+                    self.confidence_threshold,
+                    facts=facts,
+                )
+            if refusal is not None:
+                self._resolve(pending, refusal)
+                return
+            answer = self.generator.generate(pending.label, facts)
+        except Exception as e:
+            self._resolve(pending, None, e)
+            return
+        self._resolve(
+            pending,
+            DiagnosisResult(
+                refused=False,
+                message=answer,
+                eppocode=best.eppocode,
+                confidence=best.score,
+            ),
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics.
+
+        Returns:
+            Dictionary with submitted, coalesced (joined an in-flight
+            request), rejected, batches, dispatched (distinct requests run),
+            fetches (EPPO codes fetched), completed, failed, pending (now
+            queued or running), coalesce_ratio (coalesced / submitted),
+            mean_batch_size, and latency percentiles in seconds for
+            ``queue`` (wait until the batch started), ``retrieve`` (per
+            batch) and ``total`` (per distinct request)
+        """
+        with self._cond:
+            stats = {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "dispatched": self.dispatched,
+                "fetches": self.fetches,
+                "completed": self.completed,
+                "failed": self.failed,
+                "pending": len(self._inflight),
+            }
+        stats["coalesce_ratio"] = (
+            stats["coalesced"] / stats["submitted"] if stats["submitted"] else 0.0
+        )
+        stats["mean_batch_size"] = (
+            stats["dispatched"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        stats["latency"] = self.latency.summary()
+        return stats
+
+    def close(self):
+        """Stop accepting requests, finish pending ones and stop the threads."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._dispatcher.join()
+        # Running tasks schedule follow-ups, so the pool stays open until
+        # every request has been resolved
+        with self._cond:
+            while self._inflight:
+                self._cond.wait()
+        self._executor.shutdown(wait=True)
+        for client in self._owned:
+            client.close()
+        self._owned = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
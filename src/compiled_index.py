@@ -0,0 +1,585 @@
+"""In-memory compiled name index with vectorized candidate scoring."""
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from .config import Config
+from .name_index import _iter_active_names
+from .normalization import NormalizedLabel
+from .retrieval import Candidate, _tokenize_name, index_path_for
+
+
+COMPILED_FORMAT_VERSION = 1
+_MAGIC = b"GRNAMEIX"
+_ALIGN = 64
+
+
+def compiled_path_for(sqlite_path: Path) -> Path:
+    """Return the compiled index file for a database.
+
+    Args:
+        sqlite_path: Path to EPPO SQLite database
+
+    Returns:
+        Config.COMPILED_INDEX_PATH if set, else ``<stem>.names.idx`` next to the database
+    """
+    if Config.COMPILED_INDEX_PATH is not None:
+        return Config.COMPILED_INDEX_PATH
+    return sqlite_path.with_name(f"{sqlite_path.stem}.names.idx")
+
+
+def source_fingerprint(sqlite_path: Path) -> Dict[str, Any]:
+    """Size, modification time and SHA-256 of the source database."""
+    st = os.stat(sqlite_path)
+    digest = hashlib.sha256()
+    with open(sqlite_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+def _source_matches(sqlite_path: Path, source: Dict[str, Any]) -> bool:
+    """Check a database against a stored fingerprint.
+
+    Size and mtime are compared first; the file is only hashed when they
+    differ (e.g. after a copy that kept the content).
+    """
+    st = os.stat(sqlite_path)
+    if st.st_size != source["size"]:
+        return False
+    if st.st_mtime_ns == source["mtime_ns"]:
+        return True
+    return source_fingerprint(sqlite_path)["sha256"] == source["sha256"]
+
+
+class _StringTable:
+    """Read-only list of strings stored as one UTF-8 blob plus offsets."""
+
+    def __init__(self, blob: "np.ndarray", offsets: "np.ndarray", empty_is_none=False):
+        self.blob = blob
+        self.offsets = offsets
+        self.empty_is_none = empty_is_none
+
+    @classmethod
+    def encode(cls, strings: List[Optional[str]]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return (blob, offsets) arrays for a list of strings."""
+        encoded = [(s or "").encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        value = self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+        return None if self.empty_is_none and not value else value
+
+
+class _SortedTokens:
+    """Token to id lookup over a sorted fixed-width byte array.
+
+    Ids are positions in sorted order, so lookups are a binary search
+    directly on the mapped file. Pinned tokens skip the search.
+    """
+
+    def __init__(self, tokens: "np.ndarray"):
+        self.tokens = tokens
+        self.width = tokens.dtype.itemsize
+        self._pinned: Dict[str, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def pin(self, tokens: Iterable[str]):
+        """Resolve tokens once and keep their ids (or absence) in a dict."""
+        pinned = dict(self._pinned)
+        for token in tokens:
+            pinned[token] = self._search(token)
+        self._pinned = pinned
+
+    def get(self, token: str) -> Optional[int]:
+        pinned = self._pinned
+        if token in pinned:
+            return pinned[token]
+        return self._search(token)
+
+    def _search(self, token: str) -> Optional[int]:
+        key = token.encode("utf-8")
+        if len(key) > self.width or not len(self.tokens):
+            return None
+        i = int(np.searchsorted(self.tokens, key))
+        if i < len(self.tokens) and self.tokens[i] == key:
+            return i
+        return None
+
+
+def _dtcode_bonus(dtcode: Optional[str]) -> float:
+    """Return the datatype bonus used by retrieval._score_candidate."""
+    if dtcode == Config.PREFERRED_DTCODE:
+        return Config.DTCODE_BONUS_PRIMARY
+    if dtcode in Config.SECONDARY_DTCODES:
+        return Config.DTCODE_BONUS_SECONDARY
+    return 0.0
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class CompiledNameIndex:
+    """Active EPPO names compiled into token postings for batch scoring.
+
+    Rows are distinct (eppocode, dtcode, fullname) triples. Each token maps
+    to a slice of ``post_rows`` (CSR layout), and a query only touches the
+    postings of its own tokens. Ranking matches ``query_candidates`` on the
+    token index exactly, including tie-breaks.
+    """
+
+    def __init__(
+        self,
+        token_ids: Dict[str, int],
+        post_ptr: "np.ndarray",
+        post_rows: "np.ndarray",
+        row_key: "np.ndarray",
+        row_name_len: "np.ndarray",
+        row_name_rank: "np.ndarray",
+        names: List[str],
+        key_eppocode: List[str],
+        key_dtcode: List[str],
+        key_rank: "np.ndarray",
+        key_dtbonus: "np.ndarray",
+    ):
+        """Initialize from compiled arrays (use the ``from_*`` constructors)."""
+        self.token_ids = token_ids
+        self.post_ptr = post_ptr
+        self.post_rows = post_rows
+        self.row_key = row_key
+        self.row_name_len = row_name_len
+        self.row_name_rank = row_name_rank
+        self.names = names
+        self.key_eppocode = key_eppocode
+        self.key_dtcode = key_dtcode
+        self.key_rank = key_rank
+        self.key_dtbonus = key_dtbonus
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Tuple[str, Optional[str], Optional[str]]]
+    ) -> "CompiledNameIndex":
+        """Compile an index from (eppocode, dtcode, fullname) rows.
+
+        Args:
+            rows: Active name rows
+
+        Returns:
+            CompiledNameIndex over the distinct rows
+        """
+        if not HAS_NUMPY:
+            raise ImportError("CompiledNameIndex requires numpy (pip install numpy)")
+
+        key_ids: Dict[Tuple[str, Optional[str]], int] = {}
+        token_ids: Dict[str, int] = {}
+        seen = set()
+        names: List[str] = []
+        row_key: List[int] = []
+        post_tokens: List[int] = []
+        post_rows: List[int] = []
+
+        for eppocode, dtcode, fullname in rows:
+            fullname = fullname or ""
+            if (eppocode, dtcode, fullname) in seen:
+                continue
+            seen.add((eppocode, dtcode, fullname))
+
+            row = len(names)
+            names.append(fullname)
+            row_key.append(key_ids.setdefault((eppocode, dtcode), len(key_ids)))
+            for token in _tokenize_name(fullname):
+                post_tokens.append(token_ids.setdefault(token, len(token_ids)))
+                post_rows.append(row)
+
+        tokens_arr = np.asarray(post_tokens, dtype=np.int32)
+        rows_arr = np.asarray(post_rows, dtype=np.int32)
+        order = np.lexsort((rows_arr, tokens_arr))
+        post_ptr = np.zeros(len(token_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tokens_arr, minlength=len(token_ids)), out=post_ptr[1:])
+
+        keys = list(key_ids)
+        key_rank = np.empty(len(keys), dtype=np.int32)
+        key_rank[
+            sorted(range(len(keys)), key=lambda k: (keys[k][0], keys[k][1] or ""))
+        ] = np.arange(len(keys), dtype=np.int32)
+        name_rank = np.empty(len(names), dtype=np.int32)
+        name_rank[sorted(range(len(names)), key=names.__getitem__)] = np.arange(
+            len(names), dtype=np.int32
+        )
+
+        return cls(
+            token_ids=token_ids,
+            post_ptr=post_ptr,
+            post_rows=rows_arr[order],
+            row_key=np.asarray(row_key, dtype=np.int32),
+            row_name_len=np.fromiter((len(n) for n in names), np.int32, len(names)),
+            row_name_rank=name_rank,
+            names=names,
+            key_eppocode=[k[0] for k in keys],
+            key_dtcode=[k[1] for k in keys],
+            key_rank=key_rank,
+            key_dtbonus=np.asarray([_dtcode_bonus(k[1]) for k in keys]),
+        )
+
+    @classmethod
+    def from_sqlite(cls, sqlite_path: Path) -> "CompiledNameIndex":
+        """Compile an index from an EPPO SQLite database.
+
+        Reads the token index next to the database when present, which
+        already holds only the active names.
+
+        Args:
+            sqlite_path: Path to EPPO SQLite database
+
+        Returns:
+            CompiledNameIndex over the active names
+        """
+        index_path = index_path_for(sqlite_path)
+        if not index_path.exists():
+            return cls.from_rows(
+                (eppocode, dtcode, fullname)
+                for _, _, eppocode, dtcode, fullname in _iter_active_names(
+                    sqlite_path
+                )
+            )
+
+        conn = sqlite3.connect(str(index_path))
+        try:
+            return cls.from_rows(
+                conn.execute(
+                    "SELECT eppocode, dtcode, fullname FROM names ORDER BY nameid"
+                )
+            )
+        finally:
+            conn.close()
+
+    @classmethod
+    def open(cls, sqlite_path: Path) -> "CompiledNameIndex":
+        """Map the compiled index file if it is current, else compile in memory.
+
+        Args:
+            sqlite_path: Path to EPPO SQLite database
+
+        Returns:
+            CompiledNameIndex
+        """
+        path = compiled_path_for(sqlite_path)
+        if path.exists():
+            try:
+                return cls.load(path, sqlite_path)
+            except ValueError:
+                pass
+        return cls.from_sqlite(sqlite_path)
+
+    def _sorted_tokens(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Return (sorted token array, post_ptr, post_rows) with ids in sorted order."""
+        if isinstance(self.token_ids, _SortedTokens):
+            return self.token_ids.tokens, self.post_ptr, self.post_rows
+
+        encoded = [t.encode("utf-8") for t in self.token_ids]
+        width = max((len(t) for t in encoded), default=1)
+        tokens = np.array(encoded, dtype=f"S{width}")
+        perm = np.argsort(tokens, kind="stable")
+
+        lengths = np.diff(self.post_ptr)[perm]
+        post_ptr = np.zeros(len(perm) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=post_ptr[1:])
+        gather = np.repeat(self.post_ptr[:-1][perm] - post_ptr[:-1], lengths)
+        gather += np.arange(post_ptr[-1], dtype=np.int64)
+        return tokens[perm], post_ptr, self.post_rows[gather]
+
+    def _arrays(self) -> Dict[str, "np.ndarray"]:
+        """Return the index as the flat arrays stored by ``save``."""
+        tokens, post_ptr, post_rows = self._sorted_tokens()
+        names_blob, names_off = _StringTable.encode(list(self.names))
+        code_blob, code_off = _StringTable.encode(list(self.key_eppocode))
+        dt_blob, dt_off = _StringTable.encode(list(self.key_dtcode))
+        return {
+            "tokens": tokens,
+            "post_ptr": post_ptr,
+            "post_rows": post_rows,
+            "row_key": self.row_key,
+            "row_name_len": self.row_name_len,
+            "row_name_rank": self.row_name_rank,
+            "names_blob": names_blob,
+            "names_off": names_off,
+            "code_blob": code_blob,
+            "code_off": code_off,
+            "dtcode_blob": dt_blob,
+            "dtcode_off": dt_off,
+            "key_rank": self.key_rank,
+            "key_dtbonus": self.key_dtbonus,
+        }
+
+    @classmethod
+    def _from_arrays(cls, arrays: Dict[str, "np.ndarray"]) -> "CompiledNameIndex":
+        """Build an index over the arrays of ``_arrays`` (or a mapped file)."""
+        return cls(
+            token_ids=_SortedTokens(arrays["tokens"]),
+            post_ptr=arrays["post_ptr"],
+            post_rows=arrays["post_rows"],
+            row_key=arrays["row_key"],
+            row_name_len=arrays["row_name_len"],
+            row_name_rank=arrays["row_name_rank"],
+            names=_StringTable(arrays["names_blob"], arrays["names_off"]),
+            key_eppocode=_StringTable(arrays["code_blob"], arrays["code_off"]),
+            key_dtcode=_StringTable(
+                arrays["dtcode_blob"], arrays["dtcode_off"], empty_is_none=True
+            ),
+            key_rank=arrays["key_rank"],
+            key_dtbonus=arrays["key_dtbonus"],
+        )
+
+    def packed(self) -> "CompiledNameIndex":
+        """Return this index in the mapped file's layout, held in memory.
+
+        Names, codes and tokens live in a few numpy buffers instead of
+        Python lists and dicts, so lookups write no reference counts into
+        them and forked workers keep sharing their pages. A mapped index
+        is returned as is.
+        """
+        if isinstance(self.token_ids, _SortedTokens):
+            return self
+        return self._from_arrays(self._arrays())
+
+    def save(self, path: Path, sqlite_path: Optional[Path] = None) -> Dict[str, Any]:
+        """Write the index as a memory-mappable binary file.
+
+        Layout: 8-byte magic, little-endian uint32 format version and header
+        length, a JSON header (array dtypes, shapes and offsets plus the
+        source database fingerprint), then each array 64-byte aligned.
+        Written to a temporary file and moved into place.
+
+        Args:
+            path: Output file
+            sqlite_path: Source database, fingerprinted so ``load`` can
+                reject the file once the database changes
+
+        Returns:
+            Dictionary with tokens, names, codes, bytes and seconds
+        """
+        start = time.perf_counter()
+        arrays = self._arrays()
+
+        header: Dict[str, Any] = {
+            "source": source_fingerprint(sqlite_path) if sqlite_path else None,
+            "arrays": {},
+        }
+        # Offsets depend on the header length, so size it with placeholders
+        # wide enough for any offset, then fill in the real values.
+        for name, arr in arrays.items():
+            header["arrays"][name] = {
+                "dtype": arr.dtype.str,
+                "shape": list(arr.shape),
+                "offset": 10**15,
+            }
+        header_len = len(json.dumps(header).encode("utf-8"))
+        offset = _align(len(_MAGIC) + 8 + header_len)
+        for name, arr in arrays.items():
+            header["arrays"][name]["offset"] = offset
+            offset = _align(offset + arr.nbytes)
+        header_bytes = json.dumps(header).encode("utf-8").ljust(header_len)
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(np.array([COMPILED_FORMAT_VERSION, header_len], dtype="<u4").tobytes())
+            f.write(header_bytes)
+            for name, arr in arrays.items():
+                f.seek(header["arrays"][name]["offset"])
+                f.write(np.ascontiguousarray(arr).tobytes())
+            f.truncate(offset)
+        os.replace(tmp_path, path)
+
+        return {
+            "tokens": len(arrays["tokens"]),
+            "names": len(self.names),
+            "codes": len(self.key_eppocode),
+            "bytes": offset,
+            "seconds": time.perf_counter() - start,
+        }
+
+    @classmethod
+    def load(cls, path: Path, sqlite_path: Optional[Path] = None) -> "CompiledNameIndex":
+        """Memory-map a file written by ``save``; nothing is copied.
+
+        Pages are read on demand and shared with every other process that
+        maps the same file.
+
+        Args:
+            path: Compiled index file
+            sqlite_path: Source database to check the file against
+
+        Returns:
+            CompiledNameIndex backed by the mapping
+
+        Raises:
+            ValueError: If the file is not a compiled index, has another
+                format version, or was built from a different database
+        """
+        if not HAS_NUMPY:
+            raise ImportError("CompiledNameIndex requires numpy (pip install numpy)")
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a compiled name index")
+        version, header_len = np.frombuffer(mapped, dtype="<u4", count=2, offset=len(_MAGIC))
+        if version != COMPILED_FORMAT_VERSION:
+            raise ValueError(
+                f"{path} has format version {version}, expected {COMPILED_FORMAT_VERSION}"
+            )
+        start = len(_MAGIC) + 8
+        header = json.loads(mapped[start:start + int(header_len)])
+
+        source = header.get("source")
+        if sqlite_path is not None and (
+            source is None or not _source_matches(sqlite_path, source)
+        ):
+            raise ValueError(f"{path} was built from a different {sqlite_path}")
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            arrays[name] = np.frombuffer(
+                mapped, dtype=dtype, count=count, offset=spec["offset"]
+            ).reshape(spec["shape"])
+
+        index = cls._from_arrays(arrays)
+        index._mapped = mapped
+        return index
+
+    def pin_tokens(self, tokens: Iterable[str]):
+        """Keep the ids of known query tokens (e.g. a CV class list) resolved.
+
+        Only matters for a mapped or packed index, whose token lookups are
+        a binary search; a compiled-in-memory index already uses a dict.
+        """
+        if isinstance(self.token_ids, _SortedTokens):
+            self.token_ids.pin(tokens)
+
+    def token_frequencies(self) -> Dict[str, int]:
+        """Number of distinct name rows containing each token."""
+        counts = np.diff(self.post_ptr).tolist()
+        if isinstance(self.token_ids, _SortedTokens):
+            return {
+                token.decode("utf-8"): count
+                for token, count in zip(self.token_ids.tokens.tolist(), counts)
+            }
+        return {token: counts[tid] for token, tid in self.token_ids.items()}
+
+    def _postings(self, tokens: Iterable[str]) -> "np.ndarray":
+        """Concatenate the posting rows of all known tokens."""
+        slices = []
+        for token in tokens:
+            tid = self.token_ids.get(token)
+            if tid is not None:
+                start, end = self.post_ptr[tid], self.post_ptr[tid + 1]
+                slices.append(self.post_rows[start:end])
+        if not slices:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate(slices)
+
+    def query(
+        self, norm: NormalizedLabel, max_candidates: int = None
+    ) -> List[Candidate]:
+        """Rank candidate EPPO codes for a normalized label.
+
+        Args:
+            norm: Normalized label
+            max_candidates: Maximum number of candidates to return
+
+        Returns:
+            List of Candidate objects sorted by score
+        """
+        if max_candidates is None:
+            max_candidates = Config.MAX_CANDIDATES
+
+        query_tokens = set(norm.tokens)
+        touched, overlap = np.unique(self._postings(query_tokens), return_counts=True)
+        if not len(touched):
+            return []
+
+        # Best name per (eppocode, dtcode): highest overlap, then longest,
+        # then smallest name, as in retrieval._rank_rows.
+        keys = self.row_key[touched]
+        order = np.lexsort(
+            (
+                self.row_name_rank[touched],
+                -self.row_name_len[touched],
+                -overlap,
+                keys,
+            )
+        )
+        sorted_keys = keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        best = order[first]
+        rows = touched[best]
+        keys = keys[best]
+        overlap = overlap[best]
+
+        host_match = np.isin(rows, self._postings(set(norm.host_candidates)))
+
+        location_tokens = set(norm.location_terms)
+        location_match = 0.0
+        if location_tokens:
+            loc_rows, loc_counts = np.unique(
+                self._postings(location_tokens), return_counts=True
+            )
+            location_hits = np.zeros(len(rows), dtype=np.int64)
+            if len(loc_rows):
+                pos = np.minimum(np.searchsorted(loc_rows, rows), len(loc_rows) - 1)
+                found = loc_rows[pos] == rows
+                location_hits[found] = loc_counts[pos[found]]
+            location_match = location_hits / len(location_tokens)
+
+        score = (
+            overlap / max(len(query_tokens), 1)
+            + np.where(host_match, Config.HOST_BONUS, 0.0)
+            + Config.LOCATION_BONUS_MULTIPLIER * location_match
+            + self.key_dtbonus[keys]
+        )
+        score = np.minimum(score, Config.MAX_SCORE_CAP)
+
+        ranked = np.lexsort((self.key_rank[keys], -score))[:max_candidates]
+        return [
+            Candidate(
+                eppocode=self.key_eppocode[keys[i]],
+                dtcode=self.key_dtcode[keys[i]],
+                fullname=self.names[rows[i]],
+                score=float(score[i]),
+                token_overlap=int(overlap[i]),
+                host_match=bool(host_match[i]),
+            )
+            for i in ranked
+        ]
+
+    def query_many(
+        self, norms: List[NormalizedLabel], max_candidates: int = None
+    ) -> List[List[Candidate]]:
+        """Rank candidates for several labels, in input order."""
+        return [self.query(norm, max_candidates) for norm in norms]
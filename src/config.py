@@ -11,6 +11,22 @@ class Config:
     # Paths
     SQLITE_PATH: Path = Path(os.environ.get("EPPO_SQLITE_PATH", "eppocodes_all.sqlite"))
     EPPO_CACHE_DIR: Path = Path(os.environ.get("EPPO_CACHE_DIR", ".eppo_cache"))
+    EPPO_CACHE_BACKEND: str = os.environ.get("EPPO_CACHE_BACKEND", "dir")
+    EPPO_CACHE_MAX_BYTES: Optional[int] = (
+        int(os.environ["EPPO_CACHE_MAX_BYTES"])
+        if os.environ.get("EPPO_CACHE_MAX_BYTES")
+        else None
+    )
+    NAME_INDEX_PATH: Optional[Path] = (
+        Path(os.environ["EPPO_NAME_INDEX_PATH"])
+        if os.environ.get("EPPO_NAME_INDEX_PATH")
+        else None
+    )
+    COMPILED_INDEX_PATH: Optional[Path] = (
+        Path(os.environ["EPPO_COMPILED_INDEX_PATH"])
+        if os.environ.get("EPPO_COMPILED_INDEX_PATH")
+        else None
+    )
 
     # API Keys
     EPPO_API_KEY: str = os.environ.get("EPPO_API_KEY", "")
@@ -18,20 +34,97 @@ class Config:
 
     # EPPO API Configuration
     EPPO_BASE_URL: str = "https://api.eppo.int/gd/v2"
-    EPPO_RATE_LIMIT_DELAY: float = 0.2
+    # EPPO allows 60 requests per 10 s window: burst + 10 s of refill <= 60
+    EPPO_RATE_PER_SECOND: float = 5.0
+    EPPO_RATE_BURST: int = 10
+    EPPO_RATE_LIMIT_FILE: Optional[Path] = (
+        Path(os.environ["EPPO_RATE_LIMIT_FILE"])
+        if os.environ.get("EPPO_RATE_LIMIT_FILE")
+        else None
+    )
     EPPO_MAX_RETRIES: int = 3
+    EPPO_POOL_SIZE: int = 10
+    ASYNC_MAX_CONCURRENCY: int = 8
+
+    # EPPO Cache Freshness (seconds; None = never expires)
+    EPPO_CACHE_TTL = {
+        "overview": 30 * 24 * 3600,
+        "names": 30 * 24 * 3600,
+        "hosts": 7 * 24 * 3600,
+    }
+    EPPO_CACHE_TTL_DEFAULT: Optional[float] = 7 * 24 * 3600
+    EPPO_CACHE_STALE_WHILE_REVALIDATE: bool = False
+
+    # In-process memo of parsed facts, in front of the disk cache
+    EPPO_MEMO_MAX_ENTRIES: int = 1024
+    EPPO_MEMO_MAX_BYTES: Optional[int] = 64 * 1024 * 1024
+    EPPO_MEMO_TTL: Optional[float] = 3600
 
     # Retrieval Configuration
     CONFIDENCE_THRESHOLD: float = 0.3
     MAX_CANDIDATES: int = 50
+    SQLITE_POOL_SIZE: int = 4
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    # Speculative fetch of runner-up candidates (1 = best only)
+    PREFETCH_TOP_K: int = 1
+    PREFETCH_SCORE_MARGIN: float = 0.2
+    PREFETCH_WORKERS: int = 4
+    # Request coalescing front end (coalescing.py): requests arriving within
+    # the window of a batch's first one are retrieved together
+    COALESCE_WINDOW: float = 0.005
+    COALESCE_MAX_BATCH: int = 64
+    # Distinct requests queued or running before new ones are rejected
+    COALESCE_MAX_PENDING: int = 256
+    COALESCE_WORKERS: int = 8
 
     # Groq LLM Configuration
     GROQ_MODEL: str = "openai/gpt-oss-120b"
     GROQ_MAX_TOKENS: int = 1024
     GROQ_TEMPERATURE: float = 0.3
+    # Compact prompt mode: condensed instructions, facts trimmed to a token
+    # budget and max_completion_tokens sized to the requested answer length
+    GROQ_COMPACT_PROMPT: bool = os.environ.get("GROQ_COMPACT_PROMPT", "0") == "1"
+    GROQ_FACTS_TOKEN_BUDGET: int = 120
+    # Answer length: a floor plus words per token of facts sent, up to a cap
+    GROQ_COMPACT_ANSWER_WORDS: int = 250
+    GROQ_COMPACT_MIN_ANSWER_WORDS: int = 120
+    GROQ_COMPACT_WORDS_PER_FACT_TOKEN: float = 1.0
+    # Completion tokens reserved for the hidden reasoning of reasoning models
+    GROQ_REASONING_TOKENS: int = 256
+    # Per-call token usage records kept by each generator
+    GROQ_USAGE_WINDOW: int = 1000
+
+    # Generated Response Cache
+    RESPONSE_CACHE_ENABLED: bool = os.environ.get("GROQ_RESPONSE_CACHE", "1") != "0"
+    RESPONSE_CACHE_PATH: Path = (
+        Path(os.environ["GROQ_RESPONSE_CACHE_PATH"])
+        if os.environ.get("GROQ_RESPONSE_CACHE_PATH")
+        else EPPO_CACHE_DIR / "responses.sqlite"
+    )
+    RESPONSE_CACHE_TTL: Optional[float] = 30 * 24 * 3600
+    RESPONSE_CACHE_MAX_BYTES: Optional[int] = 256 * 1024 * 1024
+
+    # Instrumentation
+    PIPELINE_TIMINGS: bool = os.environ.get("PIPELINE_TIMINGS", "0") == "1"
+    LATENCY_WINDOW: int = 10000
 
     # Normalization
     MIN_TOKEN_LEN: int = 2
+    NORMALIZE_CACHE_SIZE: int = 4096
+    # CV class list (one label per line) pre-normalized at startup
+    CV_CLASSES_PATH: Optional[Path] = (
+        Path(os.environ["CV_CLASSES_PATH"])
+        if os.environ.get("CV_CLASSES_PATH")
+        else None
+    )
+    # Seconds between checks of the class list file for changes while serving
+    CV_CLASSES_RELOAD_INTERVAL: float = 5.0
+    # Typo-tolerant token resolution (SymSpell deletion index)
+    FUZZY_TOKENS: bool = os.environ.get("FUZZY_TOKENS", "0") == "1"
+    FUZZY_MAX_EDIT_DISTANCE: int = 2
+    FUZZY_PREFIX_LENGTH: int = 7
+    FUZZY_MIN_TOKEN_LEN: int = 4
+    FUZZY_CACHE_SIZE: int = 4096
     GENERIC_TERMS = frozenset({
         "of", "the", "and", "on", "in", "plant", "plants", "crop", "crops",
     })
@@ -1,13 +1,36 @@
 """EPPO API client for fetching plant disease data."""
 
-import json
+import asyncio
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from .cache import CacheBackend, CacheEntry, MemoryLRU, open_cache
 from .config import Config
+from .facts import (
+    DERIVED_ENDPOINT,
+    SOURCE_ENDPOINTS,
+    DerivedFacts,
+    content_hash,
+    derive_facts,
+)
+from .rate_limit import (
+    RateLimiter,
+    backoff_delay,
+    default_rate_limiter,
+    parse_retry_after,
+)
+
+
+def _facts_complete(facts: Dict[str, Any]) -> bool:
+    """Only memoize facts whose overview was fetched; failures are retried."""
+    return facts.get("overview") is not None
 
 
 class EPPOClient:
@@ -19,6 +42,10 @@ class EPPOClient:
         base_url: str = None,
         cache_dir: Path = None,
         use_cache: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[CacheBackend] = None,
+        stale_while_revalidate: bool = None,
+        memo: Optional[MemoryLRU] = None,
     ):
         """Initialize EPPO client.
 
@@ -27,44 +54,150 @@ class EPPOClient:
             base_url: Base URL for API (defaults to Config.EPPO_BASE_URL)
             cache_dir: Directory for caching responses (defaults to Config.EPPO_CACHE_DIR)
             use_cache: Whether to use caching
+            rate_limiter: Token bucket for API requests (defaults to the
+                process-wide limiter shared by all clients)
+            cache: Cache backend (defaults to Config.EPPO_CACHE_BACKEND in cache_dir)
+            stale_while_revalidate: Serve expired entries while refreshing
+                them in the background (defaults to
+                Config.EPPO_CACHE_STALE_WHILE_REVALIDATE)
+            memo: In-memory LRU of assembled facts in front of the cache
+                (defaults to one sized by Config.EPPO_MEMO_* when caching)
         """
         self.api_key = api_key or Config.EPPO_API_KEY
         self.base_url = base_url or Config.EPPO_BASE_URL
         self.cache_dir = cache_dir or Config.EPPO_CACHE_DIR
         self.use_cache = use_cache
+        if cache is None and use_cache:
+            cache = open_cache(cache_dir=self.cache_dir)
+        self.cache = cache
+        if memo is None and use_cache:
+            memo = MemoryLRU()
+        self.memo = memo
+        self.stale_while_revalidate = (
+            Config.EPPO_CACHE_STALE_WHILE_REVALIDATE
+            if stale_while_revalidate is None
+            else stale_while_revalidate
+        )
+        self.rate_limiter = rate_limiter or default_rate_limiter()
+        self.session = self._make_session()
 
         self.cache_hits = 0
         self.cache_misses = 0
         self.api_calls = 0
+        self.throttled = 0
+        self.expired = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.derived_computed = 0
+        self.derived_loaded = 0
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_threads: Set[threading.Thread] = set()
+        self._closed = False
+
+    def _make_session(self) -> Optional[requests.Session]:
+        """Create the keep-alive HTTP session used for API requests.
+
+        urllib3 retries connection and read failures on the pooled
+        connection; HTTP status retries stay in ``_get_endpoint`` so they
+        go through the rate limiter.
+        """
+        retry = Retry(
+            total=Config.EPPO_MAX_RETRIES,
+            connect=Config.EPPO_MAX_RETRIES,
+            read=Config.EPPO_MAX_RETRIES,
+            status=0,
+            other=0,
+            backoff_factor=0.25,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=Config.EPPO_POOL_SIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self._headers())
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        return session
+
+    def close(self):
+        """Wait for background refreshes, then close connections and the cache."""
+        with self._refresh_lock:
+            self._closed = True
+            threads = list(self._refresh_threads)
+        for thread in threads:
+            thread.join()
+        if self.session is not None:
+            self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self) -> "EPPOClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-    def _load_cached(self, eppocode: str, endpoint: str) -> Optional[Dict[str, Any]]:
-        """Load cached response from disk."""
+    def _load_cached(self, eppocode: str, endpoint: str) -> Optional[CacheEntry]:
+        """Load cached entry from the cache backend."""
         if not self.use_cache:
             return None
+        return self.cache.get(eppocode, endpoint)
 
-        cache_file = self.cache_dir / "taxons" / eppocode / f"{endpoint}.json"
-        if not cache_file.exists():
+    def _save_cached(self, eppocode: str, endpoint: str, data: Any) -> Optional[float]:
+        """Save response to the cache backend; return its ``stored_at``."""
+        if not self.use_cache:
             return None
+        return self.cache.set(eppocode, endpoint, data)
 
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return None
+    def _is_fresh(self, endpoint: str, entry: CacheEntry) -> bool:
+        """Check a cached entry against the endpoint's TTL."""
+        ttl = Config.EPPO_CACHE_TTL.get(endpoint, Config.EPPO_CACHE_TTL_DEFAULT)
+        return ttl is None or time.time() - entry.stored_at < ttl
 
-    def _save_cached(self, eppocode: str, endpoint: str, data: Any):
-        """Save response to cache."""
-        if not self.use_cache:
+    def _claim_refresh(self, eppocode: str, endpoint: str) -> bool:
+        """Mark a key as being refreshed; False if already running or closed."""
+        with self._refresh_lock:
+            if self._closed or (eppocode, endpoint) in self._refreshing:
+                return False
+            self._refreshing.add((eppocode, endpoint))
+            self.refreshes += 1
+            return True
+
+    def _release_refresh(self, eppocode: str, endpoint: str):
+        """Clear the in-flight refresh mark for a key."""
+        with self._refresh_lock:
+            self._refreshing.discard((eppocode, endpoint))
+
+    def _refresh_in_background(self, eppocode: str, endpoint: str):
+        """Re-fetch a stale entry on a daemon thread."""
+        if not self._claim_refresh(eppocode, endpoint):
             return
 
-        cache_file = self.cache_dir / "taxons" / eppocode / f"{endpoint}.json"
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        def refresh():
+            try:
+                self._fetch(eppocode, endpoint, Config.EPPO_MAX_RETRIES)
+            finally:
+                self._release_refresh(eppocode, endpoint)
+                with self._refresh_lock:
+                    self._refresh_threads.discard(thread)
+
+        thread = threading.Thread(target=refresh, daemon=True)
+        with self._refresh_lock:
+            self._refresh_threads.add(thread)
+        thread.start()
+
+    def _endpoint_url(self, eppocode: str, endpoint: str) -> str:
+        """Build the API URL for a taxon endpoint."""
+        return f"{self.base_url.rstrip('/')}/taxons/taxon/{eppocode}/{endpoint}"
 
-        try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(data, f)
-        except Exception:
-            pass
+    def _headers(self) -> Dict[str, str]:
+        """Build request headers."""
+        return {"X-Api-Key": self.api_key} if self.api_key else {}
 
     def _get_endpoint(
         self, eppocode: str, endpoint: str, max_retries: int = None
@@ -79,57 +212,207 @@ class EPPOClient:
         Returns:
             JSON response data or None on failure
         """
+        return self._get_entry(eppocode, endpoint, max_retries)[0]
+
+    def _get_entry(
+        self, eppocode: str, endpoint: str, max_retries: int = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """``_get_endpoint`` that also returns the data's cache ``stored_at``.
+
+        Returns:
+            Tuple of (data or None, ``stored_at`` of the cache entry the
+            data was read from or saved as, or None if it is not cached)
+        """
         if max_retries is None:
             max_retries = Config.EPPO_MAX_RETRIES
 
         # Check cache first
-        cached = self._load_cached(eppocode, endpoint)
-        if cached is not None:
-            self.cache_hits += 1
-            return cached
+        entry = self._load_cached(eppocode, endpoint)
+        if entry is not None:
+            if self._is_fresh(endpoint, entry):
+                self.cache_hits += 1
+                return entry
+            self.expired += 1
+            if self.stale_while_revalidate:
+                self.stale_hits += 1
+                self._refresh_in_background(eppocode, endpoint)
+                return entry
+
+        data, stored_at = self._fetch(eppocode, endpoint, max_retries)
+        if data is None and entry is not None:
+            # Serve the stale copy rather than nothing when the API fails
+            self.stale_hits += 1
+            return entry
+        return data, stored_at
 
-        # Make API request
-        url = f"{self.base_url.rstrip('/')}/taxons/taxon/{eppocode}/{endpoint}"
-        headers = {"X-Api-Key": self.api_key} if self.api_key else {}
+    def _fetch(
+        self, eppocode: str, endpoint: str, max_retries: int
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Request an endpoint from the API and cache the response.
+
+        Returns:
+            Tuple of (data or None, ``stored_at`` of the saved cache entry)
+        """
+        url = self._endpoint_url(eppocode, endpoint)
 
+        self.cache_misses += 1
         for attempt in range(max_retries):
+            self.rate_limiter.acquire()
+            self.api_calls += 1
             try:
-                self.cache_misses += 1
-                self.api_calls += 1
-                time.sleep(Config.EPPO_RATE_LIMIT_DELAY)
+                resp = self.session.get(url, timeout=30)
+            except requests.RequestException:
+                # Connection-level retries already happened in the adapter
+                return None, None
 
-                resp = requests.get(url, headers=headers, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
+            if resp.ok:
+                try:
+                    data = resp.json()
+                except ValueError:
+                    return None, None
 
                 # Cache successful response
-                if data is not None:
-                    self._save_cached(eppocode, endpoint, data)
+                if data is None:
+                    return None, None
+                return data, self._save_cached(eppocode, endpoint, data)
 
-                return data
+            delay = self._retry_delay(resp, attempt)
+            if delay is None or attempt == max_retries - 1:
+                return None, None
+            time.sleep(delay)
 
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    # Exponential backoff
-                    time.sleep(0.5 * (2**attempt))
-                    continue
-                return None
+        return None, None
 
-        return None
+    def _retry_delay(self, resp: Any, attempt: int) -> Optional[float]:
+        """Decide whether and how long to wait before retrying a request.
+
+        429 and 5xx responses are retried with jittered exponential
+        backoff, or after ``Retry-After`` when the server sends one. A 429
+        also holds back the shared rate limiter. Other errors are not
+        retried.
+
+        Args:
+            resp: Failed response
+            attempt: Zero-based attempt number
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        status = resp.status_code
+        if status != 429 and status < 500:
+            return None
+
+        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        delay = retry_after if retry_after is not None else backoff_delay(attempt)
+        if status == 429:
+            self.throttled += 1
+            self.rate_limiter.block_for(delay)
+        return delay
 
     def fetch_facts(self, eppocode: str) -> Dict[str, Any]:
         """Fetch all relevant facts for an EPPO code.
 
+        Served from the in-memory memo when possible. Concurrent callers
+        asking for the same uncached code share a single fetch. The
+        returned dictionary may be shared; do not modify it.
+
         Args:
             eppocode: EPPO code to fetch
 
         Returns:
             Dictionary with overview, names, and hosts data
         """
-        overview = self._get_endpoint(eppocode, "overview")
-        names = self._get_endpoint(eppocode, "names")
-        hosts = self._get_endpoint(eppocode, "hosts")
+        if self.memo is None:
+            return self._fetch_facts(eppocode)
+        return self.memo.get_or_load(
+            eppocode, lambda: self._fetch_facts(eppocode), _facts_complete
+        )
+
+    def invalidate(self, eppocodes: Iterable[str]) -> int:
+        """Forget cached facts for codes, in the memo and on disk.
+
+        Args:
+            eppocodes: Codes whose facts changed (e.g. in a new release)
+
+        Returns:
+            Number of disk cache entries removed
+        """
+        removed = 0
+        for eppocode in eppocodes:
+            if self.memo is not None:
+                self.memo.invalidate(eppocode)
+            if self.cache is not None:
+                removed += self.cache.delete(eppocode)
+        return removed
+
+    def _fetch_facts(self, eppocode: str) -> Dict[str, Any]:
+        """Fetch facts through the disk cache and API, bypassing the memo."""
+        entries = [self._get_entry(eppocode, ep) for ep in SOURCE_ENDPOINTS]
+        return self._attach_derived(eppocode, *self._assemble_entries(entries))
+
+    @classmethod
+    def _assemble_entries(
+        cls, entries: Sequence[Tuple[Any, Optional[float]]]
+    ) -> Tuple[Dict[str, Any], Optional[List[float]]]:
+        """Assemble ``_get_entry`` results for SOURCE_ENDPOINTS.
+
+        Returns:
+            Tuple of (facts, ``stored_at`` of the entries the facts came
+            from, or None if any of them is not cached)
+        """
+        facts = cls._assemble_facts(*(data for data, _ in entries))
+        stamps = [stored_at for _, stored_at in entries]
+        return facts, None if None in stamps else stamps
+
+    def _attach_derived(
+        self, eppocode: str, facts: Dict[str, Any], sources: Optional[List[float]]
+    ) -> Dict[str, Any]:
+        """Attach DerivedFacts to freshly assembled facts as ``facts["derived"]``.
+
+        The artifacts are stored in the cache next to the endpoints, tagged
+        with the ``stored_at`` of the entries they were derived from and a
+        hash of the facts. They are reused while those entries are
+        unchanged; once an entry is rewritten, the facts are hashed and
+        artifacts of identical content are reused and re-tagged. Facts
+        that are not fully cached get artifacts derived from the data at
+        hand, not stored.
+
+        Args:
+            eppocode: EPPO code
+            facts: Result of ``_assemble_facts``
+            sources: ``stored_at`` of the entries ``facts`` came from, or
+                None if any of them is not cached
+
+        Returns:
+            ``facts``
+        """
+        if not _facts_complete(facts):
+            return facts
+        derived = facts_hash = None
+        restamp = False
+        if sources is not None:
+            entry = self._load_cached(eppocode, DERIVED_ENDPOINT)
+            if entry is not None:
+                derived = DerivedFacts.from_json(entry.data, sources)
+                if derived is None:
+                    # An entry was rewritten; a refetch may have changed nothing
+                    facts_hash = content_hash(facts)
+                    derived = DerivedFacts.from_json(entry.data, sources, facts_hash)
+                    restamp = derived is not None
+        if derived is not None:
+            self.derived_loaded += 1
+        else:
+            derived = derive_facts(facts, facts_hash)
+            self.derived_computed += 1
+            restamp = sources is not None
+        if restamp:
+            self._save_cached(eppocode, DERIVED_ENDPOINT, derived.to_json(sources))
+        facts["derived"] = derived
+        return facts
 
+    @staticmethod
+    def _assemble_facts(overview: Any, names: Any, hosts: Any) -> Dict[str, Any]:
+        """Combine endpoint responses into a facts dictionary."""
         return {
             "overview": overview,
             "names": names if isinstance(names, list) else [],
@@ -140,10 +423,252 @@ class EPPOClient:
         """Get client statistics.
 
         Returns:
-            Dictionary with cache_hits, cache_misses, and api_calls
+            Dictionary with memory_hits (fetch_facts calls answered by the
+            memo) and memo_coalesced (calls that waited on another caller's
+            fetch); cache_hits (disk) and cache_misses (API fetches), one
+            per endpoint lookup; api_calls (one per HTTP request, including
+            retries); throttled (HTTP 429 responses); expired (entries past
+            their TTL); stale_hits (expired entries served); refreshes
+            (background revalidations started); evictions (entries
+            removed by the cache size limit); derived_computed and
+            derived_loaded (facts post-processed vs. artifacts reused
+            from the cache)
         """
+        memo = self.memo
         return {
+            "memory_hits": memo.hits if memo is not None else 0,
+            "memo_coalesced": memo.coalesced if memo is not None else 0,
             "cache_hits": self.cache_hits,
             "cache_misses": self.cache_misses,
             "api_calls": self.api_calls,
-        }
\ No newline at end of file
+            "throttled": self.throttled,
+            "expired": self.expired,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "evictions": self.cache.evictions if self.cache is not None else 0,
+            "derived_computed": self.derived_computed,
+            "derived_loaded": self.derived_loaded,
+        }
+
+
+class AsyncEPPOClient(EPPOClient):
+    """Async EPPO client with pooled HTTP connections.
+
+    Shares the disk cache and statistics of EPPOClient. ``fetch_facts``
+    requests overview, names and hosts concurrently, so a cache miss costs
+    one round trip instead of three. Disk cache reads and writes run on
+    worker threads so they do not stall the event loop.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        cache_dir: Path = None,
+        use_cache: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[CacheBackend] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        stale_while_revalidate: bool = None,
+        memo: Optional[MemoryLRU] = None,
+    ):
+        """Initialize async EPPO client.
+
+        Args:
+            api_key: EPPO API key (defaults to Config.EPPO_API_KEY)
+            base_url: Base URL for API (defaults to Config.EPPO_BASE_URL)
+            cache_dir: Directory for caching responses (defaults to Config.EPPO_CACHE_DIR)
+            use_cache: Whether to use caching
+            rate_limiter: Token bucket for API requests (defaults to the
+                process-wide limiter shared by all clients)
+            cache: Cache backend (defaults to Config.EPPO_CACHE_BACKEND in cache_dir)
+            semaphore: Limits concurrent requests (defaults to
+                Config.ASYNC_MAX_CONCURRENCY); share it with
+                AsyncResponseGenerator to bound all outbound calls together
+            stale_while_revalidate: Serve expired entries while refreshing
+                them in the background (defaults to
+                Config.EPPO_CACHE_STALE_WHILE_REVALIDATE)
+            memo: In-memory LRU of assembled facts in front of the cache
+                (defaults to one sized by Config.EPPO_MEMO_* when caching)
+        """
+        super().__init__(
+            api_key=api_key,
+            base_url=base_url,
+            cache_dir=cache_dir,
+            use_cache=use_cache,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            stale_while_revalidate=stale_while_revalidate,
+            memo=memo,
+        )
+        self._refresh_tasks = set()
+        self.semaphore = semaphore or asyncio.Semaphore(Config.ASYNC_MAX_CONCURRENCY)
+        self.http = httpx.AsyncClient(
+            timeout=30,
+            headers={**self._headers(), "Accept-Encoding": "gzip, deflate"},
+            transport=httpx.AsyncHTTPTransport(
+                retries=Config.EPPO_MAX_RETRIES,
+                limits=httpx.Limits(max_connections=Config.ASYNC_MAX_CONCURRENCY),
+            ),
+        )
+
+    def _make_session(self) -> Optional[requests.Session]:
+        """Async requests go through ``self.http`` instead."""
+        return None
+
+    async def _aload_cached(self, eppocode: str, endpoint: str) -> Optional[CacheEntry]:
+        """``_load_cached`` on a worker thread, off the event loop."""
+        if not self.use_cache:
+            return None
+        return await asyncio.to_thread(self.cache.get, eppocode, endpoint)
+
+    async def _asave_cached(
+        self, eppocode: str, endpoint: str, data: Any
+    ) -> Optional[float]:
+        """``_save_cached`` on a worker thread, off the event loop."""
+        if not self.use_cache:
+            return None
+        return await asyncio.to_thread(self.cache.set, eppocode, endpoint, data)
+
+    async def _get_endpoint(
+        self, eppocode: str, endpoint: str, max_retries: int = None
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch data from EPPO API endpoint with retries.
+
+        Args:
+            eppocode: EPPO code to fetch
+            endpoint: API endpoint (e.g., 'overview', 'names', 'hosts')
+            max_retries: Maximum retry attempts
+
+        Returns:
+            JSON response data or None on failure
+        """
+        return (await self._get_entry(eppocode, endpoint, max_retries))[0]
+
+    async def _get_entry(
+        self, eppocode: str, endpoint: str, max_retries: int = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """``_get_endpoint`` that also returns the data's cache ``stored_at``."""
+        if max_retries is None:
+            max_retries = Config.EPPO_MAX_RETRIES
+
+        entry = await self._aload_cached(eppocode, endpoint)
+        if entry is not None:
+            if self._is_fresh(endpoint, entry):
+                self.cache_hits += 1
+                return entry
+            self.expired += 1
+            if self.stale_while_revalidate:
+                self.stale_hits += 1
+                self._refresh_in_background(eppocode, endpoint)
+                return entry
+
+        data, stored_at = await self._fetch(eppocode, endpoint, max_retries)
+        if data is None and entry is not None:
+            self.stale_hits += 1
+            return entry
+        return data, stored_at
+
+    def _refresh_in_background(self, eppocode: str, endpoint: str):
+        """Re-fetch a stale entry in a task on the running event loop."""
+        if not self._claim_refresh(eppocode, endpoint):
+            return
+
+        async def refresh():
+            try:
+                await self._fetch(eppocode, endpoint, Config.EPPO_MAX_RETRIES)
+            finally:
+                self._release_refresh(eppocode, endpoint)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _fetch(
+        self, eppocode: str, endpoint: str, max_retries: int
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Request an endpoint from the API and cache the response.
+
+        The transport only retries failed connects, so read errors and
+        timeouts are retried here with backoff, matching the urllib3
+        policy of the sync client; 429 and 5xx go through ``_retry_delay``.
+        """
+        url = self._endpoint_url(eppocode, endpoint)
+
+        self.cache_misses += 1
+        for attempt in range(max_retries):
+            # Wait for a token before taking a slot, so callers waiting on
+            # the EPPO budget don't hold slots that generation needs
+            await self.rate_limiter.acquire_async()
+            async with self.semaphore:
+                self.api_calls += 1
+                try:
+                    resp = await self.http.get(url)
+                except httpx.HTTPError:
+                    resp = None
+            if resp is None:
+                if attempt == max_retries - 1:
+                    return None, None
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if resp.is_success:
+                try:
+                    data = resp.json()
+                except ValueError:
+                    return None, None
+
+                if data is None:
+                    return None, None
+                return data, await self._asave_cached(eppocode, endpoint, data)
+
+            delay = self._retry_delay(resp, attempt)
+            if delay is None or attempt == max_retries - 1:
+                return None, None
+            await asyncio.sleep(delay)
+
+        return None, None
+
+    async def fetch_facts(self, eppocode: str) -> Dict[str, Any]:
+        """Fetch overview, names and hosts concurrently.
+
+        Served from the in-memory memo when possible; concurrent tasks
+        asking for the same uncached code share a single fetch.
+
+        Args:
+            eppocode: EPPO code to fetch
+
+        Returns:
+            Dictionary with overview, names, and hosts data
+        """
+        if self.memo is None:
+            return await self._fetch_facts(eppocode)
+        return await self.memo.aget_or_load(
+            eppocode, lambda: self._fetch_facts(eppocode), _facts_complete
+        )
+
+    async def _fetch_facts(self, eppocode: str) -> Dict[str, Any]:
+        """Fetch facts through the disk cache and API, bypassing the memo."""
+        entries = await asyncio.gather(
+            *(self._get_entry(eppocode, ep) for ep in SOURCE_ENDPOINTS)
+        )
+        # Reads or writes the artifacts in the cache, so off the event loop
+        return await asyncio.to_thread(
+            self._attach_derived, eppocode, *self._assemble_entries(entries)
+        )
+
+    async def aclose(self):
+        """Wait for background refreshes, then close connections and the cache."""
+        with self._refresh_lock:
+            self._closed = True
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+        await self.http.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+    async def __aenter__(self) -> "AsyncEPPOClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
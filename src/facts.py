@@ -0,0 +1,304 @@
+"""Per-code artifacts derived from EPPO facts, computed once per fetch.
+
+EPPOClient attaches a DerivedFacts to the facts it returns as
+``facts["derived"]`` and stores it in the cache next to the endpoint
+responses. Validation and generation read it through ``fact_tokens`` and
+``prompt_block``, which fall back to computing the one artifact they need
+for facts built elsewhere.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from .tokens import estimate_tokens
+
+# Cache endpoint under which DerivedFacts are stored next to the responses
+DERIVED_ENDPOINT = "derived"
+DERIVED_VERSION = 2
+SOURCE_ENDPOINTS = ("overview", "names", "hosts")
+
+_SPLIT_RE = re.compile(r"[^\w]+")
+
+# Host classes listed first when compact facts are trimmed to a budget
+_HOST_CLASS_RANK = {"major host": 0, "host": 1}
+
+
+@dataclass(frozen=True)
+class DerivedFacts:
+    """Everything the pipeline computes from a code's facts alone.
+
+    Attributes:
+        tokens: Tokens of the preferred name, names and host names, as
+            matched by validation
+        prompt_block: Facts formatted for the LLM prompt
+        content_hash: SHA-256 of the facts, identifying this version of them
+    """
+
+    tokens: FrozenSet[str]
+    prompt_block: str
+    content_hash: str
+
+    def to_json(self, sources: Sequence[float]) -> Dict[str, Any]:
+        """Serialize for the cache.
+
+        Args:
+            sources: ``stored_at`` of the overview, names and hosts entries
+                the artifacts were derived from
+        """
+        return {
+            "version": DERIVED_VERSION,
+            "sources": list(sources),
+            "tokens": sorted(self.tokens),
+            "prompt_block": self.prompt_block,
+            "content_hash": self.content_hash,
+        }
+
+    @classmethod
+    def from_json(
+        cls, data: Any, sources: Sequence[float], facts_hash: Optional[str] = None
+    ) -> Optional["DerivedFacts"]:
+        """Deserialize a cached record if it matches the current entries.
+
+        Args:
+            data: Record written by ``to_json``
+            sources: Current ``stored_at`` of the overview, names and hosts entries
+            facts_hash: ``content_hash`` of the current facts; a record of
+                rewritten entries is still used if their content is unchanged
+
+        Returns:
+            DerivedFacts, or None if the record is from another version or
+            was derived from entries whose content has since changed
+        """
+        if not isinstance(data, dict) or data.get("version") != DERIVED_VERSION:
+            return None
+        if data.get("sources") != list(sources) and (
+            facts_hash is None or data.get("content_hash") != facts_hash
+        ):
+            return None
+        try:
+            return cls(
+                tokens=frozenset(data["tokens"]),
+                prompt_block=data["prompt_block"],
+                content_hash=data["content_hash"],
+            )
+        except (KeyError, TypeError):
+            return None
+
+    def approx_size(self) -> int:
+        """Approximate size in bytes, as counted by the in-memory memo."""
+        return (
+            len(self.prompt_block)
+            + sum(len(token) + 3 for token in self.tokens)
+            + len(self.content_hash)
+        )
+
+
+def _tokenize_text(text: str) -> FrozenSet[str]:
+    """Tokenize text into set of tokens."""
+    tokens = _SPLIT_RE.split((text or "").lower())
+    return frozenset(t for t in tokens if len(t) >= 2)
+
+
+def _texts_from_facts(facts: Dict[str, Any]) -> List[str]:
+    """Extract all text strings from EPPO facts.
+
+    Args:
+        facts: Dictionary with overview, names, and hosts data
+
+    Returns:
+        List of text strings to validate against
+    """
+    texts: List[str] = []
+
+    overview = facts.get("overview") or {}
+    if isinstance(overview, dict):
+        prefname = overview.get("prefname")
+        if prefname:
+            texts.append(prefname)
+
+    for name_entry in facts.get("names") or []:
+        if isinstance(name_entry, dict) and name_entry.get("fullname"):
+            texts.append(name_entry["fullname"])
+
+    for host_entry in facts.get("hosts") or []:
+        if isinstance(host_entry, dict) and host_entry.get("prefname"):
+            texts.append(host_entry["prefname"])
+
+    return texts
+
+
+def format_facts(facts: Dict[str, Any]) -> str:
+    """Format EPPO facts for prompt.
+
+    Args:
+        facts: Dictionary with overview, names, and hosts data
+
+    Returns:
+        Formatted text for LLM prompt
+    """
+    parts = []
+    overview = facts.get("overview") or {}
+
+    if isinstance(overview, dict):
+        prefname = overview.get("prefname")
+        eppocode = overview.get("eppocode")
+        if prefname:
+            parts.append(f"Disease/Pest: {prefname}")
+        if eppocode:
+            code = (
+                eppocode.get("eppocode")
+                if isinstance(eppocode, dict)
+                else eppocode
+            )
+            if code:
+                parts.append(f"EPPO Code: {code}")
+
+    # Add common names
+    common_names = []
+    for name_entry in facts.get("names") or []:
+        if isinstance(name_entry, dict) and name_entry.get("fullname"):
+            common_names.append(name_entry["fullname"])
+    if common_names:
+        parts.append(f"Also known as: {', '.join(common_names[:5])}")
+
+    # Add affected plants
+    hosts = []
+    for host_entry in facts.get("hosts") or []:
+        if isinstance(host_entry, dict) and host_entry.get("prefname"):
+            host_name = host_entry["prefname"]
+            classification = host_entry.get("class_label", "")
+            if classification:
+                hosts.append(f"{host_name} ({classification})")
+            else:
+                hosts.append(host_name)
+    if hosts:
+        parts.append(f"Commonly affects: {', '.join(hosts[:10])}")
+
+    return "\n".join(parts) if parts else ""
+
+
+def format_facts_compact(facts: Dict[str, Any], budget: int) -> str:
+    """Format EPPO facts for the compact prompt within a token budget.
+
+    The preferred name and code are always kept. Common names (distinct
+    from the preferred name) and then hosts, major hosts first, are added
+    while the estimated size stays within ``budget``; the caps of
+    ``format_facts`` still apply.
+
+    Args:
+        facts: Dictionary with overview, names, and hosts data
+        budget: Token budget for the whole block
+
+    Returns:
+        Formatted text for LLM prompt
+    """
+    lines = []
+    seen = set()
+    overview = facts.get("overview") or {}
+    if isinstance(overview, dict):
+        prefname = overview.get("prefname")
+        eppocode = overview.get("eppocode")
+        if isinstance(eppocode, dict):
+            eppocode = eppocode.get("eppocode")
+        if prefname:
+            lines.append(f"{prefname} ({eppocode})" if eppocode else prefname)
+            seen.add(prefname.lower())
+        elif eppocode:
+            lines.append(str(eppocode))
+    used = estimate_tokens(lines[0]) if lines else 0
+
+    def fill(label: str, items: List[str], cap: int):
+        nonlocal used
+        kept = []
+        # The label and separators cost about one token per item
+        cost = estimate_tokens(label) + 1
+        for item in items:
+            if len(kept) >= cap:
+                break
+            item_cost = estimate_tokens(item) + 1
+            if used + cost + item_cost > budget:
+                break
+            kept.append(item)
+            cost += item_cost
+        if kept:
+            lines.append(f"{label} {', '.join(kept)}")
+            used += cost
+
+    names = []
+    for name_entry in facts.get("names") or []:
+        if isinstance(name_entry, dict) and name_entry.get("fullname"):
+            fullname = name_entry["fullname"]
+            if fullname.lower() not in seen:
+                seen.add(fullname.lower())
+                names.append(fullname)
+    fill("Names:", names, 5)
+
+    hosts = [
+        host_entry
+        for host_entry in facts.get("hosts") or []
+        if isinstance(host_entry, dict) and host_entry.get("prefname")
+    ]
+    hosts.sort(
+        key=lambda h: _HOST_CLASS_RANK.get(str(h.get("class_label", "")).lower(), 2)
+    )
+    fill(
+        "Hosts:",
+        [
+            f"{h['prefname']} ({h['class_label']})" if h.get("class_label") else h["prefname"]
+            for h in hosts[:10]
+        ],
+        10,
+    )
+    return "\n".join(lines)
+
+
+def content_hash(facts: Dict[str, Any]) -> str:
+    """SHA-256 of the overview, names and hosts as canonical JSON."""
+    text = json.dumps(
+        [facts.get(endpoint) for endpoint in SOURCE_ENDPOINTS],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def derive_facts(
+    facts: Dict[str, Any], facts_hash: Optional[str] = None
+) -> DerivedFacts:
+    """Compute the derived artifacts of a facts dictionary.
+
+    Args:
+        facts: Dictionary with overview, names, and hosts data
+        facts_hash: ``content_hash(facts)`` if already computed
+    """
+    return DerivedFacts(
+        tokens=_tokenize_text(" ".join(_texts_from_facts(facts))),
+        prompt_block=format_facts(facts),
+        content_hash=facts_hash or content_hash(facts),
+    )
+
+
+def _attached(facts: Dict[str, Any]) -> Optional[DerivedFacts]:
+    derived = facts.get("derived")
+    return derived if isinstance(derived, DerivedFacts) else None
+
+
+def fact_tokens(facts: Dict[str, Any]) -> FrozenSet[str]:
+    """Validation tokens of facts, from the attached DerivedFacts if any."""
+    derived = _attached(facts)
+    if derived is not None:
+        return derived.tokens
+    return _tokenize_text(" ".join(_texts_from_facts(facts)))
+
+
+def prompt_block(facts: Dict[str, Any]) -> str:
+    """Formatted facts for the prompt, from the attached DerivedFacts if any."""
+    derived = _attached(facts)
+    if derived is not None:
+        return derived.prompt_block
+    return format_facts(facts)
@@ -0,0 +1,321 @@
+"""Typo-tolerant resolution of query tokens against the EPPO name vocabulary."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .name_index import token_frequencies
+from .normalization import NormalizedLabel
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    """Return ``word`` and every string made by deleting up to max_distance characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for w in frontier:
+            if len(w) > 1:
+                for i in range(len(w)):
+                    next_frontier.add(w[:i] + w[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """Optimal string alignment distance between two strings.
+
+    Counts insertions, deletions, substitutions and transpositions of
+    adjacent characters. Stops early once the distance exceeds ``bound``.
+
+    Args:
+        a: First string
+        b: Second string
+        bound: Largest distance of interest
+
+    Returns:
+        The distance, or ``bound + 1`` if it is larger than ``bound``
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    # Common prefix and suffix never change the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while (
+        end < len(a) - start
+        and end < len(b) - start
+        and a[-1 - end] == b[-1 - end]
+    ):
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b)
+
+    # Only cells within ``bound`` of the diagonal can stay within the bound;
+    # the others hold ``bound + 1``
+    over = bound + 1
+    size = len(b)
+    before = None
+    prev = [j if j <= bound else over for j in range(size + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        cur = [i if i <= bound else over] + [over] * size
+        row_min = over
+        for j in range(max(1, i - bound), min(size, i + bound) + 1):
+            value = min(
+                prev[j] + 1,
+                cur[j - 1] + 1,
+                prev[j - 1] + (ca != b[j - 1]),
+            )
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            if value > over:
+                value = over
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > bound:
+            return over
+        before, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzyTokenResolver:
+    """SymSpell-style deletion index over the token vocabulary of EPPO names.
+
+    Each vocabulary token is filed under every string obtained by deleting
+    up to ``max_distance`` characters from its first ``prefix_length``
+    characters. A query token generates its own deletes, and the tokens
+    filed under them are verified with ``edit_distance``. A lookup is a few
+    dozen dictionary probes instead of a scan of the vocabulary.
+
+    Known tokens resolve to themselves. Tokens shorter than
+    ``min_token_len`` are never corrected. Longer tokens tolerate one edit,
+    or up to ``max_distance`` from 7 characters on. Safe to share between
+    threads.
+    """
+
+    def __init__(
+        self,
+        frequencies: Dict[str, int],
+        max_distance: int = None,
+        prefix_length: int = None,
+        min_token_len: int = None,
+        cache_size: int = None,
+    ):
+        """Build the deletion index.
+
+        Args:
+            frequencies: Vocabulary token to number of names containing it
+                (ties between equally close tokens go to the more frequent)
+            max_distance: Largest edit distance corrected (defaults to
+                Config.FUZZY_MAX_EDIT_DISTANCE)
+            prefix_length: Characters of each token indexed (defaults to
+                Config.FUZZY_PREFIX_LENGTH)
+            min_token_len: Shortest token corrected (defaults to
+                Config.FUZZY_MIN_TOKEN_LEN)
+            cache_size: Resolved tokens memoized (defaults to
+                Config.FUZZY_CACHE_SIZE)
+        """
+        self.max_distance = (
+            Config.FUZZY_MAX_EDIT_DISTANCE if max_distance is None else max_distance
+        )
+        self.prefix_length = prefix_length or Config.FUZZY_PREFIX_LENGTH
+        self.min_token_len = min_token_len or Config.FUZZY_MIN_TOKEN_LEN
+        self.cache_size = cache_size or Config.FUZZY_CACHE_SIZE
+        self.frequencies = frequencies
+        self.words: List[str] = sorted(frequencies)
+        self.corrections = 0
+        self._memo: Dict[str, Optional[str]] = {}
+
+        # Most deletes belong to a single word; store those as a bare id
+        deletes: Dict[str, Any] = {}
+        for word_id, word in enumerate(self.words):
+            for key in _deletes(word[: self.prefix_length], self.max_distance):
+                entry = deletes.get(key)
+                if entry is None:
+                    deletes[key] = word_id
+                elif isinstance(entry, int):
+                    deletes[key] = [entry, word_id]
+                else:
+                    entry.append(word_id)
+        self._deletes = deletes
+
+    @classmethod
+    def from_sqlite(cls, sqlite_path: Path, **kwargs) -> "FuzzyTokenResolver":
+        """Build from the token index of a database (or its active names)."""
+        return cls(token_frequencies(sqlite_path), **kwargs)
+
+    @classmethod
+    def from_index(cls, index, **kwargs) -> "FuzzyTokenResolver":
+        """Build from the vocabulary of a loaded CompiledNameIndex."""
+        return cls(index.token_frequencies(), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.frequencies
+
+    def max_distance_for(self, token: str) -> int:
+        """Edit distance tolerated for a query token of this length."""
+        if len(token) < self.min_token_len:
+            return 0
+        return min(self.max_distance, 1 if len(token) < 7 else 2)
+
+    def suggest(self, token: str, limit: int = 5) -> List[Tuple[str, int]]:
+        """Return the closest vocabulary tokens.
+
+        Args:
+            token: Lowercased query token
+            limit: Maximum number of suggestions
+
+        Returns:
+            (token, distance) pairs, closest and then most frequent first
+        """
+        if token in self.frequencies:
+            return [(token, 0)]
+        bound = self.max_distance_for(token)
+        if bound == 0:
+            return []
+
+        prefix = token[: self.prefix_length]
+        size = len(token)
+        seen = set()
+        found: List[Tuple[int, int, str]] = []
+        # Fewest deletions first: close words turn up early and tighten the
+        # bound for the rest of the search
+        for key in sorted(_deletes(prefix, bound), key=len, reverse=True):
+            if len(prefix) - len(key) > bound:
+                break
+            entry = self._deletes.get(key)
+            if entry is None:
+                continue
+            for word_id in (entry,) if isinstance(entry, int) else entry:
+                if word_id in seen:
+                    continue
+                word = self.words[word_id]
+                # A word within the bound is also filed under a key with no
+                # more than ``bound`` deletions from its own prefix
+                if (
+                    abs(len(word) - size) > bound
+                    or min(len(word), self.prefix_length) - len(key) > bound
+                ):
+                    continue
+                seen.add(word_id)
+                distance = edit_distance(token, word, bound)
+                if distance <= bound:
+                    found.append((distance, -self.frequencies[word], word))
+                    if len(found) >= limit:
+                        found.sort()
+                        del found[limit:]
+                        bound = found[-1][0]
+        found.sort()
+        return [(word, distance) for distance, _, word in found[:limit]]
+
+    def lookup(self, token: str) -> Optional[str]:
+        """Return the best vocabulary token for a query token, or None.
+
+        Args:
+            token: Lowercased query token
+
+        Returns:
+            ``token`` itself if known, else the closest vocabulary token
+            within the distance bound (None if there is none)
+        """
+        if token in self.frequencies:
+            return token
+        memo = self._memo
+        if token in memo:
+            return memo[token]
+        suggestions = self.suggest(token, 1)
+        best = suggestions[0][0] if suggestions else None
+        if len(memo) >= self.cache_size:
+            memo.clear()
+        memo[token] = best
+        return best
+
+    def correct(self, norm: NormalizedLabel) -> NormalizedLabel:
+        """Replace unknown tokens of a label with their closest vocabulary tokens.
+
+        Tokens with no close match, and corrections that would turn into a
+        generic term, are kept as they are.
+
+        Args:
+            norm: Normalized label
+
+        Returns:
+            ``norm`` itself if nothing changed, else a corrected copy
+        """
+        frequencies = self.frequencies
+        if all(token in frequencies for token in norm.tokens):
+            return norm
+
+        mapping: Dict[str, str] = {}
+        for token in norm.tokens:
+            best = self.lookup(token)
+            if best is not None and best != token and best not in Config.GENERIC_TERMS:
+                mapping[token] = best
+        if not mapping:
+            return norm
+        self.corrections += len(mapping)
+
+        def fix(tokens: List[str]) -> List[str]:
+            return list(dict.fromkeys(mapping.get(token, token) for token in tokens))
+
+        location_terms = list(norm.location_terms)
+        for best in mapping.values():
+            if best in Config.LOCATION_TERMS and best not in location_terms:
+                location_terms.append(best)
+        return NormalizedLabel(
+            original=norm.original,
+            tokens=fix(norm.tokens),
+            host_candidates=fix(norm.host_candidates),
+            symptom_candidates=fix(norm.symptom_candidates),
+            location_terms=location_terms,
+        )
+
+
+_resolver: Optional[FuzzyTokenResolver] = None
+
+
+def set_resolver(resolver: Optional[FuzzyTokenResolver]):
+    """Install the process-wide token resolver (None removes it)."""
+    global _resolver
+    _resolver = resolver
+
+
+def get_resolver() -> Optional[FuzzyTokenResolver]:
+    """Return the process-wide token resolver, if any."""
+    return _resolver
+
+
+def load_resolver(sqlite_path: Path = None, index=None) -> FuzzyTokenResolver:
+    """Build and install the token resolver at startup.
+
+    Args:
+        sqlite_path: Database whose vocabulary to use (defaults to
+            Config.SQLITE_PATH)
+        index: Loaded CompiledNameIndex to take the vocabulary from instead
+
+    Returns:
+        The installed resolver
+    """
+    if index is not None and hasattr(index, "token_frequencies"):
+        resolver = FuzzyTokenResolver.from_index(index)
+    else:
+        resolver = FuzzyTokenResolver.from_sqlite(Path(sqlite_path or Config.SQLITE_PATH))
+    set_resolver(resolver)
+    return resolver
+
+
+def correct_label(norm: NormalizedLabel) -> NormalizedLabel:
+    """Apply the installed resolver to a label (unchanged if none is installed)."""
+    resolver = _resolver
+    if resolver is None or not norm.tokens:
+        return norm
+    return resolver.correct(norm)
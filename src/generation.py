@@ -1,10 +1,16 @@
 """LLM-based response generation using Groq."""
 
-from typing import Any, Dict
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
-from groq import Groq
+from groq import AsyncGroq, Groq
 
+from .cache import ResponseCache
 from .config import Config
+from .facts import format_facts_compact, prompt_block
+from .tokens import completion_tokens_for, estimate_tokens
 
 SYSTEM_PROMPT = """You are an expert plant pathologist and agricultural advisor. Your expertise includes disease diagnosis, treatment protocols, and integrated pest management.
 
@@ -27,89 +33,125 @@ Avoid:
 - Unverified information not supported by EPPO data
 - Recommending products without active ingredients"""
 
+# Compact mode moves the answer template into the system prompt, so every
+# request shares the same prefix and only the label and facts vary
+COMPACT_SYSTEM_PROMPT = """You are a plant pathologist advising farmers. Check a vision model's disease prediction against EPPO facts and answer in four short sections:
+1. CONFIRMATION: YES/NO, does the prediction match the EPPO disease? 1-2 sentences of reasoning; if NO, what it likely is.
+2. OVERVIEW: causal agent, main symptoms, impact.
+3. TREATMENT: 3 actions, each with method, active ingredient or approach, and timing.
+4. PREVENTION: 3 measures, most important first.
+Use plain language and short bullets. Name active ingredients, not products. Do not state anything the EPPO facts do not support; say when you are unsure."""
+
+
+NO_FACTS_MESSAGE = (
+    "I cannot provide a diagnosis: no EPPO-backed facts are available for this label."
+)
+NO_API_KEY_MESSAGE = "I cannot generate a response: Groq API key is not set."
+EMPTY_RESPONSE_MESSAGE = "I could not generate a response from the provided facts."
+
 
 class ResponseGenerator:
     """Generator for LLM-based disease diagnosis responses."""
 
-    def __init__(self, api_key: str = None, model: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        response_cache: Optional[ResponseCache] = None,
+        use_response_cache: bool = None,
+        compact: bool = None,
+    ):
         """Initialize generator.
 
         Args:
             api_key: Groq API key (defaults to Config.GROQ_API_KEY)
             model: Model name (defaults to Config.GROQ_MODEL)
+            response_cache: Store of generated answers (defaults to one at
+                Config.RESPONSE_CACHE_PATH when caching is enabled)
+            use_response_cache: Whether to cache answers (defaults to
+                Config.RESPONSE_CACHE_ENABLED)
+            compact: Use the compact prompt (defaults to
+                Config.GROQ_COMPACT_PROMPT)
         """
         self.api_key = api_key or Config.GROQ_API_KEY
         self.model = model or Config.GROQ_MODEL
         self.client = Groq(api_key=self.api_key) if self.api_key else None
+        self.response_cache = self._open_response_cache(response_cache, use_response_cache)
+        self.compact = Config.GROQ_COMPACT_PROMPT if compact is None else compact
+        self._init_counters()
+
+    def _init_counters(self):
+        """Reset call and token usage counters."""
         self.call_count = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.truncated = 0
+        # Most recent per-call usage records, see ``_record_usage``
+        self.usage_log: Deque[Dict[str, Any]] = deque(maxlen=Config.GROQ_USAGE_WINDOW)
+
+    @staticmethod
+    def _open_response_cache(
+        response_cache: Optional[ResponseCache], use_response_cache: Optional[bool]
+    ) -> Optional[ResponseCache]:
+        """Resolve the response cache from constructor arguments."""
+        if use_response_cache is None:
+            use_response_cache = Config.RESPONSE_CACHE_ENABLED
+        if not use_response_cache:
+            return None
+        return response_cache or ResponseCache()
 
     def _format_facts(self, facts: Dict[str, Any]) -> str:
-        """Format EPPO facts for prompt.
+        """Return the prompt block derived once per fetch (see ``facts.py``).
 
-        Args:
-            facts: Dictionary with overview, names, and hosts data
-
-        Returns:
-            Formatted text for LLM prompt
+        In compact mode the facts are trimmed to Config.GROQ_FACTS_TOKEN_BUDGET.
         """
-        parts = []
-        overview = facts.get("overview") or {}
-
-        if isinstance(overview, dict):
-            prefname = overview.get("prefname")
-            eppocode = overview.get("eppocode")
-            if prefname:
-                parts.append(f"Disease/Pest: {prefname}")
-            if eppocode:
-                code = (
-                    eppocode.get("eppocode")
-                    if isinstance(eppocode, dict)
-                    else eppocode
-                )
-                if code:
-                    parts.append(f"EPPO Code: {code}")
-
-        # Add common names
-        common_names = []
-        for name_entry in facts.get("names") or []:
-            if isinstance(name_entry, dict) and name_entry.get("fullname"):
-                common_names.append(name_entry["fullname"])
-        if common_names:
-            parts.append(f"Also known as: {', '.join(common_names[:5])}")
-
-        # Add affected plants
-        hosts = []
-        for host_entry in facts.get("hosts") or []:
-            if isinstance(host_entry, dict) and host_entry.get("prefname"):
-                host_name = host_entry["prefname"]
-                classification = host_entry.get("class_label", "")
-                if classification:
-                    hosts.append(f"{host_name} ({classification})")
-                else:
-                    hosts.append(host_name)
-        if hosts:
-            parts.append(f"Commonly affects: {', '.join(hosts[:10])}")
-
-        return "\n".join(parts) if parts else ""
-
-    def generate(self, cv_label: str, facts: Dict[str, Any]) -> str:
-        """Generate diagnosis response from EPPO facts.
-
-        Args:
-            cv_label: Original CV model prediction label
-            facts: EPPO facts dictionary
-
-        Returns:
-            Generated response text
+        if self.compact:
+            return format_facts_compact(facts, Config.GROQ_FACTS_TOKEN_BUDGET)
+        return prompt_block(facts)
+
+    def _system_prompt(self) -> str:
+        """Return the system message for the prompt mode."""
+        return COMPACT_SYSTEM_PROMPT if self.compact else SYSTEM_PROMPT
+
+    @staticmethod
+    def _answer_words(formatted: str) -> int:
+        """Return the answer length to ask for in compact mode.
+
+        Fewer facts leave less to confirm and explain, so the length grows
+        from Config.GROQ_COMPACT_MIN_ANSWER_WORDS by
+        Config.GROQ_COMPACT_WORDS_PER_FACT_TOKEN per token of ``formatted``,
+        up to Config.GROQ_COMPACT_ANSWER_WORDS.
         """
-        formatted = self._format_facts(facts)
-        if not formatted.strip():
-            return "I cannot provide a diagnosis: no EPPO-backed facts are available for this label."
-
-        if not self.client:
-            return "I cannot generate a response: Groq API key is not set."
-
-        user_content = f'''Vision Model Prediction: "{cv_label}"
+        scaled = Config.GROQ_COMPACT_WORDS_PER_FACT_TOKEN * estimate_tokens(formatted)
+        return min(
+            Config.GROQ_COMPACT_ANSWER_WORDS,
+            Config.GROQ_COMPACT_MIN_ANSWER_WORDS + round(scaled),
+        )
+
+    def _max_tokens(self, formatted: str) -> int:
+        """Return max_completion_tokens for the prompt mode and facts.
+
+        Compact mode asks for at most ``_answer_words(formatted)`` words, so
+        it allows the tokens of such an answer plus
+        Config.GROQ_REASONING_TOKENS, capped at Config.GROQ_MAX_TOKENS.
+        """
+        if not self.compact:
+            return Config.GROQ_MAX_TOKENS
+        return min(
+            Config.GROQ_MAX_TOKENS,
+            completion_tokens_for(self._answer_words(formatted))
+            + Config.GROQ_REASONING_TOKENS,
+        )
+
+    def _user_prompt(self, cv_label: str, formatted: str) -> str:
+        """Build the user message for a label and its formatted facts."""
+        if self.compact:
+            return (
+                f'Prediction: "{cv_label}"\n'
+                f"EPPO facts:\n{formatted}\n"
+                f"Answer in at most {self._answer_words(formatted)} words."
+            )
+        return f'''Vision Model Prediction: "{cv_label}"
 
 === EPPO DATABASE INFORMATION ===
 {formatted}
@@ -139,29 +181,342 @@ Analyze the prediction against EPPO data and provide a structured response:
 
 Keep each section concise (3-5 bullet points max). Focus on what farmers can DO, not just what to know.'''
 
+    def _messages(self, cv_label: str, formatted: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a completion request."""
+        return [
+            {"role": "system", "content": self._system_prompt()},
+            {"role": "user", "content": self._user_prompt(cv_label, formatted)},
+        ]
+
+    @staticmethod
+    def _extract_content(response: Any) -> str:
+        """Return the stripped completion text or a fallback message."""
+        content = response.choices[0].message.content if response.choices else None
+        return (content or "").strip() or EMPTY_RESPONSE_MESSAGE
+
+    @staticmethod
+    def _facts_code(facts: Dict[str, Any]) -> str:
+        """EPPO code the facts describe, used to group cached answers."""
+        overview = facts.get("overview") or {}
+        code = overview.get("eppocode") if isinstance(overview, dict) else None
+        if isinstance(code, dict):
+            code = code.get("eppocode")
+        return code or ""
+
+    def _cache_key(self, cv_label: str, formatted: str) -> str:
+        """Hash the label, facts, prompts and settings behind a completion.
+
+        Keyed on the label exactly as it goes into the prompt, so labels
+        that only normalize alike do not share an answer.
+        """
+        return ResponseCache.make_key(
+            cv_label,
+            formatted,
+            self._system_prompt(),
+            self._user_prompt("{label}", "{facts}"),
+            self.model,
+            Config.GROQ_TEMPERATURE,
+            self._max_tokens(formatted),
+        )
+
+    def _cached_answer(
+        self, cv_label: str, facts: Dict[str, Any], formatted: str
+    ) -> Tuple[str, str, Optional[str]]:
+        """Look up a cached answer.
+
+        Returns:
+            Tuple of (eppocode, key, answer or None)
+        """
+        if self.response_cache is None:
+            return "", "", None
+        code = self._facts_code(facts)
+        key = self._cache_key(cv_label, formatted)
+        return code, key, self.response_cache.get(code, key)
+
+    def _store_answer(self, code: str, key: str, answer: str):
+        """Cache a completed answer; fallback messages are not stored."""
+        if self.response_cache is not None and answer != EMPTY_RESPONSE_MESSAGE:
+            self.response_cache.set(code, key, answer)
+
+    def _record_usage(
+        self,
+        usage: Any,
+        finish_reason: Optional[str],
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        seconds: float,
+    ) -> bool:
+        """Log the token usage Groq reported for one completion.
+
+        Appends a record with prompt_tokens and completion_tokens (None if
+        not reported), estimated_prompt_tokens, max_completion_tokens,
+        seconds, compact and truncated to ``usage_log`` and adds to the
+        totals in ``get_stats``.
+
+        Args:
+            usage: ``usage`` of the completion (or of the last stream chunk)
+            finish_reason: Finish reason of the first choice
+            messages: Messages sent
+            max_tokens: max_completion_tokens sent
+            seconds: Time from request to complete answer
+
+        Returns:
+            True if the answer was cut off by max_completion_tokens
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        truncated = finish_reason == "length"
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        self.truncated += truncated
+        self.usage_log.append(
+            {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "estimated_prompt_tokens": sum(
+                    estimate_tokens(m["content"]) for m in messages
+                ),
+                "max_completion_tokens": max_tokens,
+                "seconds": seconds,
+                "compact": self.compact,
+                "truncated": truncated,
+            }
+        )
+        return truncated
+
+    @staticmethod
+    def _finish_reason(response: Any) -> Optional[str]:
+        """Finish reason of the first choice, if any."""
+        return response.choices[0].finish_reason if response.choices else None
+
+    def generate(self, cv_label: str, facts: Dict[str, Any]) -> str:
+        """Generate diagnosis response from EPPO facts.
+
+        Args:
+            cv_label: Original CV model prediction label
+            facts: EPPO facts dictionary
+
+        Returns:
+            Generated response text
+        """
+        formatted = self._format_facts(facts)
+        if not formatted.strip():
+            return NO_FACTS_MESSAGE
+
+        code, key, cached = self._cached_answer(cv_label, facts, formatted)
+        if cached is not None:
+            return cached
+
+        if not self.client:
+            return NO_API_KEY_MESSAGE
+
+        messages = self._messages(cv_label, formatted)
+        max_tokens = self._max_tokens(formatted)
         try:
             self.call_count += 1
+            start = time.perf_counter()
             response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_content},
-                ],
+                messages=messages,
                 model=self.model,
-                max_completion_tokens=Config.GROQ_MAX_TOKENS,
+                max_completion_tokens=max_tokens,
                 temperature=Config.GROQ_TEMPERATURE,
             )
-            content = response.choices[0].message.content if response.choices else None
-            return (
-                (content or "").strip()
-                or "I could not generate a response from the provided facts."
-            )
+            answer = self._extract_content(response)
         except Exception as e:
             return f"I cannot generate a response: {str(e)}"
+        truncated = self._record_usage(
+            response.usage,
+            self._finish_reason(response),
+            messages,
+            max_tokens,
+            time.perf_counter() - start,
+        )
+        if not truncated:
+            self._store_answer(code, key, answer)
+        return answer
+
+    def generate_stream(self, cv_label: str, facts: Dict[str, Any]) -> Iterator[str]:
+        """Generate a diagnosis response, yielding text as it arrives.
+
+        Uses the Groq streaming API, so the first chunk is available after
+        the first tokens rather than the whole completion. Cached answers
+        and messages that need no LLM call are yielded as a single chunk.
+        The full answer is cached once the stream completes.
+
+        Args:
+            cv_label: Original CV model prediction label
+            facts: EPPO facts dictionary
+
+        Yields:
+            Response text chunks
+        """
+        formatted = self._format_facts(facts)
+        if not formatted.strip():
+            yield NO_FACTS_MESSAGE
+            return
+
+        code, key, cached = self._cached_answer(cv_label, facts, formatted)
+        if cached is not None:
+            yield cached
+            return
+
+        if not self.client:
+            yield NO_API_KEY_MESSAGE
+            return
+
+        messages = self._messages(cv_label, formatted)
+        max_tokens = self._max_tokens(formatted)
+        parts = []
+        usage = finish_reason = None
+        try:
+            self.call_count += 1
+            start = time.perf_counter()
+            stream = self.client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                max_completion_tokens=max_tokens,
+                temperature=Config.GROQ_TEMPERATURE,
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                # Groq reports usage on the last chunk, under x_groq
+                x_groq = getattr(chunk, "x_groq", None)
+                usage = (
+                    getattr(chunk, "usage", None)
+                    or getattr(x_groq, "usage", None)
+                    or usage
+                )
+        except Exception as e:
+            yield f"I cannot generate a response: {str(e)}"
+            return
+
+        truncated = self._record_usage(
+            usage, finish_reason, messages, max_tokens, time.perf_counter() - start
+        )
+        answer = "".join(parts).strip()
+        if not answer:
+            yield EMPTY_RESPONSE_MESSAGE
+            return
+        if not truncated:
+            self._store_answer(code, key, answer)
 
     def get_stats(self) -> Dict[str, int]:
         """Get generator statistics.
 
         Returns:
-            Dictionary with call_count
+            Dictionary with call_count (LLM requests), prompt_tokens and
+            completion_tokens (as reported by Groq), truncated (answers cut
+            off by max_completion_tokens, which are not cached) and response
+            cache cache_hits and cache_misses
         """
-        return {"call_count": self.call_count}
\ No newline at end of file
+        cache = self.response_cache
+        return {
+            "call_count": self.call_count,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "truncated": self.truncated,
+            "cache_hits": cache.hits if cache is not None else 0,
+            "cache_misses": cache.misses if cache is not None else 0,
+        }
+
+    def close(self):
+        """Close the response cache."""
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+
+class AsyncResponseGenerator(ResponseGenerator):
+    """Async variant of ResponseGenerator built on the ``AsyncGroq`` client."""
+
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        response_cache: Optional[ResponseCache] = None,
+        use_response_cache: bool = None,
+        compact: bool = None,
+    ):
+        """Initialize async generator.
+
+        Args:
+            api_key: Groq API key (defaults to Config.GROQ_API_KEY)
+            model: Model name (defaults to Config.GROQ_MODEL)
+            semaphore: Limits concurrent completions; share it with
+                AsyncEPPOClient to bound all outbound calls together
+            response_cache: Store of generated answers (defaults to one at
+                Config.RESPONSE_CACHE_PATH when caching is enabled)
+            use_response_cache: Whether to cache answers (defaults to
+                Config.RESPONSE_CACHE_ENABLED)
+            compact: Use the compact prompt (defaults to
+                Config.GROQ_COMPACT_PROMPT)
+        """
+        self.api_key = api_key or Config.GROQ_API_KEY
+        self.model = model or Config.GROQ_MODEL
+        self.client = AsyncGroq(api_key=self.api_key) if self.api_key else None
+        self.response_cache = self._open_response_cache(response_cache, use_response_cache)
+        self.semaphore = semaphore or asyncio.Semaphore(Config.ASYNC_MAX_CONCURRENCY)
+        self.compact = Config.GROQ_COMPACT_PROMPT if compact is None else compact
+        self._init_counters()
+
+    async def generate(self, cv_label: str, facts: Dict[str, Any]) -> str:
+        """Generate diagnosis response from EPPO facts without blocking.
+
+        Args:
+            cv_label: Original CV model prediction label
+            facts: EPPO facts dictionary
+
+        Returns:
+            Generated response text
+        """
+        formatted = self._format_facts(facts)
+        if not formatted.strip():
+            return NO_FACTS_MESSAGE
+
+        # Response cache lookups and writes hit SQLite, so off the event loop
+        code, key, cached = await asyncio.to_thread(
+            self._cached_answer, cv_label, facts, formatted
+        )
+        if cached is not None:
+            return cached
+
+        if not self.client:
+            return NO_API_KEY_MESSAGE
+
+        messages = self._messages(cv_label, formatted)
+        max_tokens = self._max_tokens(formatted)
+        try:
+            self.call_count += 1
+            async with self.semaphore:
+                start = time.perf_counter()
+                response = await self.client.chat.completions.create(
+                    messages=messages,
+                    model=self.model,
+                    max_completion_tokens=max_tokens,
+                    temperature=Config.GROQ_TEMPERATURE,
+                )
+            answer = self._extract_content(response)
+        except Exception as e:
+            return f"I cannot generate a response: {str(e)}"
+        truncated = self._record_usage(
+            response.usage,
+            self._finish_reason(response),
+            messages,
+            max_tokens,
+            time.perf_counter() - start,
+        )
+        if not truncated:
+            await asyncio.to_thread(self._store_answer, code, key, answer)
+        return answer
+
+    async def aclose(self):
+        """Close the underlying HTTP client and the response cache."""
+        if self.client is not None:
+            await self.client.close()
+        self.close()
@@ -0,0 +1,295 @@
+"""Incremental update of derived indexes for a new EPPO database release."""
+
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import CacheBackend, ResponseCache
+from .name_index import _token_rows, build_name_index
+from .retrieval import index_is_current
+
+# Columns compared between releases
+_CODE_COLUMNS = "codeid, eppocode, dtcode, status"
+_NAME_COLUMNS = "nameid, codeid, fullname, status"
+
+# name_index._ACTIVE_NAMES_SQL restricted to the affected names of the
+# attached new release
+_AFFECTED_NAMES_SQL = """
+    SELECT n.nameid, c.codeid, c.eppocode, c.dtcode, n.fullname
+    FROM src.t_codes c
+    JOIN src.t_names n ON c.codeid = n.codeid
+    WHERE c.status = 'A' AND n.status = 'A'
+      AND n.nameid IN (SELECT id FROM temp.affected)
+    ORDER BY n.nameid
+"""
+
+
+@dataclass
+class DatabaseDiff:
+    """Rows that differ between two EPPO database releases."""
+
+    codes_added: Set[int] = field(default_factory=set)
+    codes_removed: Set[int] = field(default_factory=set)
+    codes_changed: Set[int] = field(default_factory=set)
+    names_added: Set[int] = field(default_factory=set)
+    names_removed: Set[int] = field(default_factory=set)
+    names_changed: Set[int] = field(default_factory=set)
+    # Names whose index rows must be rebuilt: changed names plus every name
+    # of a changed code (the index stores each name's eppocode and dtcode)
+    affected_nameids: Set[int] = field(default_factory=set)
+    eppocodes: Set[str] = field(default_factory=set)
+    seconds: float = 0.0
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of each kind of change."""
+        return {
+            "codes_added": len(self.codes_added),
+            "codes_removed": len(self.codes_removed),
+            "codes_changed": len(self.codes_changed),
+            "names_added": len(self.names_added),
+            "names_removed": len(self.names_removed),
+            "names_changed": len(self.names_changed),
+            "eppocodes": len(self.eppocodes),
+        }
+
+
+def _ro_uri(path: Path) -> str:
+    return f"{Path(path).resolve().as_uri()}?mode=ro"
+
+
+def _split(
+    conn: sqlite3.Connection, table: str, columns: str
+) -> Tuple[Set[int], Set[int], Set[int]]:
+    """Return (added, removed, changed) primary keys of a table."""
+    key = columns.split(",")[0]
+    new_side = {
+        row[0]
+        for row in conn.execute(
+            f"SELECT {key} FROM (SELECT {columns} FROM main.{table} "
+            f"EXCEPT SELECT {columns} FROM old.{table})"
+        )
+    }
+    old_side = {
+        row[0]
+        for row in conn.execute(
+            f"SELECT {key} FROM (SELECT {columns} FROM old.{table} "
+            f"EXCEPT SELECT {columns} FROM main.{table})"
+        )
+    }
+    return new_side - old_side, old_side - new_side, new_side & old_side
+
+
+def _fill_temp(conn: sqlite3.Connection, table: str, ids: Iterable[int]):
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY)")
+    conn.execute(f"DELETE FROM temp.{table}")
+    conn.executemany(f"INSERT INTO temp.{table} VALUES (?)", ((i,) for i in ids))
+
+
+def diff_databases(old_path: Path, new_path: Path) -> DatabaseDiff:
+    """Compare t_codes and t_names of two releases.
+
+    Codes are compared on (codeid, eppocode, dtcode, status) and names on
+    (nameid, codeid, fullname, status), with SQLite doing the set
+    difference on both databases attached to one connection.
+
+    Args:
+        old_path: Release the current indexes and caches were built from
+        new_path: New release
+
+    Returns:
+        DatabaseDiff
+    """
+    start = time.perf_counter()
+    diff = DatabaseDiff()
+    conn = sqlite3.connect(_ro_uri(new_path), uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS old", (_ro_uri(old_path),))
+        diff.codes_added, diff.codes_removed, diff.codes_changed = _split(
+            conn, "t_codes", _CODE_COLUMNS
+        )
+        diff.names_added, diff.names_removed, diff.names_changed = _split(
+            conn, "t_names", _NAME_COLUMNS
+        )
+
+        changed_names = diff.names_added | diff.names_removed | diff.names_changed
+        _fill_temp(conn, "diff_names", changed_names)
+        codeids = diff.codes_added | diff.codes_removed | diff.codes_changed
+        for schema in ("main", "old"):
+            codeids.update(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT codeid FROM {schema}.t_names "
+                    "WHERE nameid IN (SELECT id FROM temp.diff_names)"
+                )
+            )
+        _fill_temp(conn, "diff_codes", codeids)
+
+        diff.affected_nameids = set(changed_names)
+        changed_codes = diff.codes_added | diff.codes_removed | diff.codes_changed
+        _fill_temp(conn, "diff_changed_codes", changed_codes)
+        for schema in ("main", "old"):
+            diff.affected_nameids.update(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT nameid FROM {schema}.t_names "
+                    "WHERE codeid IN (SELECT id FROM temp.diff_changed_codes)"
+                )
+            )
+            diff.eppocodes.update(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT eppocode FROM {schema}.t_codes "
+                    "WHERE codeid IN (SELECT id FROM temp.diff_codes)"
+                )
+                if row[0]
+            )
+    finally:
+        conn.close()
+    diff.seconds = time.perf_counter() - start
+    return diff
+
+
+def patch_name_index(
+    index_path: Path,
+    new_path: Path,
+    diff: DatabaseDiff,
+    output_path: Optional[Path] = None,
+) -> Dict[str, float]:
+    """Apply a diff to a token index built from the old release.
+
+    Only the affected names are deleted and re-inserted. The patch runs on
+    a copy that is moved into place at the end: sessions open the index
+    with ``immutable=1``, so the file they have open must not change.
+
+    Args:
+        index_path: Token index of the old release
+        new_path: New release
+        diff: Result of ``diff_databases``
+        output_path: Where to write the patched index (defaults to
+            ``index_path``)
+
+    Returns:
+        Dictionary with names_deleted, names_inserted, postings_deleted,
+        postings_inserted and seconds
+    """
+    start = time.perf_counter()
+    output_path = Path(output_path or index_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    shutil.copyfile(index_path, tmp_path)
+
+    conn = sqlite3.connect(tmp_path.resolve().as_uri(), uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (_ro_uri(new_path),))
+        _fill_temp(conn, "affected", diff.affected_nameids)
+
+        old_rows = conn.execute(
+            "SELECT nameid, fullname FROM names "
+            "WHERE nameid IN (SELECT id FROM temp.affected)"
+        ).fetchall()
+        old_tokens: List[Tuple[str, int]] = []
+        for nameid, fullname in old_rows:
+            old_tokens.extend(_token_rows(nameid, fullname))
+        conn.executemany(
+            "DELETE FROM name_tokens WHERE token = ? AND nameid = ?", old_tokens
+        )
+        conn.execute("DELETE FROM names WHERE nameid IN (SELECT id FROM temp.affected)")
+
+        new_rows = [
+            (nameid, codeid, eppocode, dtcode, fullname or "")
+            for nameid, codeid, eppocode, dtcode, fullname in conn.execute(
+                _AFFECTED_NAMES_SQL
+            )
+        ]
+        new_tokens: List[Tuple[str, int]] = []
+        for row in new_rows:
+            new_tokens.extend(_token_rows(row[0], row[4]))
+        conn.executemany("INSERT INTO names VALUES (?, ?, ?, ?, ?)", new_rows)
+        conn.executemany("INSERT INTO name_tokens VALUES (?, ?)", new_tokens)
+
+        stat = new_path.stat()
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [
+                ("source_path", str(new_path.resolve())),
+                ("source_size", str(stat.st_size)),
+                ("source_mtime", str(stat.st_mtime)),
+                ("patched_at", str(time.time())),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, output_path)
+    return {
+        "names_deleted": len(old_rows),
+        "names_inserted": len(new_rows),
+        "postings_deleted": len(old_tokens),
+        "postings_inserted": len(new_tokens),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def update_name_index(
+    old_path: Path,
+    new_path: Path,
+    index_path: Path,
+    diff: DatabaseDiff,
+    output_path: Optional[Path] = None,
+) -> Dict[str, float]:
+    """Patch the old release's token index, or rebuild it if it cannot be.
+
+    The index is only patched when its metadata shows it was built from
+    ``old_path``; otherwise it is rebuilt from ``new_path``.
+
+    Returns:
+        Statistics from ``patch_name_index`` or ``build_name_index``, with
+        ``mode`` set to "patched" or "rebuilt"
+    """
+    output_path = Path(output_path or index_path)
+    if index_path.exists() and index_is_current(index_path, old_path):
+        stats = patch_name_index(index_path, new_path, diff, output_path)
+        stats["mode"] = "patched"
+    else:
+        stats = build_name_index(new_path, output_path)
+        stats["mode"] = "rebuilt"
+    return stats
+
+
+def invalidate_codes(
+    eppocodes: Iterable[str],
+    cache: Optional[CacheBackend] = None,
+    response_cache: Optional[ResponseCache] = None,
+    clients: Iterable = (),
+) -> Dict[str, float]:
+    """Drop cached facts and answers for changed codes only.
+
+    Args:
+        eppocodes: Codes reported by ``diff_databases``
+        cache: EPPO facts cache to clean
+        response_cache: Generated answers to clean
+        clients: Running EPPOClient instances whose in-memory memo (and
+            cache) should forget the codes
+
+    Returns:
+        Dictionary with facts_removed, responses_removed and seconds
+    """
+    start = time.perf_counter()
+    eppocodes = list(eppocodes)
+    facts_removed = responses_removed = 0
+    for code in eppocodes:
+        if cache is not None:
+            facts_removed += cache.delete(code)
+        if response_cache is not None:
+            responses_removed += response_cache.invalidate(code)
+    for client in clients:
+        facts_removed += client.invalidate(eppocodes)
+    return {
+        "facts_removed": facts_removed,
+        "responses_removed": responses_removed,
+        "seconds": time.perf_counter() - start,
+    }
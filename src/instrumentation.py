@@ -0,0 +1,200 @@
+"""Per-stage pipeline timings, hooks and latency aggregation."""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from .config import Config
+
+# Called as hook(stage, seconds) once per stage when a timed diagnosis
+# finishes, in the order the stages first ran, with ``total`` last
+StageHook = Callable[[str, float], None]
+
+_hooks: List[StageHook] = []
+
+
+def add_hook(hook: StageHook):
+    """Register a callback for every timed stage in the process.
+
+    Registering any hook turns on timing for all diagnoses.
+
+    Args:
+        hook: Called with (stage, seconds), e.g. a LatencyStats or
+            ``span_hook(tracer)``
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: StageHook):
+    """Unregister a hook added with ``add_hook``."""
+    _hooks.remove(hook)
+
+
+class StageTimer:
+    """Monotonic lap timer for the stages of one diagnosis.
+
+    ``lap(stage)`` charges the time since the previous lap to ``stage``,
+    adding up if a stage repeats (e.g. fetch and validate for each
+    fallback candidate). ``finish`` reports every stage to the registered
+    hooks once, so each diagnosis adds one sample per stage. Stage names
+    are prefixed with ``prefix`` (e.g. ``"batch."``) so that timings of
+    different kinds of work do not mix in the hooks.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    @classmethod
+    def start(
+        cls, enabled: Optional[bool] = None, prefix: str = ""
+    ) -> Optional["StageTimer"]:
+        """Return a timer, or None when instrumentation is off.
+
+        Callers guard each lap with ``if timer``, so a disabled pipeline
+        pays one branch per stage and never reads the clock.
+
+        Args:
+            enabled: Force timing on or off (defaults to on when
+                Config.PIPELINE_TIMINGS is set or any hook is registered)
+            prefix: Prepended to every stage name
+        """
+        if enabled is None:
+            enabled = Config.PIPELINE_TIMINGS or bool(_hooks)
+        return cls(prefix) if enabled else None
+
+    def lap(self, stage: str):
+        """Close the current stage."""
+        now = time.perf_counter()
+        seconds = now - self._last
+        self._last = now
+        stage = self.prefix + stage
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def finish(self) -> Dict[str, float]:
+        """Record ``total``, report every stage to the hooks, return all timings."""
+        total = time.perf_counter() - self._start
+        self.timings[self.prefix + "total"] = total
+        for hook in _hooks:
+            for stage, seconds in self.timings.items():
+                hook(stage, seconds)
+        return self.timings
+
+
+class LatencyStats:
+    """Aggregates stage timings into percentiles; usable as a hook.
+
+    Keeps the most recent ``window`` samples per stage. Safe to share
+    between threads.
+    """
+
+    def __init__(self, window: int = None):
+        """Initialize latency stats.
+
+        Args:
+            window: Samples kept per stage (defaults to Config.LATENCY_WINDOW)
+        """
+        self.window = window or Config.LATENCY_WINDOW
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, seconds: float):
+        self.record(stage, seconds)
+
+    def record(self, stage: str, seconds: float):
+        """Add one sample for a stage."""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def record_timings(self, timings: Dict[str, float]):
+        """Add every stage of a DiagnosisResult.timings dictionary."""
+        for stage, seconds in timings.items():
+            self.record(stage, seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles per stage.
+
+        Returns:
+            Dictionary mapping stage to count, mean, p50, p95 and p99 in
+            seconds (nearest-rank percentiles)
+        """
+        with self._lock:
+            snapshot = {stage: sorted(s) for stage, s in self._samples.items()}
+        return {
+            stage: {
+                "count": len(samples),
+                "mean": sum(samples) / len(samples),
+                "p50": _percentile(samples, 50),
+                "p95": _percentile(samples, 95),
+                "p99": _percentile(samples, 99),
+            }
+            for stage, samples in snapshot.items()
+            if samples
+        }
+
+    def format_table(self) -> str:
+        """Render ``summary()`` as a fixed-width table in milliseconds."""
+        lines = [f"{'stage':10s} {'count':>7s} {'p50':>9s} {'p95':>9s} {'p99':>9s}"]
+        for stage, row in self.summary().items():
+            lines.append(
+                f"{stage:10s} {row['count']:7d} "
+                f"{row['p50'] * 1000:8.2f}ms {row['p95'] * 1000:8.2f}ms "
+                f"{row['p99'] * 1000:8.2f}ms"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """Drop all samples."""
+        with self._lock:
+            self._samples.clear()
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples."""
+    rank = max(1, -(-len(sorted_samples) * pct // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+def span_hook(tracer, prefix: str = "diagnose.") -> StageHook:
+    """Build a hook that emits one span per stage through a tracer.
+
+    Works with an OpenTelemetry ``Tracer`` (or anything with the same
+    ``start_span(name, start_time=...)`` / ``span.end(end_time=...)``
+    methods). Spans are created when the diagnosis finishes, with
+    explicit nanosecond timestamps: the ``total`` span ends then and the
+    stages are laid out back to back from its start, a repeated stage as
+    one span of its summed time.
+
+    Args:
+        tracer: Tracer, e.g. ``opentelemetry.trace.get_tracer(__name__)``
+        prefix: Prepended to stage names
+
+    Returns:
+        Hook for ``add_hook``
+    """
+
+    # Stages reported by the ``finish`` running on this thread, until its total
+    local = threading.local()
+
+    def hook(stage: str, seconds: float):
+        pending = getattr(local, "pending", None)
+        if pending is None:
+            pending = local.pending = []
+        if not stage.endswith("total"):
+            pending.append((stage, seconds))
+            return
+        end = time.time_ns()
+        start = cursor = end - int(seconds * 1e9)
+        for name, stage_seconds in pending:
+            span_end = cursor + int(stage_seconds * 1e9)
+            tracer.start_span(prefix + name, start_time=cursor).end(end_time=span_end)
+            cursor = span_end
+        tracer.start_span(prefix + stage, start_time=start).end(end_time=end)
+        pending.clear()
+
+    return hook
@@ -0,0 +1,181 @@
+"""Token index over EPPO names for fast candidate retrieval."""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .retrieval import INDEX_SCHEMA_VERSION, _tokenize_name, index_path_for
+
+
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE names (
+    nameid INTEGER PRIMARY KEY,
+    codeid INTEGER NOT NULL,
+    eppocode TEXT NOT NULL,
+    dtcode TEXT,
+    fullname TEXT NOT NULL
+);
+CREATE TABLE name_tokens (
+    token TEXT NOT NULL,
+    nameid INTEGER NOT NULL,
+    PRIMARY KEY (token, nameid)
+) WITHOUT ROWID;
+"""
+
+_ACTIVE_NAMES_SQL = """
+    SELECT n.nameid, c.codeid, c.eppocode, c.dtcode, n.fullname
+    FROM t_codes c
+    JOIN t_names n ON c.codeid = n.codeid
+    WHERE c.status = 'A' AND n.status = 'A'
+    ORDER BY n.nameid
+"""
+
+
+def _iter_active_names(
+    sqlite_path: Path,
+) -> Iterator[Tuple[int, int, str, str, str]]:
+    """Yield (nameid, codeid, eppocode, dtcode, fullname) for active names."""
+    conn = sqlite3.connect(str(sqlite_path))
+    try:
+        for row in conn.execute(_ACTIVE_NAMES_SQL):
+            yield row
+    finally:
+        conn.close()
+
+
+def _token_rows(nameid: int, fullname: str) -> List[Tuple[str, int]]:
+    """Return name_tokens rows for a single name."""
+    return [(token, nameid) for token in _tokenize_name(fullname)]
+
+
+def build_name_index(
+    sqlite_path: Path, index_path: Optional[Path] = None, batch_size: int = 10000
+) -> Dict[str, float]:
+    """Build the token index for an EPPO SQLite database.
+
+    The index is written to a temporary file and moved into place once
+    complete, so readers never see a partially built index.
+
+    Args:
+        sqlite_path: Path to EPPO SQLite database
+        index_path: Output path (defaults to ``index_path_for(sqlite_path)``)
+        batch_size: Number of names inserted per batch
+
+    Returns:
+        Dictionary with names, tokens, postings and seconds
+    """
+    index_path = index_path or index_path_for(sqlite_path)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.executescript(_SCHEMA)
+        name_batch: List[Tuple[int, int, str, str, str]] = []
+        token_batch: List[Tuple[str, int]] = []
+        names = 0
+        postings = 0
+
+        def flush():
+            conn.executemany(
+                "INSERT INTO names VALUES (?, ?, ?, ?, ?)", name_batch
+            )
+            conn.executemany("INSERT INTO name_tokens VALUES (?, ?)", token_batch)
+            name_batch.clear()
+            token_batch.clear()
+
+        for nameid, codeid, eppocode, dtcode, fullname in _iter_active_names(
+            sqlite_path
+        ):
+            fullname = fullname or ""
+            name_batch.append((nameid, codeid, eppocode, dtcode, fullname))
+            rows = _token_rows(nameid, fullname)
+            token_batch.extend(rows)
+            names += 1
+            postings += len(rows)
+            if len(name_batch) >= batch_size:
+                flush()
+        flush()
+
+        tokens = conn.execute(
+            "SELECT COUNT(DISTINCT token) FROM name_tokens"
+        ).fetchone()[0]
+        stat = sqlite_path.stat()
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("schema_version", str(INDEX_SCHEMA_VERSION)),
+                ("source_path", str(sqlite_path.resolve())),
+                ("source_size", str(stat.st_size)),
+                ("source_mtime", str(stat.st_mtime)),
+                ("built_at", str(time.time())),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, index_path)
+    return {
+        "names": names,
+        "tokens": tokens,
+        "postings": postings,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def read_index_meta(index_path: Path) -> Dict[str, str]:
+    """Read the meta table of a token index.
+
+    Args:
+        index_path: Path to token index
+
+    Returns:
+        Dictionary of meta keys to values (empty if the index is missing)
+    """
+    if not index_path.exists():
+        return {}
+    conn = sqlite3.connect(str(index_path))
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+
+
+def token_frequencies(sqlite_path: Path) -> Dict[str, int]:
+    """Count the active names containing each token.
+
+    Reads the token index next to the database when it exists and
+    tokenizes the active names otherwise.
+
+    Args:
+        sqlite_path: Path to EPPO SQLite database
+
+    Returns:
+        Dictionary of token to number of names
+    """
+    index_path = index_path_for(sqlite_path)
+    if index_path.exists():
+        conn = sqlite3.connect(str(index_path))
+        try:
+            return dict(
+                conn.execute("SELECT token, COUNT(*) FROM name_tokens GROUP BY token")
+            )
+        finally:
+            conn.close()
+
+    counts: Dict[str, int] = {}
+    for _, _, _, _, fullname in _iter_active_names(sqlite_path):
+        for token in _tokenize_name(fullname):
+            counts[token] = counts.get(token, 0) + 1
+    return counts
@@ -1,15 +1,25 @@
 """Label normalization for plant disease names."""
 
+import os
 import re
+import time
 from dataclasses import dataclass
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
 
 from .config import Config
 
+_SPLIT_RE = re.compile(r"[^\w]+")
+
 
 @dataclass
 class NormalizedLabel:
-    """Normalized disease label with extracted components."""
+    """Normalized disease label with extracted components.
+
+    Instances returned by ``normalize_cv_label`` are cached and shared
+    between calls; treat them as read-only.
+    """
 
     original: str
     tokens: List[str]
@@ -21,19 +31,12 @@ class NormalizedLabel:
 def _tokenize(text: str) -> List[str]:
     """Tokenize text into words of minimum length."""
     text = (text or "").strip().lower()
-    tokens = re.split(r"[^\w]+", text)
-    return [t for t in tokens if len(t) >= Config.MIN_TOKEN_LEN]
+    min_len = Config.MIN_TOKEN_LEN
+    return [t for t in _SPLIT_RE.split(text) if len(t) >= min_len]
 
 
-def normalize_cv_label(label: str) -> NormalizedLabel:
-    """Normalize a CV model's disease label.
-
-    Args:
-        label: Raw disease label from computer vision model
-
-    Returns:
-        NormalizedLabel with extracted tokens, hosts, symptoms, and locations
-    """
+def _normalize(label: str) -> NormalizedLabel:
+    """Normalize a label without consulting any cache."""
     if not (label or isinstance(label, str)):
         return NormalizedLabel(
             original=label or "",
@@ -64,4 +67,208 @@ def normalize_cv_label(label: str) -> NormalizedLabel:
         host_candidates=host_candidates,
         symptom_candidates=symptom_candidates,
         location_terms=location_terms,
-    )
\ No newline at end of file
+    )
+
+
+_cached_normalize = lru_cache(maxsize=Config.NORMALIZE_CACHE_SIZE)(_normalize)
+
+
+class CVVocabulary:
+    """Pre-normalized class list of a CV model.
+
+    Labels in the vocabulary normalize with one dictionary lookup. Bound to
+    a CompiledNameIndex, the index keeps the token ids of every class
+    resolved, so their lookups skip the token search.
+    """
+
+    def __init__(self, labels: Iterable[str] = (), path: Optional[Path] = None):
+        """Initialize vocabulary.
+
+        Args:
+            labels: CV class names
+            path: File the labels were read from (enables ``reload``)
+        """
+        self.path = Path(path) if path else None
+        self._mtime: Optional[float] = None
+        self._checked = time.monotonic()
+        self._index = None
+        self.labels: Dict[str, NormalizedLabel] = {}
+        self.hits = 0
+        self.load(labels)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CVVocabulary":
+        """Read one class name per line (blank and ``#`` lines are skipped)."""
+        vocabulary = cls(path=path)
+        vocabulary.reload()
+        return vocabulary
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.labels
+
+    def load(self, labels: Iterable[str]):
+        """Replace the class list.
+
+        The new mapping is built aside and swapped in, so concurrent
+        lookups see either the old or the new list.
+
+        Args:
+            labels: CV class names
+        """
+        mapping: Dict[str, NormalizedLabel] = {}
+        for label in labels:
+            norm = _normalize(label)
+            mapping[label] = norm
+            mapping.setdefault(norm.original, norm)
+        self.labels = mapping
+        if self._index is not None:
+            self.bind(self._index)
+
+    def reload(self) -> bool:
+        """Re-read ``path`` if it changed since the last load.
+
+        Returns:
+            True if the class list was reloaded
+        """
+        if self.path is None:
+            return False
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self._mtime:
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            labels = [
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            ]
+        self.load(labels)
+        self._mtime = mtime
+        return True
+
+    def poll(self, interval: float = None) -> bool:
+        """``reload`` if ``interval`` seconds have passed since the last check.
+
+        Cheap enough to call on every request. A class list that cannot be
+        read is left as loaded.
+
+        Args:
+            interval: Seconds between checks (defaults to
+                Config.CV_CLASSES_RELOAD_INTERVAL)
+
+        Returns:
+            True if the class list was reloaded
+        """
+        if interval is None:
+            interval = Config.CV_CLASSES_RELOAD_INTERVAL
+        now = time.monotonic()
+        if now - self._checked < interval:
+            return False
+        self._checked = now
+        try:
+            return self.reload()
+        except OSError:
+            return False
+
+    def bind(self, index: Any):
+        """Pin the tokens of every class in a compiled retrieval index.
+
+        Args:
+            index: CompiledNameIndex (other retrievers have no token ids and
+                are ignored)
+        """
+        self._index = index
+        if hasattr(index, "pin_tokens"):
+            index.pin_tokens(
+                {token for norm in self.labels.values() for token in norm.tokens}
+            )
+
+    def get(self, label: str) -> Optional[NormalizedLabel]:
+        """Return the pre-normalized class, or None if ``label`` is not one."""
+        norm = self.labels.get(label)
+        if norm is not None:
+            self.hits += 1
+        return norm
+
+
+_vocabulary: Optional[CVVocabulary] = None
+
+
+def set_vocabulary(vocabulary: Optional[CVVocabulary]):
+    """Install the process-wide CV class vocabulary (None removes it)."""
+    global _vocabulary
+    _vocabulary = vocabulary
+
+
+def get_vocabulary() -> Optional[CVVocabulary]:
+    """Return the process-wide CV class vocabulary, if any."""
+    return _vocabulary
+
+
+def load_vocabulary(path: Path = None) -> Optional[CVVocabulary]:
+    """Load and install the class list at startup.
+
+    Args:
+        path: One class name per line (defaults to Config.CV_CLASSES_PATH)
+
+    Returns:
+        The installed vocabulary, or None if no path is configured
+    """
+    path = path or Config.CV_CLASSES_PATH
+    if path is None:
+        return None
+    vocabulary = CVVocabulary.from_file(path)
+    set_vocabulary(vocabulary)
+    return vocabulary
+
+
+def normalize_cv_label(label: str) -> NormalizedLabel:
+    """Normalize a CV model's disease label.
+
+    Labels in the installed CVVocabulary are a dictionary lookup; others go
+    through a bounded LRU memo (Config.NORMALIZE_CACHE_SIZE entries). The
+    returned NormalizedLabel is shared between calls.
+
+    Args:
+        label: Raw disease label from computer vision model
+
+    Returns:
+        NormalizedLabel with extracted tokens, hosts, symptoms, and locations
+    """
+    vocabulary = _vocabulary
+    if vocabulary is not None:
+        norm = vocabulary.get(label)
+        if norm is not None:
+            return norm
+    try:
+        return _cached_normalize(label)
+    except TypeError:
+        # Unhashable input; normalize without caching
+        return _normalize(label)
+
+
+def clear_normalization_cache():
+    """Drop memoized labels, e.g. after changing Config's term lists."""
+    _cached_normalize.cache_clear()
+
+
+def normalization_stats() -> Dict[str, Any]:
+    """Return vocabulary and memo hit counts.
+
+    Returns:
+        Dictionary with vocabulary_size, vocabulary_hits, cache_hits,
+        cache_misses, cache_size and hit_rate (share of calls answered
+        without normalizing)
+    """
+    info = _cached_normalize.cache_info()
+    vocabulary = _vocabulary
+    vocabulary_hits = vocabulary.hits if vocabulary is not None else 0
+    calls = vocabulary_hits + info.hits + info.misses
+    return {
+        "vocabulary_size": len(vocabulary) if vocabulary is not None else 0,
+        "vocabulary_hits": vocabulary_hits,
+        "cache_hits": info.hits,
+        "cache_misses": info.misses,
+        "cache_size": info.currsize,
+        "hit_rate": (vocabulary_hits + info.hits) / calls if calls else 0.0,
+    }
@@ -1,14 +1,19 @@
 """Main diagnosis pipeline."""
 
-from dataclasses import dataclass
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 from .config import Config
-from .eppo_client import EPPOClient
-from .generation import ResponseGenerator
-from .normalization import normalize_cv_label
-from .retrieval import query_candidates, select_best
+from .eppo_client import AsyncEPPOClient, EPPOClient
+from .fuzzy import correct_label
+from .generation import AsyncResponseGenerator, ResponseGenerator
+from .instrumentation import StageTimer
+from .normalization import NormalizedLabel, normalize_cv_label
+from .retrieval import Candidate, get_session, select_best
 from .validation import validate_eppo_against_label
 
 # Refusal messages
@@ -34,6 +39,193 @@ class DiagnosisResult:
     message: str
     eppocode: Optional[str] = None
     confidence: Optional[float] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+def _low_confidence(candidates: List[Candidate]) -> DiagnosisResult:
+    """Build the refusal for a label with no candidate above threshold."""
+    return DiagnosisResult(
+        refused=True,
+        message=REFUSAL_LOW_CONFIDENCE,
+        confidence=candidates[0].score if candidates else None,
+    )
+
+
+def _check_facts(
+    facts: Dict[str, Any], norm: NormalizedLabel, eppocode: str
+) -> Optional[DiagnosisResult]:
+    """Return a refusal if facts are missing or do not support the label."""
+    if not facts.get("overview"):
+        return DiagnosisResult(
+            refused=True,
+            message=REFUSAL_EPPO_FAILED,
+            eppocode=eppocode,
+        )
+    if not validate_eppo_against_label(facts, norm, min_token_overlap=1):
+        return DiagnosisResult(
+            refused=True,
+            message=REFUSAL_VALIDATION_FAILED,
+            eppocode=eppocode,
+        )
+    return None
+
+
+def _with_timings(
+    result: DiagnosisResult, timer: Optional[StageTimer]
+) -> DiagnosisResult:
+    """Attach stage timings to a result when instrumentation is on."""
+    if timer:
+        result.timings = timer.finish()
+    return result
+
+
+def _alternates(
+    candidates: List[Candidate], best: Candidate, k: int, threshold: float
+) -> List[Candidate]:
+    """Runner-up candidates worth fetching speculatively.
+
+    Takes candidates ranked 2..k that clear the threshold, score within
+    Config.PREFETCH_SCORE_MARGIN of the best and have a distinct code.
+    """
+    seen = {best.eppocode}
+    alternates = []
+    for candidate in candidates[1:k]:
+        if candidate.score < threshold:
+            break
+        if best.score - candidate.score > Config.PREFETCH_SCORE_MARGIN:
+            break
+        if candidate.eppocode not in seen:
+            seen.add(candidate.eppocode)
+            alternates.append(candidate)
+    return alternates
+
+
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+_prefetch_lock = threading.Lock()
+
+
+def _get_prefetch_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool for speculative EPPO fetches."""
+    global _prefetch_executor
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(
+                max_workers=Config.PREFETCH_WORKERS,
+                thread_name_prefix="eppo-prefetch",
+            )
+        return _prefetch_executor
+
+
+def _fetch_and_check(
+    eppo_client: EPPOClient,
+    norm: NormalizedLabel,
+    candidates: List[Candidate],
+    best: Candidate,
+    prefetch_k: int,
+    threshold: float,
+    timer: Optional[StageTimer] = None,
+    speculative: Optional[List[Future]] = None,
+    facts: Optional[Dict[str, Any]] = None,
+) -> Tuple[Candidate, Dict[str, Any], Optional[DiagnosisResult]]:
+    """Fetch facts for the best candidate, falling back to close runners-up.
+
+    With ``prefetch_k`` above 1, facts for the runners-up are fetched in the
+    background while the best candidate's are fetched. If the best fails
+    validation, the runners-up are validated in rank order and the first
+    that passes is used instead.
+
+    Args:
+        speculative: Receives the runner-up fetches, which may still be
+            running on return; wait for them before closing ``eppo_client``
+        facts: Facts already fetched for ``best``, if any
+
+    Returns:
+        Tuple of (chosen candidate, its facts, refusal or None)
+    """
+    alternates = _alternates(candidates, best, prefetch_k, threshold)
+    executor = _get_prefetch_executor() if alternates else None
+    futures = [
+        (c, executor.submit(eppo_client.fetch_facts, c.eppocode)) for c in alternates
+    ]
+    if speculative is not None:
+        speculative.extend(future for _, future in futures)
+
+    if facts is None:
+        facts = eppo_client.fetch_facts(best.eppocode)
+        if timer:
+            timer.lap("fetch")
+    refusal = _check_facts(facts, norm, best.eppocode)
+    if timer:
+        timer.lap("validate")
+    if refusal is None:
+        return best, facts, None
+
+    for candidate, future in futures:
+        alt_facts = future.result()
+        if timer:
+            timer.lap("fetch")
+        alt_refusal = _check_facts(alt_facts, norm, candidate.eppocode)
+        if timer:
+            timer.lap("validate")
+        if alt_refusal is None:
+            return candidate, alt_facts, None
+    return best, facts, refusal
+
+
+# Strong references to speculative fetches that outlive their request
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _forget_task(task: asyncio.Task) -> None:
+    """Drop a finished background fetch, retrieving its exception."""
+    _background_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _afetch_and_check(
+    eppo_client: AsyncEPPOClient,
+    norm: NormalizedLabel,
+    candidates: List[Candidate],
+    best: Candidate,
+    prefetch_k: int,
+    threshold: float,
+    timer: Optional[StageTimer] = None,
+    speculative: Optional[List[asyncio.Task]] = None,
+) -> Tuple[Candidate, Dict[str, Any], Optional[DiagnosisResult]]:
+    """Async ``_fetch_and_check``; runner-up fetches run as tasks."""
+    alternates = _alternates(candidates, best, prefetch_k, threshold)
+    tasks = [
+        (c, asyncio.ensure_future(eppo_client.fetch_facts(c.eppocode)))
+        for c in alternates
+    ]
+    # Runner-up fetches are not cancelled when the best candidate passes:
+    # they may lead a load other requests wait on, and they warm the cache.
+    for _, task in tasks:
+        _background_tasks.add(task)
+        task.add_done_callback(_forget_task)
+    if speculative is not None:
+        speculative.extend(task for _, task in tasks)
+
+    facts = await eppo_client.fetch_facts(best.eppocode)
+    if timer:
+        timer.lap("fetch")
+    refusal = _check_facts(facts, norm, best.eppocode)
+    if timer:
+        timer.lap("validate")
+    if refusal is None:
+        return best, facts, None
+
+    for candidate, task in tasks:
+        alt_facts = await task
+        if timer:
+            timer.lap("fetch")
+        alt_refusal = _check_facts(alt_facts, norm, candidate.eppocode)
+        if timer:
+            timer.lap("validate")
+        if alt_refusal is None:
+            return candidate, alt_facts, None
+    return best, facts, refusal
 
 
 def diagnose(
@@ -43,6 +235,9 @@ def diagnose(
     confidence_threshold: float = None,
     eppo_client: Optional[EPPOClient] = None,
     generator: Optional[ResponseGenerator] = None,
+    retriever=None,
+    prefetch_k: int = None,
+    timings: bool = None,
 ) -> DiagnosisResult:
     """Diagnose a plant disease from a CV model label.
 
@@ -53,6 +248,15 @@ def diagnose(
         confidence_threshold: Minimum confidence threshold (defaults to Config.CONFIDENCE_THRESHOLD)
         eppo_client: EPPO client instance (creates new if None)
         generator: Response generator instance (creates new if None)
+        retriever: Candidate index with a ``query(norm)`` method such as
+            RetrievalSession or CompiledNameIndex (uses the shared session
+            for sqlite_path if None)
+        prefetch_k: Fetch facts for up to this many top candidates at once
+            and fall back to the next one that passes validation when the
+            best fails (defaults to Config.PREFETCH_TOP_K; 1 disables)
+        timings: Record per-stage seconds in ``DiagnosisResult.timings``
+            and report them to registered hooks (defaults to on when
+            Config.PIPELINE_TIMINGS is set or a hook is registered)
 
     Returns:
         DiagnosisResult with diagnosis information
@@ -61,52 +265,466 @@ def diagnose(
     sqlite_path = sqlite_path or Config.SQLITE_PATH
     cache_dir = cache_dir or Config.EPPO_CACHE_DIR
     confidence_threshold = confidence_threshold or Config.CONFIDENCE_THRESHOLD
+    prefetch_k = prefetch_k or Config.PREFETCH_TOP_K
 
-    # Initialize clients if not provided
+    # Initialize clients if not provided; close the ones created here
+    owned = []
     if eppo_client is None:
         eppo_client = EPPOClient(cache_dir=cache_dir)
+        owned.append(eppo_client)
     if generator is None:
         generator = ResponseGenerator()
+        owned.append(generator)
+    if retriever is None:
+        retriever = get_session(sqlite_path)
 
-    # Step 1: Normalize label
-    norm = normalize_cv_label(cv_label)
-    if not norm.tokens:
-        return DiagnosisResult(refused=True, message=REFUSAL_NO_CANDIDATES)
+    # Runner-up fetches still running when the diagnosis is done
+    speculative: List[Future] = []
+    timer = StageTimer.start(timings)
+    try:
+        # Step 1: Normalize label
+        norm = correct_label(normalize_cv_label(cv_label))
+        if timer:
+            timer.lap("normalize")
+        if not norm.tokens:
+            return _with_timings(
+                DiagnosisResult(refused=True, message=REFUSAL_NO_CANDIDATES), timer
+            )
 
-    # Step 2: Query candidates
-    candidates = query_candidates(sqlite_path, norm)
+        # Step 2: Query candidates
+        candidates = retriever.query(norm)
+        if timer:
+            timer.lap("retrieve")
 
-    # Step 3: Select best candidate
-    best = select_best(candidates, confidence_threshold)
-    if best is None:
-        return DiagnosisResult(
-            refused=True,
-            message=REFUSAL_LOW_CONFIDENCE,
-            confidence=candidates[0].score if candidates else None,
+        # Step 3: Select best candidate
+        best = select_best(candidates, confidence_threshold)
+        if timer:
+            timer.lap("select")
+        if best is None:
+            return _with_timings(_low_confidence(candidates), timer)
+
+        # Steps 4-5: Fetch EPPO facts and validate them against the label
+        best, facts, refusal = _fetch_and_check(
+            eppo_client,
+            norm,
+            candidates,
+            best,
+            prefetch_k,
+            confidence_threshold,
+            timer,
+            speculative,
         )
+        if refusal is not None:
+            return _with_timings(refusal, timer)
 
-    # Step 4: Fetch EPPO facts
-    facts = eppo_client.fetch_facts(best.eppocode)
-    if not facts.get("overview"):
-        return DiagnosisResult(
-            refused=True,
-            message=REFUSAL_EPPO_FAILED,
-            eppocode=best.eppocode,
+        # Step 6: Generate response
+        answer = generator.generate(cv_label, facts)
+        if timer:
+            timer.lap("generate")
+        return _with_timings(
+            DiagnosisResult(
+                refused=False,
+                message=answer,
+                eppocode=best.eppocode,
+                confidence=best.score,
+            ),
+            timer,
         )
+    finally:
+        if eppo_client in owned:
+            # They use the client closed below
+            wait(speculative)
+        for client in owned:
+            client.close()
 
-    # Step 5: Validate facts against label
-    if not validate_eppo_against_label(facts, norm, min_token_overlap=1):
-        return DiagnosisResult(
-            refused=True,
-            message=REFUSAL_VALIDATION_FAILED,
+
+def diagnose_stream(
+    cv_label: str,
+    sqlite_path: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    confidence_threshold: float = None,
+    eppo_client: Optional[EPPOClient] = None,
+    generator: Optional[ResponseGenerator] = None,
+    retriever=None,
+    prefetch_k: int = None,
+    timings: bool = None,
+) -> Iterator[Union[DiagnosisResult, str]]:
+    """Diagnose a CV label, streaming the generated response.
+
+    The first item is a DiagnosisResult available as soon as retrieval and
+    validation finish. A refusal is complete and ends the stream. A
+    verified result carries eppocode and confidence with an empty message,
+    followed by the response text as chunks arrive from the LLM.
+
+    Args:
+        cv_label: Disease label from computer vision model
+        sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+        cache_dir: Cache directory (defaults to Config.EPPO_CACHE_DIR)
+        confidence_threshold: Minimum confidence threshold (defaults to Config.CONFIDENCE_THRESHOLD)
+        eppo_client: EPPO client instance (creates new if None)
+        generator: Response generator instance (creates new if None)
+        retriever: Candidate index with a ``query(norm)`` method (uses the
+            shared session for sqlite_path if None)
+        prefetch_k: Fetch facts for up to this many top candidates at once
+            and fall back to the next one that passes validation when the
+            best fails (defaults to Config.PREFETCH_TOP_K; 1 disables)
+        timings: Record per-stage seconds in ``DiagnosisResult.timings``
+            and report them to registered hooks (defaults to on when
+            Config.PIPELINE_TIMINGS is set or a hook is registered)
+
+    Yields:
+        One DiagnosisResult, then response text chunks if verified
+    """
+    sqlite_path = sqlite_path or Config.SQLITE_PATH
+    cache_dir = cache_dir or Config.EPPO_CACHE_DIR
+    confidence_threshold = confidence_threshold or Config.CONFIDENCE_THRESHOLD
+    prefetch_k = prefetch_k or Config.PREFETCH_TOP_K
+
+    owned = []
+    if eppo_client is None:
+        eppo_client = EPPOClient(cache_dir=cache_dir)
+        owned.append(eppo_client)
+    if generator is None:
+        generator = ResponseGenerator()
+        owned.append(generator)
+    if retriever is None:
+        retriever = get_session(sqlite_path)
+
+    # Runner-up fetches still running when the diagnosis is done
+    speculative: List[Future] = []
+    timer = StageTimer.start(timings)
+    try:
+        # Step 1: Normalize label
+        norm = correct_label(normalize_cv_label(cv_label))
+        if timer:
+            timer.lap("normalize")
+        if not norm.tokens:
+            yield _with_timings(
+                DiagnosisResult(refused=True, message=REFUSAL_NO_CANDIDATES), timer
+            )
+            return
+
+        # Step 2: Query candidates
+        candidates = retriever.query(norm)
+        if timer:
+            timer.lap("retrieve")
+
+        # Step 3: Select best candidate
+        best = select_best(candidates, confidence_threshold)
+        if timer:
+            timer.lap("select")
+        if best is None:
+            yield _with_timings(_low_confidence(candidates), timer)
+            return
+
+        # Steps 4-5: Fetch EPPO facts and validate them against the label
+        best, facts, refusal = _fetch_and_check(
+            eppo_client,
+            norm,
+            candidates,
+            best,
+            prefetch_k,
+            confidence_threshold,
+            timer,
+            speculative,
+        )
+        if refusal is not None:
+            yield _with_timings(refusal, timer)
+            return
+
+        # Step 6: Stream response. The verdict carries the timings so far
+        # (they keep updating); generation is reported to hooks on completion.
+        verdict = DiagnosisResult(
+            refused=False,
+            message="",
             eppocode=best.eppocode,
+            confidence=best.score,
+            timings=timer.timings if timer else None,
         )
+        yield verdict
+        yield from generator.generate_stream(cv_label, facts)
+        if timer:
+            timer.lap("generate")
+            timer.finish()
+    finally:
+        if eppo_client in owned:
+            # They use the client closed below
+            wait(speculative)
+        for client in owned:
+            client.close()
 
-    # Step 6: Generate response
-    answer = generator.generate(cv_label, facts)
-    return DiagnosisResult(
-        refused=False,
-        message=answer,
-        eppocode=best.eppocode,
-        confidence=best.score,
-    )
\ No newline at end of file
+
+async def adiagnose(
+    cv_label: str,
+    sqlite_path: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    confidence_threshold: float = None,
+    eppo_client: Optional[AsyncEPPOClient] = None,
+    generator: Optional[AsyncResponseGenerator] = None,
+    retriever=None,
+    prefetch_k: int = None,
+    timings: bool = None,
+) -> DiagnosisResult:
+    """Diagnose a plant disease from a CV model label without blocking.
+
+    Same steps and refusals as ``diagnose``. Retrieval runs in a worker
+    thread, and the three EPPO endpoints are fetched concurrently. Clients
+    created here share one semaphore and are closed before returning.
+    Pass long-lived clients when diagnosing many labels.
+
+    Args:
+        cv_label: Disease label from computer vision model
+        sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+        cache_dir: Cache directory (defaults to Config.EPPO_CACHE_DIR)
+        confidence_threshold: Minimum confidence threshold (defaults to Config.CONFIDENCE_THRESHOLD)
+        eppo_client: Async EPPO client instance (creates new if None)
+        generator: Async response generator instance (creates new if None)
+        retriever: Candidate index with a ``query(norm)`` method (uses the
+            shared session for sqlite_path if None)
+        prefetch_k: Fetch facts for up to this many top candidates at once
+            and fall back to the next one that passes validation when the
+            best fails (defaults to Config.PREFETCH_TOP_K; 1 disables)
+        timings: Record per-stage seconds in ``DiagnosisResult.timings``
+            and report them to registered hooks (defaults to on when
+            Config.PIPELINE_TIMINGS is set or a hook is registered)
+
+    Returns:
+        DiagnosisResult with diagnosis information
+    """
+    sqlite_path = sqlite_path or Config.SQLITE_PATH
+    cache_dir = cache_dir or Config.EPPO_CACHE_DIR
+    confidence_threshold = confidence_threshold or Config.CONFIDENCE_THRESHOLD
+    prefetch_k = prefetch_k or Config.PREFETCH_TOP_K
+
+    owned = []
+    semaphore = asyncio.Semaphore(Config.ASYNC_MAX_CONCURRENCY)
+    if eppo_client is None:
+        eppo_client = AsyncEPPOClient(cache_dir=cache_dir, semaphore=semaphore)
+        owned.append(eppo_client)
+    if generator is None:
+        generator = AsyncResponseGenerator(semaphore=semaphore)
+        owned.append(generator)
+    if retriever is None:
+        retriever = get_session(sqlite_path)
+
+    # Runner-up fetches still running when the diagnosis is done
+    speculative: List[asyncio.Task] = []
+    timer = StageTimer.start(timings)
+    try:
+        # Step 1: Normalize label
+        norm = correct_label(normalize_cv_label(cv_label))
+        if timer:
+            timer.lap("normalize")
+        if not norm.tokens:
+            return _with_timings(
+                DiagnosisResult(refused=True, message=REFUSAL_NO_CANDIDATES), timer
+            )
+
+        # Step 2: Query candidates
+        candidates = await asyncio.to_thread(retriever.query, norm)
+        if timer:
+            timer.lap("retrieve")
+
+        # Step 3: Select best candidate
+        best = select_best(candidates, confidence_threshold)
+        if timer:
+            timer.lap("select")
+        if best is None:
+            return _with_timings(_low_confidence(candidates), timer)
+
+        # Steps 4-5: Fetch EPPO facts and validate them against the label
+        best, facts, refusal = await _afetch_and_check(
+            eppo_client,
+            norm,
+            candidates,
+            best,
+            prefetch_k,
+            confidence_threshold,
+            timer,
+            speculative,
+        )
+        if refusal is not None:
+            return _with_timings(refusal, timer)
+
+        # Step 6: Generate response
+        answer = await generator.generate(cv_label, facts)
+        if timer:
+            timer.lap("generate")
+        return _with_timings(
+            DiagnosisResult(
+                refused=False,
+                message=answer,
+                eppocode=best.eppocode,
+                confidence=best.score,
+            ),
+            timer,
+        )
+    finally:
+        if eppo_client in owned:
+            # They use the client closed below
+            await asyncio.gather(*speculative, return_exceptions=True)
+        for client in owned:
+            await client.aclose()
+
+
+def _label_key(norm: NormalizedLabel) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Key under which two labels normalize to the same query."""
+    return (tuple(norm.tokens), tuple(norm.location_terms))
+
+
+def diagnose_batch(
+    labels: Sequence[str],
+    sqlite_path: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    confidence_threshold: float = None,
+    eppo_client: Optional[EPPOClient] = None,
+    generator: Optional[ResponseGenerator] = None,
+    retriever=None,
+    prefetch_k: int = None,
+    timings: bool = None,
+) -> List[DiagnosisResult]:
+    """Diagnose a batch of CV labels, sharing work between duplicates.
+
+    Labels that normalize to the same query share retrieval and
+    validation, candidates for all distinct queries are retrieved in one
+    pass, and each EPPO code's facts are fetched once. A response is
+    generated once per distinct label, as ``diagnose`` would for it.
+
+    Args:
+        labels: Disease labels from computer vision model
+        sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+        cache_dir: Cache directory (defaults to Config.EPPO_CACHE_DIR)
+        confidence_threshold: Minimum confidence threshold (defaults to Config.CONFIDENCE_THRESHOLD)
+        eppo_client: EPPO client instance (creates new if None)
+        generator: Response generator instance (creates new if None)
+        retriever: Candidate index with ``query``/``query_many`` methods
+            (uses the shared session for sqlite_path if None)
+        prefetch_k: Fall back to the next of up to this many top candidates
+            that passes validation when the best fails, as ``diagnose``
+            does (defaults to Config.PREFETCH_TOP_K; 1 disables)
+        timings: Record batch-wide seconds per stage, as ``batch.normalize``
+            ... ``batch.total``, and report them to registered hooks
+            (defaults to on when Config.PIPELINE_TIMINGS is set or a hook
+            is registered)
+
+    Returns:
+        One DiagnosisResult per label, in input order, each a separate
+        object. ``timings``, when recorded, are the batch-wide ones.
+    """
+    sqlite_path = sqlite_path or Config.SQLITE_PATH
+    cache_dir = cache_dir or Config.EPPO_CACHE_DIR
+    confidence_threshold = confidence_threshold or Config.CONFIDENCE_THRESHOLD
+    prefetch_k = prefetch_k or Config.PREFETCH_TOP_K
+
+    owned = []
+    if eppo_client is None:
+        eppo_client = EPPOClient(cache_dir=cache_dir)
+        owned.append(eppo_client)
+    if generator is None:
+        generator = ResponseGenerator()
+        owned.append(generator)
+    if retriever is None:
+        retriever = get_session(sqlite_path)
+
+    timer = StageTimer.start(timings, prefix="batch.")
+    try:
+        # Step 1: Normalize labels and group duplicates
+        keys: List[Tuple] = []
+        norms: Dict[Tuple, NormalizedLabel] = {}
+        for label in labels:
+            norm = correct_label(normalize_cv_label(label))
+            key = _label_key(norm)
+            keys.append(key)
+            norms.setdefault(key, norm)
+        if timer:
+            timer.lap("normalize")
+
+        outcomes: Dict[Tuple, DiagnosisResult] = {}
+        searchable: List[Tuple] = []
+        for key, norm in norms.items():
+            if norm.tokens:
+                searchable.append(key)
+            else:
+                outcomes[key] = DiagnosisResult(
+                    refused=True, message=REFUSAL_NO_CANDIDATES
+                )
+
+        # Step 2: Query candidates for all distinct labels
+        search_norms = [norms[key] for key in searchable]
+        if hasattr(retriever, "query_many"):
+            candidate_lists = retriever.query_many(search_norms)
+        else:
+            candidate_lists = [retriever.query(norm) for norm in search_norms]
+        if timer:
+            timer.lap("retrieve")
+
+        # Step 3: Select best candidate (and runners-up) per label
+        ranked: Dict[Tuple, List[Candidate]] = {}
+        for key, candidates in zip(searchable, candidate_lists):
+            best = select_best(candidates, confidence_threshold)
+            if best is None:
+                outcomes[key] = _low_confidence(candidates)
+            else:
+                ranked[key] = [best] + _alternates(
+                    candidates, best, prefetch_k, confidence_threshold
+                )
+        if timer:
+            timer.lap("select")
+
+        # Step 4: Fetch EPPO facts once per best code
+        facts_by_code: Dict[str, Dict[str, Any]] = {}
+        for choices in ranked.values():
+            code = choices[0].eppocode
+            if code not in facts_by_code:
+                facts_by_code[code] = eppo_client.fetch_facts(code)
+        if timer:
+            timer.lap("fetch")
+
+        # Step 5: Validate facts against each label, falling back to
+        # runners-up (fetched once per code, when needed) like diagnose
+        chosen: Dict[Tuple, Candidate] = {}
+        for key, choices in ranked.items():
+            refusal = None
+            for candidate in choices:
+                code = candidate.eppocode
+                if code not in facts_by_code:
+                    facts_by_code[code] = eppo_client.fetch_facts(code)
+                candidate_refusal = _check_facts(facts_by_code[code], norms[key], code)
+                if candidate_refusal is None:
+                    chosen[key] = candidate
+                    break
+                refusal = refusal or candidate_refusal
+            else:
+                outcomes[key] = refusal
+        if timer:
+            timer.lap("validate")
+
+        # Step 6: Generate one response per distinct raw label
+        answers: Dict[str, str] = {}
+        for label, key in zip(labels, keys):
+            if key in chosen and label not in answers:
+                answers[label] = generator.generate(
+                    label, facts_by_code[chosen[key].eppocode]
+                )
+        if timer:
+            timer.lap("generate")
+        batch_timings = timer.finish() if timer else None
+
+        results = []
+        for label, key in zip(labels, keys):
+            if key in chosen:
+                result = DiagnosisResult(
+                    refused=False,
+                    message=answers[label],
+                    eppocode=chosen[key].eppocode,
+                    confidence=chosen[key].score,
+                )
+            else:
+                result = replace(outcomes[key])
+            if batch_timings is not None:
+                result.timings = dict(batch_timings)
+            results.append(result)
+        return results
+    finally:
+        for client in owned:
+            client.close()
@@ -0,0 +1,192 @@
+"""Bulk prefetch of EPPO facts into the EPPO facts cache."""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .config import Config
+from .eppo_client import AsyncEPPOClient
+from .fuzzy import correct_label
+from .normalization import normalize_cv_label
+from .retrieval import RetrievalSession
+
+ENDPOINTS = ("overview", "names", "hosts")
+
+
+def resolve_labels(
+    labels: Sequence[str],
+    sqlite_path: Path = None,
+    top_k: int = 1,
+    threshold: float = None,
+) -> Tuple[List[str], List[str]]:
+    """Resolve CV labels to the EPPO codes the pipeline would fetch.
+
+    Labels are corrected by the installed token resolver, as in ``diagnose``.
+
+    Args:
+        labels: Disease labels
+        sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+        top_k: Codes to keep per label (more than 1 also warms runner-up candidates)
+        threshold: Minimum candidate score (defaults to Config.CONFIDENCE_THRESHOLD)
+
+    Returns:
+        Tuple of (codes in first-seen order without duplicates, labels that
+        resolved to no code above threshold)
+    """
+    sqlite_path = sqlite_path or Config.SQLITE_PATH
+    threshold = Config.CONFIDENCE_THRESHOLD if threshold is None else threshold
+
+    codes: Dict[str, None] = {}
+    unresolved = []
+    norms = [correct_label(normalize_cv_label(label)) for label in labels]
+    with RetrievalSession(sqlite_path) as session:
+        results = session.query_many(norms)
+    for label, candidates in zip(labels, results):
+        kept = [c for c in candidates[:top_k] if c.score >= threshold]
+        if not kept:
+            unresolved.append(label)
+        for candidate in kept:
+            codes.setdefault(candidate.eppocode, None)
+    return list(codes), unresolved
+
+
+def load_progress(progress_file: Path) -> Set[str]:
+    """Read the codes already fetched completely from a progress file.
+
+    Args:
+        progress_file: JSON-lines file written by ``prefetch_codes``
+
+    Returns:
+        Set of EPPO codes recorded as complete
+    """
+    done = set()
+    try:
+        with open(progress_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A partial last line from an interrupted run
+                    continue
+                if record.get("ok"):
+                    done.add(record["eppocode"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+async def _prefetch_code(
+    client: AsyncEPPOClient, eppocode: str
+) -> List[str]:
+    """Fetch every endpoint of one code; return the endpoints that failed.
+
+    Once all endpoints are in, the facts' derived artifacts are stored in
+    the cache as well.
+    """
+    entries = await asyncio.gather(
+        *(client._get_entry(eppocode, endpoint) for endpoint in ENDPOINTS)
+    )
+    missing = [ep for ep, (data, _) in zip(ENDPOINTS, entries) if data is None]
+    if not missing:
+        await asyncio.to_thread(
+            client._attach_derived, eppocode, *client._assemble_entries(entries)
+        )
+    return missing
+
+
+async def prefetch_codes(
+    codes: Iterable[str],
+    client: AsyncEPPOClient,
+    progress_file: Optional[Path] = None,
+    workers: int = None,
+    on_progress=None,
+) -> Dict[str, Any]:
+    """Fetch overview, names and hosts for many codes into the cache.
+
+    Requests go through the client's rate limiter and semaphore. Codes
+    already recorded as complete in ``progress_file`` are skipped, and each
+    finished code is appended to it, so an interrupted run can resume.
+
+    Args:
+        codes: EPPO codes to fetch
+        client: Async EPPO client writing to the cache to warm
+        progress_file: JSON-lines progress file (no resume if None)
+        workers: Codes in flight at once (defaults to Config.ASYNC_MAX_CONCURRENCY)
+        on_progress: Called with (done, total) after each code
+
+    Returns:
+        Dictionary with total, skipped, fetched, failed (code to failed
+        endpoints), seconds and codes_per_second
+    """
+    workers = workers or Config.ASYNC_MAX_CONCURRENCY
+    codes = list(dict.fromkeys(codes))
+    done = load_progress(progress_file) if progress_file else set()
+    pending = [code for code in codes if code not in done]
+
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for code in pending:
+        queue.put_nowait(code)
+
+    failed: Dict[str, List[str]] = {}
+    completed = 0
+    progress = None
+    if progress_file is not None:
+        Path(progress_file).parent.mkdir(parents=True, exist_ok=True)
+        progress = open(progress_file, "a", encoding="utf-8")
+
+    async def worker():
+        nonlocal completed
+        while True:
+            try:
+                code = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            missing = await _prefetch_code(client, code)
+            if missing:
+                failed[code] = missing
+            if progress is not None:
+                progress.write(json.dumps({"eppocode": code, "ok": not missing}) + "\n")
+                progress.flush()
+            completed += 1
+            if on_progress is not None:
+                on_progress(completed, len(pending))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(pending)) or 1)))
+    finally:
+        if progress is not None:
+            progress.close()
+    seconds = time.perf_counter() - start
+
+    return {
+        "total": len(codes),
+        "skipped": len(codes) - len(pending),
+        "fetched": completed - len(failed),
+        "failed": failed,
+        "seconds": seconds,
+        "codes_per_second": completed / seconds if seconds > 0 else 0.0,
+    }
+
+
+def write_manifest(
+    path: Path, failed: Dict[str, List[str]], unresolved: Sequence[str] = ()
+):
+    """Write the codes and labels that could not be prefetched.
+
+    Args:
+        path: Output JSON file
+        failed: Code to list of endpoints that failed
+        unresolved: Labels that resolved to no EPPO code
+    """
+    manifest = {
+        "failed": [
+            {"eppocode": code, "endpoints": endpoints}
+            for code, endpoints in sorted(failed.items())
+        ],
+        "unresolved_labels": list(unresolved),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
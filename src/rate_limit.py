@@ -0,0 +1,218 @@
+"""Token-bucket rate limiting for EPPO API requests."""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+from .config import Config
+
+
+class RateLimiter:
+    """Token bucket shared by every thread that holds a reference to it.
+
+    The bucket refills at ``rate`` tokens per second up to ``burst``. An
+    idle process therefore starts with a full burst and pays no delay.
+    Callers reserve a token and sleep only for the deficit. With
+    ``state_file`` set, the bucket lives in that file under an exclusive
+    ``flock``, so all processes using the file share one budget (POSIX
+    only).
+    """
+
+    def __init__(
+        self,
+        rate: float = None,
+        burst: float = None,
+        state_file: Optional[Path] = None,
+    ):
+        """Initialize rate limiter.
+
+        Args:
+            rate: Tokens added per second (defaults to Config.EPPO_RATE_PER_SECOND)
+            burst: Bucket capacity (defaults to Config.EPPO_RATE_BURST)
+            state_file: Shared state file for cross-process limiting
+        """
+        self.rate = rate or Config.EPPO_RATE_PER_SECOND
+        self.burst = burst or Config.EPPO_RATE_BURST
+        self.state_file = Path(state_file) if state_file else None
+        if self.state_file is not None and not HAS_FCNTL:
+            raise RuntimeError("Cross-process rate limiting requires fcntl (POSIX)")
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = self._clock()
+        self._blocked_until = 0.0
+
+    def _clock(self) -> float:
+        """Current time for bucket state.
+
+        Monotonic in process, so wall-clock steps (NTP, manual changes)
+        neither stall callers nor hand out free tokens; wall-clock time
+        for the state file, whose timestamps other processes compare.
+        """
+        return time.monotonic() if self.state_file is None else time.time()
+
+    def _take(
+        self, tokens: float, updated: float, blocked_until: float, now: float
+    ):
+        """Apply one reservation to bucket state.
+
+        Returns:
+            Tuple of (wait_seconds, tokens, updated)
+        """
+        # A wall clock stepped back must not drain the (file-backed) bucket
+        elapsed = max(0.0, now - updated)
+        tokens = min(self.burst, tokens + elapsed * self.rate) - 1.0
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return max(wait, blocked_until - now), tokens, now
+
+    def _read_state(self, f) -> tuple:
+        """Read (tokens, updated, blocked_until) from the state file."""
+        f.seek(0)
+        try:
+            tokens, updated, blocked_until = (float(x) for x in f.read().split())
+            return tokens, updated, blocked_until
+        except ValueError:
+            return float(self.burst), time.time(), 0.0
+
+    def _write_state(self, f, tokens: float, updated: float, blocked_until: float):
+        """Write bucket state back to the state file."""
+        f.seek(0)
+        f.truncate()
+        f.write(f"{tokens} {updated} {blocked_until}")
+        f.flush()
+
+    def _locked_file(self):
+        """Open the state file, creating it if needed."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+        return os.fdopen(fd, "r+", encoding="utf-8")
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait first.
+
+        Returns:
+            Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = self._clock()
+            if self.state_file is None:
+                wait, self._tokens, self._updated = self._take(
+                    self._tokens, self._updated, self._blocked_until, now
+                )
+                return wait
+
+            with self._locked_file() as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    tokens, updated, blocked_until = self._read_state(f)
+                    wait, tokens, updated = self._take(
+                        tokens, updated, blocked_until, now
+                    )
+                    self._write_state(f, tokens, updated, blocked_until)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                return wait
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent.
+
+        With ``state_file`` set, the token is taken on a worker thread, as
+        the file lock may wait on other processes.
+        """
+        if self.state_file is None:
+            wait = self.reserve()
+        else:
+            wait = await asyncio.to_thread(self.reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float):
+        """Hold back every caller for ``seconds`` (e.g. after an HTTP 429).
+
+        Args:
+            seconds: Delay requested by the server
+        """
+        with self._lock:
+            until = self._clock() + seconds
+            if self.state_file is None:
+                self._blocked_until = max(self._blocked_until, until)
+                return
+
+            with self._locked_file() as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    tokens, updated, blocked_until = self._read_state(f)
+                    self._write_state(f, tokens, updated, max(blocked_until, until))
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5) -> float:
+    """Exponential backoff with jitter: between half and all of base * 2**attempt.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay for the first retry
+
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    delay = base * (2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def default_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter used by EPPO clients by default.
+
+    Returns:
+        RateLimiter shared by all EPPO clients in the process, backed by
+        Config.EPPO_RATE_LIMIT_FILE when set
+    """
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(state_file=Config.EPPO_RATE_LIMIT_FILE)
+        return _default_limiter
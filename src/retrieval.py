@@ -1,14 +1,23 @@
 """SQLite database retrieval for EPPO codes."""
 
+import heapq
+import queue
 import re
 import sqlite3
+import threading
+import warnings
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from .config import Config
 from .normalization import NormalizedLabel
 
+# Layout version of the token index written by name_index.build_name_index
+INDEX_SCHEMA_VERSION = 1
+
 
 @dataclass
 class Candidate:
@@ -22,40 +31,35 @@ class Candidate:
     host_match: bool
 
 
+_TOKEN_SPLIT = re.compile(r"[^\w]+")
+
+
 def _tokenize_name(name: str) -> set:
     """Tokenize a name into a set of tokens."""
-    tokens = re.split(r"[^\w]+", (name or "").lower())
+    tokens = _TOKEN_SPLIT.split((name or "").lower())
     return {t for t in tokens if len(t) >= 2}
 
 
-def _score_candidate(
-    eppocode: str, dtcode: str, fullname: str, norm: NormalizedLabel
-) -> Tuple[float, int, bool]:
-    """Score a candidate based on token overlap and other factors.
-
-    Args:
-        eppocode: EPPO code
-        dtcode: Data type code
-        fullname: Full name from database
-        norm: Normalized label
+def _score_tokens(
+    dtcode: str,
+    name_tokens: set,
+    overlap: int,
+    query_len: int,
+    host_tokens: set,
+    location_tokens: set,
+) -> Tuple[float, bool]:
+    """Score an already tokenized name; see ``_score_candidate``.
 
     Returns:
-        Tuple of (score, token_overlap, host_match)
+        Tuple of (score, host_match)
     """
-    name_tokens = _tokenize_name(fullname)
-    query_tokens = set(norm.tokens)
-    overlap = len(query_tokens & name_tokens)
-    host_match = bool(
-        norm.host_candidates and (set(norm.host_candidates) & name_tokens)
-    )
+    host_match = bool(host_tokens & name_tokens)
 
     # Check if location terms match
     location_match = 0
-    if norm.location_terms:
-        location_tokens = set(norm.location_terms)
+    if location_tokens:
         location_match = len(location_tokens & name_tokens) / len(location_tokens)
 
-    query_len = max(len(query_tokens), 1)
     overlap_ratio = overlap / query_len
     host_bonus = Config.HOST_BONUS if host_match else 0.0
     location_bonus = Config.LOCATION_BONUS_MULTIPLIER * location_match
@@ -70,18 +74,232 @@ def _score_candidate(
     )
 
     score = overlap_ratio + host_bonus + location_bonus + dtcode_bonus
-    return (min(score, Config.MAX_SCORE_CAP), overlap, host_match)
+    return (min(score, Config.MAX_SCORE_CAP), host_match)
+
+
+def _score_candidate(
+    eppocode: str, dtcode: str, fullname: str, norm: NormalizedLabel
+) -> Tuple[float, int, bool]:
+    """Score a candidate based on token overlap and other factors.
+
+    Args:
+        eppocode: EPPO code
+        dtcode: Data type code
+        fullname: Full name from database
+        norm: Normalized label
+
+    Returns:
+        Tuple of (score, token_overlap, host_match)
+    """
+    name_tokens = _tokenize_name(fullname)
+    query_tokens = set(norm.tokens)
+    overlap = len(query_tokens & name_tokens)
+    score, host_match = _score_tokens(
+        dtcode,
+        name_tokens,
+        overlap,
+        max(len(query_tokens), 1),
+        set(norm.host_candidates),
+        set(norm.location_terms),
+    )
+    return (score, overlap, host_match)
+
+
+def index_path_for(sqlite_path: Path) -> Path:
+    """Return the token index path to use for an EPPO SQLite database.
+
+    Args:
+        sqlite_path: Path to EPPO SQLite database
+
+    Returns:
+        Config.NAME_INDEX_PATH if set, else ``<stem>.tokens.sqlite`` next to the database
+    """
+    if Config.NAME_INDEX_PATH is not None:
+        return Config.NAME_INDEX_PATH
+    return sqlite_path.with_name(f"{sqlite_path.stem}.tokens.sqlite")
+
+
+def _index_conn_current(conn: sqlite3.Connection, sqlite_path: Path) -> bool:
+    """Check an open token index's meta against the database file."""
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.Error:
+        return False
+    stat = sqlite_path.stat()
+    return (
+        meta.get("schema_version") == str(INDEX_SCHEMA_VERSION)
+        and meta.get("source_size") == str(stat.st_size)
+        and meta.get("source_mtime") == str(stat.st_mtime)
+    )
+
+
+def index_is_current(index_path: Path, sqlite_path: Path) -> bool:
+    """Check that a token index was built from (or patched to) a database.
+
+    Compares the size and mtime recorded in the index's meta table with
+    the database file, so an index left behind by a replaced or edited
+    database is not used.
+
+    Args:
+        index_path: Path to token index
+        sqlite_path: Path to EPPO SQLite database
+
+    Returns:
+        True if the index exists and matches the database
+    """
+    if not index_path.exists():
+        return False
+    conn = sqlite3.connect(f"{index_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return _index_conn_current(conn, sqlite_path)
+    finally:
+        conn.close()
+
+
+def _warn_stale_index(index_path: Path, sqlite_path: Path):
+    """Warn that a token index is ignored because it no longer matches."""
+    warnings.warn(
+        f"Token index {index_path} does not match {sqlite_path}; falling back "
+        "to a LIKE scan. Rebuild it with build_index.py or update_index.py.",
+        RuntimeWarning,
+        stacklevel=3,
+    )
+
+
+@lru_cache(maxsize=None)
+def _like_sql(arity: int) -> str:
+    """Return the LIKE-scan query for a given number of tokens.
+
+    Reusing the identical SQL string lets sqlite3's per-connection statement
+    cache hand back the already prepared statement.
+    """
+    placeholders = " OR ".join(["n.fullname LIKE ?" for _ in range(arity)])
+    return f"""
+        SELECT DISTINCT c.eppocode, c.dtcode, n.fullname
+        FROM t_codes c
+        JOIN t_names n ON c.codeid = n.codeid
+        WHERE c.status = 'A' AND n.status = 'A'
+          AND ({placeholders})
+    """
+
+
+@lru_cache(maxsize=None)
+def _indexed_sql(arity: int) -> str:
+    """Return the token-index query for a given number of distinct tokens."""
+    placeholders = ", ".join("?" for _ in range(arity))
+    return f"""
+        SELECT DISTINCT n.eppocode, n.dtcode, n.fullname
+        FROM name_tokens t
+        JOIN names n ON n.nameid = t.nameid
+        WHERE t.token IN ({placeholders})
+    """
+
+
+@lru_cache(maxsize=None)
+def _indexed_by_token_sql(arity: int) -> str:
+    """Return the token-index query that also reports the matched token."""
+    placeholders = ", ".join("?" for _ in range(arity))
+    return f"""
+        SELECT t.token, n.eppocode, n.dtcode, n.fullname
+        FROM name_tokens t
+        JOIN names n ON n.nameid = t.nameid
+        WHERE t.token IN ({placeholders})
+    """
+
+
+# Keeps batched IN (...) lists well below SQLite's host parameter limit.
+_MAX_BATCH_TOKENS = 500
+
+
+def _fetch_rows_like(
+    conn: sqlite3.Connection, tokens: List[str]
+) -> List[sqlite3.Row]:
+    """Fetch candidate rows with a ``LIKE '%token%'`` scan over t_names."""
+    params = [f"%{t}%" for t in tokens]
+    return conn.execute(_like_sql(len(params)), params).fetchall()
+
+
+def _fetch_rows_indexed(
+    conn: sqlite3.Connection, tokens: List[str]
+) -> List[sqlite3.Row]:
+    """Fetch candidate rows through the token index built by ``build_index.py``.
+
+    Only names containing a query token as a whole token are returned. Names
+    the LIKE scan would match on a substring alone have zero token overlap and
+    can never clear the confidence threshold.
+    """
+    unique_tokens = sorted(set(tokens))
+    return conn.execute(_indexed_sql(len(unique_tokens)), unique_tokens).fetchall()
+
+
+def _rank_rows(
+    rows: List[sqlite3.Row], norm: NormalizedLabel, max_candidates: int
+) -> List[Candidate]:
+    """Deduplicate rows per (eppocode, dtcode) and rank them by score.
+
+    Each distinct name is tokenized once; the winning name per code keeps its
+    overlap and token set so scoring does not tokenize it again.
+    """
+    query_tokens_set = set(norm.tokens)
+    token_cache: Dict[str, set] = {}
+    best: Dict[Tuple[str, str], Tuple[int, str, set]] = {}
+    for row in rows:
+        key = (row["eppocode"], row["dtcode"])
+        name = row["fullname"] or ""
+        name_tokens = token_cache.get(name)
+        if name_tokens is None:
+            name_tokens = token_cache[name] = _tokenize_name(name)
+        overlap = len(query_tokens_set & name_tokens)
+        prev = best.get(key)
+        # Ties on overlap and length go to the smaller name so the result does
+        # not depend on the row order of the backend that produced it.
+        if prev is None or overlap > prev[0] or (
+            overlap == prev[0] and (len(name), prev[1]) > (len(prev[1]), name)
+        ):
+            best[key] = (overlap, name, name_tokens)
+
+    query_len = max(len(query_tokens_set), 1)
+    host_tokens = set(norm.host_candidates)
+    location_tokens = set(norm.location_terms)
+    scored = []
+    for (eppocode, dtcode), (overlap, fullname, name_tokens) in best.items():
+        score, host_match = _score_tokens(
+            dtcode, name_tokens, overlap, query_len, host_tokens, location_tokens
+        )
+        scored.append((-score, eppocode, dtcode, fullname, overlap, host_match))
+
+    return [
+        Candidate(
+            eppocode=eppocode,
+            dtcode=dtcode,
+            fullname=fullname,
+            score=-neg_score,
+            token_overlap=overlap,
+            host_match=host_match,
+        )
+        for neg_score, eppocode, dtcode, fullname, overlap, host_match in (
+            heapq.nsmallest(max_candidates, scored, key=lambda s: s[:3])
+        )
+    ]
 
 
 def query_candidates(
-    sqlite_path: Path, norm: NormalizedLabel, max_candidates: int = None
+    sqlite_path: Path,
+    norm: NormalizedLabel,
+    max_candidates: int = None,
+    use_index: bool = True,
 ) -> List[Candidate]:
     """Query SQLite database for candidate EPPO codes.
 
+    Uses the token index next to the database when it exists and matches
+    the database, and falls back to a ``LIKE`` scan of t_names otherwise
+    (with a warning if the index is stale).
+
     Args:
         sqlite_path: Path to SQLite database
         norm: Normalized label
         max_candidates: Maximum number of candidates to return
+        use_index: Whether to use the token index when available
 
     Returns:
         List of Candidate objects sorted by score
@@ -92,58 +310,221 @@ def query_candidates(
     if not norm.tokens or not sqlite_path.exists():
         return []
 
-    conn = sqlite3.connect(str(sqlite_path))
+    index_path = index_path_for(sqlite_path)
+    indexed = use_index and index_path.exists()
+    conn = sqlite3.connect(str(index_path if indexed else sqlite_path))
+    if indexed and not _index_conn_current(conn, sqlite_path):
+        _warn_stale_index(index_path, sqlite_path)
+        conn.close()
+        indexed = False
+        conn = sqlite3.connect(str(sqlite_path))
     conn.row_factory = sqlite3.Row
     try:
-        placeholders = " OR ".join(["n.fullname LIKE ?" for _ in norm.tokens])
-        params = [f"%{t}%" for t in norm.tokens]
-
-        sql = f"""
-            SELECT DISTINCT c.eppocode, c.dtcode, n.fullname
-            FROM t_codes c
-            JOIN t_names n ON c.codeid = n.codeid
-            WHERE c.status = 'A' AND n.status = 'A'
-              AND ({placeholders})
-        """
-        cur = conn.execute(sql, params)
-        rows = list(cur.fetchall())
+        if indexed:
+            rows = _fetch_rows_indexed(conn, norm.tokens)
+        else:
+            rows = _fetch_rows_like(conn, norm.tokens)
     finally:
         conn.close()
 
-    query_tokens_set = set(norm.tokens)
-    by_code: dict[Tuple[str, str], str] = {}
-    for row in rows:
-        key = (row["eppocode"], row["dtcode"])
-        name = row["fullname"] or ""
-        name_tokens = _tokenize_name(name)
-        overlap = len(query_tokens_set & name_tokens)
-        prev_name = by_code.get(key, "")
-        prev_overlap = (
-            len(query_tokens_set & _tokenize_name(prev_name)) if prev_name else -1
-        )
-        if key not in by_code or overlap > prev_overlap or (
-            overlap == prev_overlap and len(name) > len(prev_name)
-        ):
-            by_code[key] = name
+    return _rank_rows(rows, norm, max_candidates)
 
-    candidates: List[Candidate] = []
-    for (eppocode, dtcode), fullname in by_code.items():
-        score, token_overlap, host_match = _score_candidate(
-            eppocode, dtcode, fullname, norm
-        )
-        candidates.append(
-            Candidate(
-                eppocode=eppocode,
-                dtcode=dtcode,
-                fullname=fullname,
-                score=score,
-                token_overlap=token_overlap,
-                host_match=host_match,
+
+class RetrievalSession:
+    """Pool of read-only SQLite connections reused across queries.
+
+    Opening a connection per ``query_candidates`` call costs a file open,
+    schema parse and page cache warm-up on every label. A session keeps up
+    to ``pool_size`` connections open (``mode=ro``, optionally
+    ``immutable=1``, memory-mapped) and hands them out to one thread at a
+    time. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        sqlite_path: Path = None,
+        pool_size: int = None,
+        use_index: bool = True,
+        mmap_size: int = None,
+        immutable: bool = True,
+    ):
+        """Initialize retrieval session.
+
+        Args:
+            sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+            pool_size: Maximum open connections (defaults to Config.SQLITE_POOL_SIZE)
+            use_index: Whether to use the token index when available and
+                current (a stale one is ignored with a warning)
+            mmap_size: Bytes to memory-map per connection (defaults to Config.SQLITE_MMAP_SIZE)
+            immutable: Open with ``immutable=1``; only safe if the file is
+                never modified while the session is open
+        """
+        self.sqlite_path = Path(sqlite_path or Config.SQLITE_PATH)
+        self.pool_size = pool_size or Config.SQLITE_POOL_SIZE
+        self.mmap_size = Config.SQLITE_MMAP_SIZE if mmap_size is None else mmap_size
+        self.immutable = immutable
+
+        index_path = index_path_for(self.sqlite_path)
+        self.indexed = use_index and index_path.exists()
+        if self.indexed and not index_is_current(index_path, self.sqlite_path):
+            _warn_stale_index(index_path, self.sqlite_path)
+            self.indexed = False
+        self.db_path = index_path if self.indexed else self.sqlite_path
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a read-only connection with session pragmas applied."""
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        if self.immutable:
+            uri += "&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection, opening one if the pool has room."""
+        if self._closed:
+            raise RuntimeError("RetrievalSession is closed")
+
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._opened < self.pool_size:
+                    self._opened += 1
+                    try:
+                        conn = self._connect()
+                    except BaseException:
+                        # Give the slot back, or waiters block on _idle forever
+                        self._opened -= 1
+                        raise
+        if conn is None:
+            conn = self._idle.get()
+
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+            if self._closed:
+                # Returned after (or during) close(): close it too
+                self.close()
+
+    def query(
+        self, norm: NormalizedLabel, max_candidates: int = None
+    ) -> List[Candidate]:
+        """Query candidate EPPO codes; same results as ``query_candidates``.
+
+        Args:
+            norm: Normalized label
+            max_candidates: Maximum number of candidates to return
+
+        Returns:
+            List of Candidate objects sorted by score
+        """
+        if max_candidates is None:
+            max_candidates = Config.MAX_CANDIDATES
+
+        if not norm.tokens or not self.db_path.exists():
+            return []
+
+        with self.connection() as conn:
+            if self.indexed:
+                rows = _fetch_rows_indexed(conn, norm.tokens)
+            else:
+                rows = _fetch_rows_like(conn, norm.tokens)
+
+        return _rank_rows(rows, norm, max_candidates)
+
+    def query_many(
+        self, norms: List[NormalizedLabel], max_candidates: int = None
+    ) -> List[List[Candidate]]:
+        """Query candidates for several labels in one pass.
+
+        With the token index, the union of all label tokens is fetched once
+        and each label is ranked on the rows of its own tokens. Without it,
+        the labels share one pooled connection.
+
+        Args:
+            norms: Normalized labels
+            max_candidates: Maximum number of candidates per label
+
+        Returns:
+            One candidate list per label, in input order
+        """
+        if max_candidates is None:
+            max_candidates = Config.MAX_CANDIDATES
+
+        if not self.db_path.exists():
+            return [[] for _ in norms]
+
+        if not self.indexed:
+            with self.connection() as conn:
+                return [
+                    _rank_rows(_fetch_rows_like(conn, norm.tokens), norm, max_candidates)
+                    if norm.tokens
+                    else []
+                    for norm in norms
+                ]
+
+        tokens = sorted({t for norm in norms for t in norm.tokens})
+        rows_by_token: Dict[str, List[sqlite3.Row]] = {}
+        with self.connection() as conn:
+            for start in range(0, len(tokens), _MAX_BATCH_TOKENS):
+                chunk = tokens[start : start + _MAX_BATCH_TOKENS]
+                for row in conn.execute(_indexed_by_token_sql(len(chunk)), chunk):
+                    rows_by_token.setdefault(row["token"], []).append(row)
+
+        return [
+            _rank_rows(
+                [row for t in set(norm.tokens) for row in rows_by_token.get(t, ())],
+                norm,
+                max_candidates,
             )
-        )
+            for norm in norms
+        ]
+
+    def close(self):
+        """Close all idle connections; borrowed ones close when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> "RetrievalSession":
+        return self
 
-    candidates.sort(key=lambda c: c.score, reverse=True)
-    return candidates[:max_candidates]
+    def __exit__(self, *exc):
+        self.close()
+
+
+_sessions: Dict[Path, RetrievalSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(sqlite_path: Path = None) -> RetrievalSession:
+    """Return the process-wide shared session for a database.
+
+    Args:
+        sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+
+    Returns:
+        RetrievalSession shared by all callers using the same path
+    """
+    sqlite_path = Path(sqlite_path or Config.SQLITE_PATH)
+    with _sessions_lock:
+        session = _sessions.get(sqlite_path)
+        if session is None:
+            session = _sessions[sqlite_path] = RetrievalSession(sqlite_path)
+        return session
 
 
 def select_best(
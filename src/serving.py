@@ -0,0 +1,366 @@
+"""Pre-fork serving of diagnoses over JSON lines or HTTP."""
+
+import gc
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .coalescing import CoalescingDiagnoser, QueueFullError
+from .compiled_index import HAS_NUMPY, CompiledNameIndex
+from .config import Config
+from .eppo_client import EPPOClient
+from .fuzzy import correct_label
+from .generation import ResponseGenerator
+from .normalization import get_vocabulary, normalize_cv_label
+from .pipeline import diagnose
+from .rate_limit import HAS_FCNTL, RateLimiter
+from .retrieval import RetrievalSession
+
+HAS_FORK = hasattr(os, "fork")
+
+# Per-process serving state. The retriever is set in the parent before
+# workers fork, so they share its memory; clients are created per worker.
+_state: Dict[str, Any] = {}
+
+
+def load_retriever(sqlite_path: Path = None, compiled: bool = True):
+    """Load the retrieval index once, before workers are forked.
+
+    Args:
+        sqlite_path: Path to SQLite database (defaults to Config.SQLITE_PATH)
+        compiled: Use CompiledNameIndex when numpy is available, mapped from
+            the compiled index file if current (pages shared by every
+            process) or compiled and packed into numpy buffers in memory
+            (shared copy-on-write after fork, as lookups leave them
+            untouched); otherwise a RetrievalSession whose memory-mapped
+            pages are shared through the OS page cache
+
+    Returns:
+        Retriever with ``query``/``query_many`` methods
+    """
+    sqlite_path = Path(sqlite_path or Config.SQLITE_PATH)
+    if compiled and HAS_NUMPY:
+        # A Python list or dict would have its pages copied into each worker
+        # as lookups update the reference counts of its objects
+        return CompiledNameIndex.open(sqlite_path).packed()
+    # Connections open lazily, so none are inherited across fork
+    return RetrievalSession(sqlite_path)
+
+
+def _shared_rate_limiter(workers: int) -> RateLimiter:
+    """EPPO rate limiter that keeps all forked workers within one budget.
+
+    The workers share the bucket in Config.EPPO_RATE_LIMIT_FILE, or in a
+    state file created for this server (removed by ``_uninstall``).
+    Without fcntl each worker gets an equal share of the rate instead.
+    """
+    if not HAS_FCNTL:
+        return RateLimiter(
+            rate=Config.EPPO_RATE_PER_SECOND / workers,
+            burst=max(1.0, Config.EPPO_RATE_BURST / workers),
+        )
+    state_file = Config.EPPO_RATE_LIMIT_FILE
+    if state_file is None:
+        fd, path = tempfile.mkstemp(prefix="eppo-rate-", suffix=".state")
+        os.close(fd)
+        state_file = _state["rate_limit_file"] = Path(path)
+    return RateLimiter(state_file=state_file)
+
+
+def _install(
+    retriever,
+    retrieval_only: bool,
+    fork: bool,
+    coalesce: bool = False,
+    workers: int = 1,
+):
+    """Install serving state, keeping it out of the GC's reach before a fork.
+
+    ``gc.freeze`` moves existing objects to a permanent generation, so
+    collections in the workers do not touch (and copy) the index's pages.
+    An installed CV class vocabulary is bound to the retriever first, so
+    workers inherit its pre-normalized labels and token ids. Forked
+    workers inherit one EPPO rate limiter covering all of them.
+    """
+    vocabulary = get_vocabulary()
+    if vocabulary is not None:
+        vocabulary.bind(retriever)
+    _uninstall()
+    _state["retriever"] = retriever
+    _state["retrieval_only"] = retrieval_only
+    _state["coalesce"] = coalesce
+    if fork and not retrieval_only:
+        _state["rate_limiter"] = _shared_rate_limiter(workers)
+    if fork:
+        gc.collect()
+        gc.freeze()
+
+
+def _uninstall():
+    """Close this process's clients, clear serving state and remove a rate
+    limit file created for it."""
+    # The coalescer finishes pending requests on the clients closed after it
+    for name in ("coalescer", "generator", "eppo_client"):
+        client = _state.get(name)
+        if client is not None:
+            client.close()
+    state_file = _state.get("rate_limit_file")
+    if state_file is not None:
+        state_file.unlink(missing_ok=True)
+    _state.clear()
+
+
+def _init_worker():
+    """Create this worker's pooled EPPO and Groq clients (and coalescer)."""
+    if not _state["retrieval_only"]:
+        _state["eppo_client"] = EPPOClient(rate_limiter=_state.get("rate_limiter"))
+        _state["generator"] = ResponseGenerator()
+        if _state.get("coalesce"):
+            # Threads are started here, after the fork
+            _state["coalescer"] = CoalescingDiagnoser(
+                eppo_client=_state["eppo_client"],
+                generator=_state["generator"],
+                retriever=_state["retriever"],
+            )
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Serve one request in the current worker.
+
+    Args:
+        request: ``{"label": ...}``; ``"retrieval_only": true`` returns ranked
+            candidates without EPPO or LLM calls
+
+    Returns:
+        JSON-serializable response; ``"busy": true`` with an error when the
+        coalescing queue is full
+    """
+    if not isinstance(request, dict):
+        return {"error": "request must be a JSON object or string"}
+    label = request.get("label")
+    if not isinstance(label, str):
+        return {"error": "request needs a string 'label'"}
+
+    vocabulary = get_vocabulary()
+    if vocabulary is not None:
+        # Picks up an edited class list in every worker
+        vocabulary.poll()
+
+    retriever = _state["retriever"]
+    if _state["retrieval_only"] or request.get("retrieval_only"):
+        max_candidates = request.get("max_candidates", 5)
+        if (
+            not isinstance(max_candidates, int)
+            or isinstance(max_candidates, bool)
+            or max_candidates < 1
+        ):
+            return {"error": "'max_candidates' must be a positive integer"}
+        norm = correct_label(normalize_cv_label(label))
+        candidates = retriever.query(norm, min(max_candidates, Config.MAX_CANDIDATES))
+        return {
+            "label": label,
+            "candidates": [
+                {"eppocode": c.eppocode, "fullname": c.fullname, "score": c.score}
+                for c in candidates
+            ],
+        }
+
+    coalescer = _state.get("coalescer")
+    if coalescer is not None:
+        try:
+            result = coalescer.diagnose(label)
+        except QueueFullError:
+            return {"error": "server busy, retry later", "busy": True}
+    else:
+        result = diagnose(
+            label,
+            eppo_client=_state["eppo_client"],
+            generator=_state["generator"],
+            retriever=retriever,
+        )
+    return {
+        "label": label,
+        "refused": result.refused,
+        "message": result.message,
+        "eppocode": result.eppocode,
+        "confidence": result.confidence,
+    }
+
+
+def _safe_handle(request: Any) -> Dict[str, Any]:
+    """``handle_request`` that turns any failure into an error response.
+
+    A request that raises must not take down the worker (or, in JSONL mode,
+    the pool serving the rest of the stream). Such errors are marked
+    ``"internal": true``.
+    """
+    try:
+        return handle_request(request)
+    except Exception as e:
+        return {"error": f"internal error: {type(e).__name__}: {e}", "internal": True}
+
+
+def _handle_line(line: str) -> str:
+    """Serve one JSON line; malformed lines get an error response."""
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        response = {"error": f"invalid JSON: {e}"}
+    else:
+        if isinstance(request, str):
+            request = {"label": request}
+        response = _safe_handle(request)
+    return json.dumps(response, ensure_ascii=False)
+
+
+def serve_lines(
+    lines: Iterable[str],
+    retriever,
+    workers: int = 1,
+    retrieval_only: bool = False,
+    chunksize: int = 16,
+) -> Iterator[str]:
+    """Serve JSON-line requests on ``workers`` forked processes.
+
+    Responses are yielded in input order.
+
+    Args:
+        lines: JSON requests, one per line
+        retriever: Index from ``load_retriever``
+        workers: Worker processes (1 serves in-process)
+        retrieval_only: Skip EPPO and LLM calls for every request
+        chunksize: Requests handed to a worker at a time
+
+    Yields:
+        JSON responses, one per request
+    """
+    lines = (line for line in lines if line.strip())
+    fork = workers > 1 and HAS_FORK
+    _install(retriever, retrieval_only, fork, workers=workers)
+    if not fork:
+        try:
+            _init_worker()
+            yield from map(_handle_line, lines)
+        finally:
+            _uninstall()
+        return
+
+    ctx = multiprocessing.get_context("fork")
+    try:
+        with ctx.Pool(workers, initializer=_init_worker) as pool:
+            yield from pool.imap(_handle_line, lines, chunksize)
+    finally:
+        _uninstall()
+
+
+class DiagnosisHandler(BaseHTTPRequestHandler):
+    """``POST /diagnose`` with a JSON body; ``GET /health``."""
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "pid": os.getpid()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/diagnose":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            self._send_json(400, {"error": f"invalid JSON: {e}"})
+            return
+        response = _safe_handle(request)
+        if response.get("busy"):
+            status = 503
+        elif response.get("internal"):
+            status = 500
+        else:
+            status = 400 if "error" in response else 200
+        self._send_json(status, response)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_http(
+    retriever,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    workers: int = 1,
+    retrieval_only: bool = False,
+    coalesce: bool = False,
+):
+    """Serve HTTP requests from ``workers`` processes sharing one socket.
+
+    The parent binds the socket and loads state, then forks; every worker
+    accepts on the inherited socket. Blocks until interrupted.
+
+    Args:
+        retriever: Index from ``load_retriever``
+        host: Interface to bind
+        port: Port to bind
+        workers: Worker processes
+        retrieval_only: Skip EPPO and LLM calls for every request
+        coalesce: Handle each worker's requests on threads through a
+            CoalescingDiagnoser, answering 503 when its queue is full
+    """
+    server_class = ThreadingHTTPServer if coalesce else HTTPServer
+    server = server_class((host, port), DiagnosisHandler)
+    fork = workers > 1 and HAS_FORK
+    _install(retriever, retrieval_only, fork, coalesce, workers)
+
+    if not fork:
+        try:
+            _init_worker()
+            server.serve_forever()
+        finally:
+            server.server_close()
+            _uninstall()
+        return
+
+    children: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            _init_worker()
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        server.server_close()
+        _uninstall()
+
+
+def worker_count(requested: Optional[int] = None) -> int:
+    """Default to one worker per CPU."""
+    return requested or os.cpu_count() or 1
@@ -0,0 +1,179 @@
+"""Shared fixtures: small EPPO-shaped SQLite databases built per test."""
+
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.normalization import NormalizedLabel  # noqa: E402
+
+# (codeid, eppocode, dtcode, status)
+CODES = [
+    (1, "PHYTIN", "GAF", "A"),
+    (2, "ALTESO", "GAF", "A"),
+    (3, "SOLTU", "PFL", "A"),
+    (4, "LYPES", "PFL", "A"),
+    (5, "VENTIN", "GAF", "A"),
+    (6, "OLDCOD", "GAF", "I"),
+    # Same names under two codes: ranking must not depend on row order
+    (7, "ZZBLIG", "GAF", "A"),
+    (8, "AABLIG", "GAF", "A"),
+]
+
+# (nameid, codeid, fullname, status)
+NAMES = [
+    (1, 1, "Phytophthora infestans", "A"),
+    (2, 1, "late blight of potato", "A"),
+    (3, 1, "late blight of tomato", "A"),
+    (4, 2, "Alternaria solani", "A"),
+    (5, 2, "early blight of potato", "A"),
+    (6, 2, "early blight of tomato", "A"),
+    (7, 3, "Solanum tuberosum", "A"),
+    (8, 3, "potato", "A"),
+    (9, 4, "Solanum lycopersicum", "A"),
+    (10, 4, "tomato", "A"),
+    (11, 5, "Venturia inaequalis", "A"),
+    (12, 5, "apple scab", "A"),
+    (13, 5, "scab of apple", "I"),
+    (14, 6, "potato wart", "A"),
+    (15, 7, "brown blight of pear", "A"),
+    (16, 8, "brown blight of pear", "A"),
+]
+
+
+def write_db(
+    path: Path,
+    codes: List[Tuple[int, str, str, str]],
+    names: List[Tuple[int, int, str, str]],
+) -> Path:
+    """Write t_codes/t_names in the layout of benchmarks/synthetic_data.py."""
+    if path.exists():
+        path.unlink()
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE t_codes (
+                codeid INTEGER PRIMARY KEY, eppocode TEXT, dtcode TEXT, status TEXT
+            );
+            CREATE TABLE t_names (
+                nameid INTEGER PRIMARY KEY, codeid INTEGER, fullname TEXT,
+                codelang TEXT, preferred INTEGER, status TEXT
+            );
+            """
+        )
+        conn.executemany("INSERT INTO t_codes VALUES (?, ?, ?, ?)", codes)
+        conn.executemany(
+            "INSERT INTO t_names VALUES (?, ?, ?, 'en', 0, ?)", names
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+def make_norm(*tokens: str, hosts=None, locations=None) -> NormalizedLabel:
+    """NormalizedLabel with explicit parts, bypassing the normalization memo."""
+    tokens = list(tokens)
+    return NormalizedLabel(
+        original=" ".join(tokens),
+        tokens=tokens,
+        host_candidates=list(hosts if hosts is not None else tokens[:1]),
+        symptom_candidates=[],
+        location_terms=list(locations or []),
+    )
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 5.0):
+    """Poll ``predicate`` until it holds; fail the test after ``timeout``."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail(f"condition not met within {timeout}s")
+        time.sleep(0.001)
+
+
+class FakeClock:
+    """Stand-in for the ``time`` module that only moves when told to.
+
+    Patch it over a module's ``time`` attribute; ``sleep`` advances it.
+    """
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+# codeid -> eppocode of the active codes that FakeEPPOClient knows about
+_FACT_CODES = {1: "PHYTIN", 2: "ALTESO", 3: "SOLTU", 4: "LYPES", 5: "VENTIN"}
+
+
+class FakeEPPOClient:
+    """Facts built from NAMES; optionally held until ``gate`` is set.
+
+    Codes in ``broken`` return facts that fail validation, and ``error``
+    is raised from every fetch when given. Fetches are counted per code.
+    """
+
+    def __init__(self, gate=None, broken=(), error=None):
+        self.gate = gate
+        self.broken = set(broken)
+        self.error = error
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def fetch_facts(self, eppocode):
+        with self._lock:
+            self.calls[eppocode] += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        if eppocode in self.broken:
+            return {"overview": {"prefname": "Unrelated"}, "names": [], "hosts": []}
+        names = [
+            {"fullname": fullname}
+            for _, codeid, fullname, _ in NAMES
+            if _FACT_CODES.get(codeid) == eppocode
+        ]
+        return {"overview": {"prefname": names[0]["fullname"]}, "names": names}
+
+
+class FakeGenerator:
+    """Answers "<label> -> <prefname>" and records the labels it saw."""
+
+    def __init__(self):
+        self.labels = []
+        self._lock = threading.Lock()
+
+    def generate(self, label, facts):
+        with self._lock:
+            self.labels.append(label)
+        return f"{label} -> {facts['overview']['prefname']}"
+
+
+@pytest.fixture
+def eppo_db(tmp_path: Path) -> Path:
+    """Small EPPO database with a few diseases, hosts and inactive rows."""
+    return write_db(tmp_path / "eppo.sqlite", CODES, NAMES)
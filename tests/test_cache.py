@@ -0,0 +1,278 @@
+"""EPPO cache backends (schema versions, LRU eviction) and client TTL/SWR."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from conftest import FakeClock
+from src import cache as cache_module
+from src.cache import DirectoryCache, ResponseCache, SQLiteCache, _encode
+from src.config import Config
+from src.eppo_client import EPPOClient
+from src.rate_limit import RateLimiter
+
+PAYLOAD = {"prefname": "x" * 100}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_sqlite_cache_round_trip(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite")
+    stored_at = cache.set("PHYTIN", "overview", PAYLOAD)
+    entry = cache.get("PHYTIN", "overview")
+    assert entry.data == PAYLOAD
+    assert entry.stored_at == stored_at
+    assert cache.get("PHYTIN", "names") is None
+    assert list(cache.items()) == [("PHYTIN", "overview", PAYLOAD)]
+    assert cache.delete("PHYTIN") == 1
+    assert cache.get("PHYTIN", "overview") is None
+    cache.close()
+
+
+def test_sqlite_cache_drops_entries_of_another_schema_version(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteCache(path)
+    cache.set("PHYTIN", "overview", PAYLOAD)
+    cache.close()
+
+    conn = sqlite3.connect(str(path))
+    conn.execute("UPDATE meta SET value = '1' WHERE key = 'schema_version'")
+    conn.commit()
+    conn.close()
+
+    cache = SQLiteCache(path)
+    assert cache.get("PHYTIN", "overview") is None
+    cache.set("PHYTIN", "overview", PAYLOAD)
+    assert cache.get("PHYTIN", "overview").data == PAYLOAD
+    cache.close()
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path, clock):
+    size = len(_encode(PAYLOAD))
+    cache = SQLiteCache(tmp_path / "cache.sqlite", max_bytes=int(size * 3.5))
+    for code in ("AAAAAA", "BBBBBB", "CCCCCC"):
+        cache.set(code, "overview", PAYLOAD)
+        clock.advance(100)
+    # Reading AAAAAA makes BBBBBB the least recently used
+    assert cache.get("AAAAAA", "overview") is not None
+    clock.advance(100)
+    cache.set("DDDDDD", "overview", PAYLOAD)
+
+    assert cache.evictions == 1
+    assert cache.get("BBBBBB", "overview") is None
+    for code in ("AAAAAA", "CCCCCC", "DDDDDD"):
+        assert cache.get(code, "overview") is not None
+    cache.close()
+
+
+def test_sqlite_cache_reads_within_resolution_do_not_reorder(tmp_path, clock):
+    size = len(_encode(PAYLOAD))
+    cache = SQLiteCache(tmp_path / "cache.sqlite", max_bytes=int(size * 2.5))
+    cache.set("AAAAAA", "overview", PAYLOAD)
+    clock.advance(1)
+    cache.set("BBBBBB", "overview", PAYLOAD)
+    clock.advance(1)
+    # Too soon after the write to count as a new use
+    cache.get("AAAAAA", "overview")
+    cache.set("CCCCCC", "overview", PAYLOAD)
+    assert cache.get("AAAAAA", "overview") is None
+    assert cache.get("BBBBBB", "overview") is not None
+    cache.close()
+
+
+def test_directory_cache_evicts_least_recently_used(tmp_path):
+    size = len(json.dumps(PAYLOAD))
+    cache = DirectoryCache(tmp_path / "cache", max_bytes=int(size * 3.5))
+    now = time.time()
+    for code, age in (("AAAAAA", 1000), ("BBBBBB", 500), ("CCCCCC", 400)):
+        cache.set(code, "overview", PAYLOAD)
+        path = cache._path(code, "overview")
+        os.utime(path, (now - age, now - age))
+    # A read older than the access resolution refreshes the access time
+    assert cache.get("AAAAAA", "overview") is not None
+    cache.set("DDDDDD", "overview", PAYLOAD)
+
+    assert cache.evictions == 1
+    assert cache.get("BBBBBB", "overview") is None
+    for code in ("AAAAAA", "CCCCCC", "DDDDDD"):
+        assert cache.get(code, "overview") is not None
+
+
+def test_directory_cache_version_file(tmp_path):
+    root = tmp_path / "cache"
+    cache = DirectoryCache(root)
+    cache.set("PHYTIN", "overview", PAYLOAD)
+    assert (root / "VERSION").read_text() == str(DirectoryCache.SCHEMA_VERSION)
+
+    # Trees from before versioning are kept
+    (root / "VERSION").unlink()
+    assert DirectoryCache(root).get("PHYTIN", "overview").data == PAYLOAD
+
+    (root / "VERSION").write_text("0")
+    assert DirectoryCache(root).get("PHYTIN", "overview") is None
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {}
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Answers every request with ``respond(url)``; records the URLs."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return self.respond(url)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "EPPO_CACHE_TTL", {"overview": 100})
+    monkeypatch.setattr(Config, "EPPO_CACHE_TTL_DEFAULT", 100)
+    clients = []
+
+    def make(respond, **kwargs):
+        client = EPPOClient(
+            cache=SQLiteCache(tmp_path / "cache.sqlite"),
+            rate_limiter=RateLimiter(rate=1000, burst=1000),
+            **kwargs,
+        )
+        client.session.close()
+        client.session = FakeSession(respond)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def _seed(client, data, age):
+    client.cache.set_many([("PHYTIN", "overview", data)], time.time() - age)
+
+
+def test_fresh_entry_is_served_from_cache(make_client):
+    client = make_client(lambda url: FakeResponse({"prefname": "new"}))
+    _seed(client, {"prefname": "old"}, age=10)
+    assert client._get_endpoint("PHYTIN", "overview") == {"prefname": "old"}
+    assert client.session.urls == []
+    assert client.cache_hits == 1
+
+
+def test_expired_entry_is_refetched(make_client):
+    client = make_client(
+        lambda url: FakeResponse({"prefname": "new"}), stale_while_revalidate=False
+    )
+    _seed(client, {"prefname": "old"}, age=1000)
+    assert client._get_endpoint("PHYTIN", "overview") == {"prefname": "new"}
+    assert client.expired == 1
+    assert client.cache.get("PHYTIN", "overview").data == {"prefname": "new"}
+
+
+def test_expired_entry_is_served_when_the_api_fails(make_client):
+    client = make_client(
+        lambda url: FakeResponse(None, 404), stale_while_revalidate=False
+    )
+    _seed(client, {"prefname": "old"}, age=1000)
+    assert client._get_endpoint("PHYTIN", "overview") == {"prefname": "old"}
+    assert client.stale_hits == 1
+
+
+def test_stale_while_revalidate_serves_old_data_and_refreshes_once(make_client):
+    release = threading.Event()
+
+    def respond(url):
+        release.wait(5)
+        return FakeResponse({"prefname": "new"})
+
+    client = make_client(respond, stale_while_revalidate=True)
+    _seed(client, {"prefname": "old"}, age=1000)
+    for _ in range(3):
+        assert client._get_endpoint("PHYTIN", "overview") == {"prefname": "old"}
+    assert client.stale_hits == 3
+    assert client.refreshes == 1
+
+    release.set()
+    client.close()
+    assert len(client.session.urls) == 1
+    assert client._refresh_threads == set()
+
+
+def test_refresh_lands_in_cache_before_close_returns(make_client, tmp_path):
+    client = make_client(
+        lambda url: FakeResponse({"prefname": "new"}), stale_while_revalidate=True
+    )
+    _seed(client, {"prefname": "old"}, age=1000)
+    client._get_endpoint("PHYTIN", "overview")
+    client.close()
+
+    cache = SQLiteCache(tmp_path / "cache.sqlite")
+    assert cache.get("PHYTIN", "overview").data == {"prefname": "new"}
+    cache.close()
+
+
+def test_closed_client_starts_no_refresh(make_client):
+    client = make_client(
+        lambda url: FakeResponse({"prefname": "new"}), stale_while_revalidate=True
+    )
+    client.close()
+    assert not client._claim_refresh("PHYTIN", "overview")
+    assert client.refreshes == 0
+
+
+def test_response_cache_opens_its_file_on_first_use(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    responses = ResponseCache(path)
+    assert not path.exists()
+    assert responses.evictions == 0
+    responses.close()
+    assert not path.exists()
+
+    responses = ResponseCache(path)
+    assert responses.get("PHYTIN", "key") is None
+    assert path.exists()
+    responses.close()
+
+
+def test_response_cache_expires_answers(tmp_path, clock):
+    responses = ResponseCache(tmp_path / "responses.sqlite", ttl=100)
+    key = ResponseCache.make_key("Potato late blight", "facts")
+    responses.set("PHYTIN", key, "answer")
+    clock.advance(50)
+    assert responses.get("PHYTIN", key) == "answer"
+    clock.advance(60)
+    assert responses.get("PHYTIN", key) is None
+    assert (responses.hits, responses.misses, responses.expired) == (1, 1, 1)
+    responses.close()
+
+
+def test_response_cache_invalidates_by_code(tmp_path):
+    responses = ResponseCache(tmp_path / "responses.sqlite")
+    responses.set("PHYTIN", ResponseCache.make_key("a"), "one")
+    responses.set("PHYTIN", ResponseCache.make_key("b"), "two")
+    responses.set("ALTESO", ResponseCache.make_key("a"), "three")
+    assert responses.invalidate("PHYTIN") == 2
+    assert responses.get("ALTESO", ResponseCache.make_key("a")) == "three"
+    responses.close()
@@ -0,0 +1,189 @@
+"""CoalescingDiagnoser: joining in-flight labels, batching and admission."""
+
+import threading
+
+import pytest
+
+from conftest import FakeEPPOClient, FakeGenerator, wait_until
+from src import coalescing
+from src.coalescing import CoalescingDiagnoser, QueueFullError
+from src.pipeline import REFUSAL_LOW_CONFIDENCE, REFUSAL_NO_CANDIDATES
+from src.retrieval import RetrievalSession
+
+
+@pytest.fixture
+def make_diagnoser(eppo_db):
+    diagnosers = []
+
+    def make(eppo_client=None, **kwargs):
+        kwargs.setdefault("window", 0.05)
+        diagnoser = CoalescingDiagnoser(
+            eppo_client=eppo_client or FakeEPPOClient(),
+            generator=FakeGenerator(),
+            retriever=RetrievalSession(eppo_db),
+            **kwargs,
+        )
+        diagnosers.append(diagnoser)
+        return diagnoser
+
+    yield make
+    for diagnoser in diagnosers:
+        if diagnoser.eppo_client.gate is not None:
+            diagnoser.eppo_client.gate.set()
+        diagnoser.close()
+
+
+def test_identical_labels_share_one_run_but_not_results(make_diagnoser):
+    gate = threading.Event()
+    diagnoser = make_diagnoser(FakeEPPOClient(gate=gate))
+    futures = [diagnoser.submit("Potato late blight") for _ in range(5)]
+    gate.set()
+    results = [f.result(5) for f in futures]
+
+    assert diagnoser.eppo_client.calls == {"PHYTIN": 1}
+    assert diagnoser.generator.labels == ["Potato late blight"]
+    assert len({id(r) for r in results}) == 5
+    assert all(r.eppocode == "PHYTIN" and not r.refused for r in results)
+    results[0].message = "edited by one caller"
+    assert results[1].message == "Potato late blight -> Phytophthora infestans"
+
+    stats = diagnoser.get_stats()
+    assert (stats["submitted"], stats["coalesced"], stats["dispatched"]) == (5, 4, 1)
+
+
+def test_labels_that_normalize_alike_share_the_fetch_not_the_answer(make_diagnoser):
+    diagnoser = make_diagnoser(window=0.2)
+    labels = ["Potato late blight", "potato  LATE blight"]
+    futures = [diagnoser.submit(label) for label in labels]
+    results = [f.result(5) for f in futures]
+
+    assert diagnoser.eppo_client.calls == {"PHYTIN": 1}
+    assert sorted(diagnoser.generator.labels) == sorted(labels)
+    assert [r.message for r in results] == [
+        f"{label} -> Phytophthora infestans" for label in labels
+    ]
+    assert diagnoser.get_stats()["batches"] == 1
+
+
+def test_distinct_codes_in_one_batch(make_diagnoser):
+    diagnoser = make_diagnoser(window=0.2)
+    futures = {
+        label: diagnoser.submit(label) for label in ("Potato late blight", "Apple scab")
+    }
+    codes = {label: f.result(5).eppocode for label, f in futures.items()}
+    assert codes == {"Potato late blight": "PHYTIN", "Apple scab": "VENTIN"}
+    assert diagnoser.get_stats()["fetches"] == 2
+
+
+def test_refusals_without_candidates(make_diagnoser):
+    diagnoser = make_diagnoser()
+    empty = diagnoser.diagnose("")
+    assert empty.refused and empty.message == REFUSAL_NO_CANDIDATES
+    unknown = diagnoser.diagnose("Zebra stripes", timeout=5)
+    assert unknown.refused and unknown.message == REFUSAL_LOW_CONFIDENCE
+    assert diagnoser.eppo_client.calls == {}
+
+
+def test_falls_back_to_a_runner_up_that_validates(make_diagnoser):
+    # "blight potato" ties ALTESO and PHYTIN; ALTESO ranks first by code
+    client = FakeEPPOClient(broken={"ALTESO"})
+    diagnoser = make_diagnoser(client, prefetch_k=3)
+    result = diagnoser.diagnose("Blight potato", timeout=5)
+    assert not result.refused
+    assert result.eppocode == "PHYTIN"
+    assert client.calls == {"ALTESO": 1, "PHYTIN": 1}
+
+
+def test_refuses_when_validation_fails_without_fallback(make_diagnoser):
+    client = FakeEPPOClient(broken={"ALTESO"})
+    diagnoser = make_diagnoser(client, prefetch_k=1)
+    result = diagnoser.diagnose("Blight potato", timeout=5)
+    assert result.refused and result.eppocode == "ALTESO"
+
+
+def test_fetch_errors_reach_every_caller(make_diagnoser):
+    gate = threading.Event()
+    diagnoser = make_diagnoser(FakeEPPOClient(gate=gate, error=OSError("down")))
+    futures = [diagnoser.submit("Apple scab") for _ in range(3)]
+    gate.set()
+    for future in futures:
+        with pytest.raises(OSError, match="down"):
+            future.result(5)
+    assert diagnoser.get_stats()["failed"] == 1
+
+
+def test_rejects_new_labels_when_full_but_admits_joins(make_diagnoser):
+    gate = threading.Event()
+    diagnoser = make_diagnoser(FakeEPPOClient(gate=gate), max_pending=1, window=0)
+    first = diagnoser.submit("Apple scab")
+    with pytest.raises(QueueFullError):
+        diagnoser.submit("Potato late blight")
+    joined = diagnoser.submit("Apple scab")
+    assert diagnoser.get_stats()["rejected"] == 1
+
+    # A waiting submit is admitted once the running request completes
+    waiter = []
+    thread = threading.Thread(
+        target=lambda: waiter.append(diagnoser.submit("Potato late blight", None))
+    )
+    thread.start()
+    wait_until(lambda: diagnoser.eppo_client.calls["VENTIN"] == 1)
+    gate.set()
+    thread.join(5)
+    assert first.result(5).eppocode == joined.result(5).eppocode == "VENTIN"
+    assert waiter[0].result(5).eppocode == "PHYTIN"
+
+
+def test_close_finishes_pending_requests_and_refuses_new_ones(make_diagnoser):
+    diagnoser = make_diagnoser(window=10)
+    future = diagnoser.submit("Apple scab")
+    diagnoser.close()
+    assert future.result(0).eppocode == "VENTIN"
+    with pytest.raises(RuntimeError, match="closed"):
+        diagnoser.submit("Apple scab")
+
+
+def test_close_closes_only_the_clients_it_created(eppo_db, monkeypatch):
+    class OwnedClient(FakeEPPOClient):
+        closed = 0
+
+        def close(self):
+            self.closed += 1
+
+    class OwnedGenerator(FakeGenerator):
+        closed = 0
+
+        def close(self):
+            self.closed += 1
+
+    monkeypatch.setattr(coalescing, "EPPOClient", OwnedClient)
+    monkeypatch.setattr(coalescing, "ResponseGenerator", OwnedGenerator)
+    retriever = RetrievalSession(eppo_db)
+    with CoalescingDiagnoser(retriever=retriever, window=0) as owning:
+        assert owning.diagnose("Apple scab").eppocode == "VENTIN"
+    assert (owning.eppo_client.closed, owning.generator.closed) == (1, 1)
+
+    client, generator = OwnedClient(), OwnedGenerator()
+    with CoalescingDiagnoser(
+        eppo_client=client, generator=generator, retriever=retriever, window=0
+    ):
+        pass
+    assert (client.closed, generator.closed) == (0, 0)
+
+
+def test_malformed_candidates_fail_the_batch_instead_of_hanging():
+    class BrokenRetriever:
+        def query(self, norm):
+            return [object()]
+
+    with CoalescingDiagnoser(
+        eppo_client=FakeEPPOClient(),
+        generator=FakeGenerator(),
+        retriever=BrokenRetriever(),
+        window=0.05,
+    ) as diagnoser:
+        futures = [diagnoser.submit(label) for label in ("Apple scab", "Potato blight")]
+        for future in futures:
+            with pytest.raises(AttributeError):
+                future.result(timeout=5)
+    assert diagnoser.get_stats()["failed"] == 2
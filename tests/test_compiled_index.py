@@ -0,0 +1,137 @@
+"""CompiledNameIndex ranks exactly like the SQLite retrieval path."""
+
+import itertools
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from conftest import make_norm  # noqa: E402
+from src.compiled_index import CompiledNameIndex  # noqa: E402
+from src.retrieval import query_candidates  # noqa: E402
+
+QUERIES = [
+    ("late", "blight", "potato"),
+    ("brown", "blight"),
+    ("blight",),
+    ("potato",),
+    ("apple", "scab"),
+    ("wart",),
+    ("unknown",),
+]
+
+
+def _ranked(candidates):
+    return [
+        (
+            c.eppocode,
+            c.dtcode,
+            c.fullname,
+            round(c.score, 9),
+            c.token_overlap,
+            c.host_match,
+        )
+        for c in candidates
+    ]
+
+
+@pytest.mark.parametrize("tokens", QUERIES)
+def test_query_matches_query_candidates(eppo_db, tokens):
+    index = CompiledNameIndex.from_sqlite(eppo_db)
+    norm = make_norm(*tokens)
+    expected = query_candidates(eppo_db, norm, use_index=False)
+    assert _ranked(index.query(norm)) == _ranked(expected)
+
+
+def test_query_matches_with_location_terms(eppo_db):
+    index = CompiledNameIndex.from_sqlite(eppo_db)
+    norm = make_norm("potato", "late", "blight", locations=["late"])
+    expected = query_candidates(eppo_db, norm, use_index=False)
+    assert _ranked(index.query(norm)) == _ranked(expected)
+
+
+def test_score_ties_go_to_the_smaller_code_whatever_the_row_order():
+    rows = [
+        ("ZZBLIG", "GAF", "brown blight of pear"),
+        ("AABLIG", "GAF", "brown blight of pear"),
+        ("MMBLIG", "SFT", "brown blight of pear"),
+        ("MMBLIG", "GAF", "brown blight of pear"),
+    ]
+    norm = make_norm("brown", "blight")
+    for order in itertools.permutations(rows):
+        ranked = CompiledNameIndex.from_rows(order).query(norm)
+        assert [(c.eppocode, c.dtcode) for c in ranked] == [
+            ("AABLIG", "GAF"),
+            ("MMBLIG", "GAF"),
+            ("ZZBLIG", "GAF"),
+            ("MMBLIG", "SFT"),
+        ]
+
+
+def test_best_name_per_code_is_longest_then_smallest():
+    rows = [
+        ("PHYTIN", "GAF", "late blight of tomato"),
+        ("PHYTIN", "GAF", "blight"),
+        ("PHYTIN", "GAF", "late blight of potato"),
+        ("PHYTIN", "GAF", "blight of tubers"),
+    ]
+    for order in itertools.permutations(rows):
+        index = CompiledNameIndex.from_rows(order)
+        (best,) = index.query(make_norm("blight"))
+        assert best.fullname == "late blight of potato"
+        (best,) = index.query(make_norm("tubers", "blight"))
+        assert best.fullname == "blight of tubers"
+
+
+def test_query_respects_max_candidates(eppo_db):
+    index = CompiledNameIndex.from_sqlite(eppo_db)
+    norm = make_norm("blight")
+    full = index.query(norm)
+    assert len(full) == 4
+    assert _ranked(index.query(norm, max_candidates=2)) == _ranked(full[:2])
+
+
+def test_query_many_keeps_input_order(eppo_db):
+    index = CompiledNameIndex.from_sqlite(eppo_db)
+    norms = [make_norm(*tokens) for tokens in QUERIES]
+    results = index.query_many(norms)
+    assert [_ranked(r) for r in results] == [_ranked(index.query(n)) for n in norms]
+
+
+def test_saved_index_maps_back_with_the_same_ranking(eppo_db, tmp_path):
+    built = CompiledNameIndex.from_sqlite(eppo_db)
+    path = tmp_path / "eppo.names.idx"
+    built.save(path, eppo_db)
+    loaded = CompiledNameIndex.load(path, eppo_db)
+    for tokens in QUERIES:
+        norm = make_norm(*tokens)
+        assert _ranked(loaded.query(norm)) == _ranked(built.query(norm))
+    assert loaded.token_frequencies() == built.token_frequencies()
+
+
+def test_packed_index_holds_no_python_strings_and_ranks_the_same(eppo_db):
+    built = CompiledNameIndex.from_sqlite(eppo_db)
+    packed = built.packed()
+    assert not isinstance(packed.names, list)
+    assert not isinstance(packed.token_ids, dict)
+    assert packed.packed() is packed
+    for tokens in QUERIES:
+        norm = make_norm(*tokens)
+        assert _ranked(packed.query(norm)) == _ranked(built.query(norm))
+    assert packed.token_frequencies() == built.token_frequencies()
+
+
+def test_load_rejects_an_index_of_another_database(eppo_db, tmp_path):
+    path = tmp_path / "eppo.names.idx"
+    CompiledNameIndex.from_sqlite(eppo_db).save(path, eppo_db)
+    with open(eppo_db, "ab") as f:
+        f.write(b"\0" * 16)
+    with pytest.raises(ValueError, match="different"):
+        CompiledNameIndex.load(path, eppo_db)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not-an-index"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="not a compiled name index"):
+        CompiledNameIndex.load(path)
@@ -0,0 +1,171 @@
+"""Derived fact artifacts, their storage next to the cached facts, and the
+compact prompt block."""
+
+import pytest
+
+from src import eppo_client
+from src.cache import SQLiteCache
+from src.eppo_client import EPPOClient
+from src.facts import (
+    DERIVED_ENDPOINT,
+    DERIVED_VERSION,
+    DerivedFacts,
+    content_hash,
+    derive_facts,
+    fact_tokens,
+    format_facts,
+    format_facts_compact,
+    prompt_block,
+)
+from src.rate_limit import RateLimiter
+from src.tokens import estimate_tokens
+
+OVERVIEW = {"prefname": "Phytophthora infestans", "eppocode": "PHYTIN"}
+NAMES = [{"fullname": "late blight of potato"}]
+HOSTS = [{"prefname": "Solanum tuberosum", "class_label": "Major host"}]
+FACTS = {"overview": OVERVIEW, "names": NAMES, "hosts": HOSTS}
+
+
+def test_derive_facts_matches_the_fallbacks():
+    derived = derive_facts(FACTS)
+    assert derived.tokens == fact_tokens(FACTS)
+    assert derived.prompt_block == prompt_block(FACTS) == format_facts(FACTS)
+    assert {"phytophthora", "blight", "potato", "tuberosum"} <= derived.tokens
+
+
+def test_attached_artifacts_are_used_as_is():
+    derived = DerivedFacts(
+        tokens=frozenset({"cached"}), prompt_block="cached block", content_hash="0" * 64
+    )
+    facts = dict(FACTS, derived=derived)
+    assert fact_tokens(facts) == {"cached"}
+    assert prompt_block(facts) == "cached block"
+
+
+def test_json_round_trip():
+    derived = derive_facts(FACTS)
+    data = derived.to_json([1.0, 2.0, 3.0])
+    assert data["version"] == DERIVED_VERSION
+    assert DerivedFacts.from_json(data, [1.0, 2.0, 3.0]) == derived
+
+
+@pytest.mark.parametrize(
+    "data, sources",
+    [
+        ({"version": DERIVED_VERSION + 1}, [1.0, 2.0, 3.0]),
+        (None, [1.0, 2.0, 3.0]),
+        ({"version": DERIVED_VERSION, "sources": [1.0, 2.0, 3.0]}, [1.0, 2.0, 3.0]),
+    ],
+)
+def test_from_json_rejects_unusable_records(data, sources):
+    assert DerivedFacts.from_json(data, sources) is None
+
+
+def test_from_json_rejects_records_of_rewritten_entries():
+    data = derive_facts(FACTS).to_json([1.0, 2.0, 3.0])
+    assert DerivedFacts.from_json(data, [1.0, 2.5, 3.0]) is None
+    changed = dict(FACTS, names=[{"fullname": "potato murrain"}])
+    assert DerivedFacts.from_json(data, [1.0, 2.5, 3.0], content_hash(changed)) is None
+
+
+def test_from_json_accepts_rewritten_entries_of_the_same_content():
+    derived = derive_facts(FACTS)
+    data = derived.to_json([1.0, 2.0, 3.0])
+    assert DerivedFacts.from_json(data, [1.0, 2.5, 3.0], content_hash(FACTS)) == derived
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    clients = []
+
+    def make():
+        client = EPPOClient(
+            cache=SQLiteCache(path), rate_limiter=RateLimiter(rate=1000, burst=1000)
+        )
+        clients.append(client)
+        return client
+
+    cache = SQLiteCache(path)
+    cache.set_many(
+        [
+            ("PHYTIN", "overview", OVERVIEW),
+            ("PHYTIN", "names", NAMES),
+            ("PHYTIN", "hosts", HOSTS),
+        ]
+    )
+    cache.close()
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_client_stores_artifacts_and_reuses_them(make_client):
+    first = make_client()
+    derived = first.fetch_facts("PHYTIN")["derived"]
+    assert derived == derive_facts(FACTS)
+    assert (first.derived_computed, first.derived_loaded) == (1, 0)
+    assert first.cache.get("PHYTIN", DERIVED_ENDPOINT) is not None
+
+    second = make_client()
+    assert second.fetch_facts("PHYTIN")["derived"] == derived
+    assert (second.derived_computed, second.derived_loaded) == (0, 1)
+
+
+def test_client_rederives_after_an_entry_changes(make_client):
+    make_client().fetch_facts("PHYTIN")
+    client = make_client()
+    client.cache.set("PHYTIN", "names", [{"fullname": "potato murrain"}])
+    derived = client.fetch_facts("PHYTIN")["derived"]
+    assert client.derived_computed == 1
+    assert "murrain" in derived.tokens
+
+
+def test_client_reuses_artifacts_after_an_identical_refetch(make_client, monkeypatch):
+    derived = make_client().fetch_facts("PHYTIN")["derived"]
+    client = make_client()
+    client.cache.set("PHYTIN", "hosts", HOSTS)
+    assert client.fetch_facts("PHYTIN")["derived"] == derived
+    assert (client.derived_computed, client.derived_loaded) == (0, 1)
+
+    # Re-tagged with the new stamps, so the next fetch skips the hash
+    monkeypatch.setattr(eppo_client, "content_hash", lambda facts: pytest.fail())
+    again = make_client()
+    assert again.fetch_facts("PHYTIN")["derived"] == derived
+    assert again.derived_loaded == 1
+
+
+RICH_FACTS = {
+    "overview": OVERVIEW,
+    "names": [
+        {"fullname": "late blight of potato"},
+        {"fullname": "Phytophthora infestans"},
+        {"fullname": "potato blight"},
+        {"fullname": "tomato late blight"},
+    ],
+    "hosts": [
+        {"prefname": "Capsicum annuum", "class_label": "Minor host"},
+        {"prefname": "Solanum tuberosum", "class_label": "Major host"},
+        {"prefname": "Solanum lycopersicum", "class_label": "Major host"},
+    ],
+}
+
+
+@pytest.mark.parametrize("budget", [20, 30, 40, 60, 200])
+def test_compact_block_stays_within_budget(budget):
+    block = format_facts_compact(RICH_FACTS, budget)
+    assert estimate_tokens(block) <= budget
+    assert block.startswith("Phytophthora infestans (PHYTIN)")
+
+
+def test_compact_block_keeps_the_preferred_name_over_budget():
+    assert format_facts_compact(RICH_FACTS, 0) == "Phytophthora infestans (PHYTIN)"
+
+
+def test_compact_block_trims_hosts_before_names_and_minor_hosts_first():
+    lines = format_facts_compact(RICH_FACTS, 60).splitlines()
+    assert lines[1] == "Names: late blight of potato, potato blight, tomato late blight"
+    assert lines[2] == (
+        "Hosts: Solanum tuberosum (Major host), Solanum lycopersicum (Major host)"
+    )
+    assert "Capsicum annuum (Minor host)" in format_facts_compact(RICH_FACTS, 200)
@@ -0,0 +1,174 @@
+"""Typo-tolerant token resolution."""
+
+import random
+
+import pytest
+
+from conftest import FakeEPPOClient, FakeGenerator, make_norm
+from src import fuzzy
+from src.config import Config
+from src.fuzzy import (
+    FuzzyTokenResolver,
+    correct_label,
+    edit_distance,
+    load_resolver,
+    set_resolver,
+)
+from src.pipeline import diagnose
+from src.prefetch import resolve_labels
+from src.retrieval import RetrievalSession
+
+FREQUENCIES = {
+    "blight": 10,
+    "bright": 3,
+    "potato": 5,
+    "tomato": 4,
+    "leaves": 2,
+    "plant": 8,
+    "rust": 5,
+    "rost": 9,
+    "phytophthora": 1,
+}
+
+
+@pytest.fixture
+def resolver():
+    return FuzzyTokenResolver(FREQUENCIES)
+
+
+def _osa(a: str, b: str) -> int:
+    """Reference optimal string alignment distance (full table)."""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(
+                d[i - 1][j] + 1,
+                d[i][j - 1] + 1,
+                d[i - 1][j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("blight", "blight", 0),
+        ("blight", "blihgt", 1),
+        ("blight", "bight", 1),
+        ("blight", "plight", 1),
+        ("blight", "blights", 1),
+        ("kitten", "sitting", 3),
+        # Distances past the bound are reported as bound + 1
+        ("abcde", "vwxyz", 3),
+        ("", "ab", 2),
+    ],
+)
+def test_edit_distance(a, b, expected):
+    assert edit_distance(a, b, 2) == expected
+
+
+def test_edit_distance_matches_reference_within_bound():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+        for bound in (1, 2, 3):
+            assert edit_distance(a, b, bound) == min(_osa(a, b), bound + 1), (a, b)
+
+
+def test_known_tokens_resolve_to_themselves(resolver):
+    assert resolver.suggest("blight") == [("blight", 0)]
+    assert resolver.lookup("blight") == "blight"
+
+
+def test_one_edit_for_short_tokens(resolver):
+    assert resolver.suggest("blihgt") == [("blight", 1)]
+    # Two edits from "blight", too many for six letters
+    assert resolver.lookup("blahgt") is None
+
+
+def test_two_edits_from_seven_characters(resolver):
+    assert resolver.lookup("potatoes") == "potato"
+    assert resolver.lookup("phytopthroa") == "phytophthora"
+
+
+def test_tokens_below_min_length_are_not_corrected(resolver):
+    assert resolver.max_distance_for("tom") == 0
+    assert resolver.suggest("tom") == []
+    assert resolver.lookup("tom") is None
+
+
+def test_ties_go_to_the_more_frequent_token(resolver):
+    assert resolver.suggest("rast") == [("rost", 1), ("rust", 1)]
+    assert resolver.lookup("rast") == "rost"
+
+
+def test_lookup_is_memoized(resolver, monkeypatch):
+    assert resolver.lookup("tomatto") == "tomato"
+    monkeypatch.setattr(resolver, "suggest", lambda *a: pytest.fail("not memoized"))
+    assert resolver.lookup("tomatto") == "tomato"
+
+
+def test_correct_replaces_unknown_tokens(resolver):
+    norm = make_norm("tomatto", "leavse", "blihgt", "zzzzzz")
+    corrected = resolver.correct(norm)
+    assert corrected.tokens == ["tomato", "leaves", "blight", "zzzzzz"]
+    assert corrected.host_candidates == ["tomato"]
+    assert corrected.location_terms == ["leaves"]
+    assert corrected.original == norm.original
+    assert resolver.corrections == 3
+
+
+def test_correct_merges_tokens_that_resolve_alike(resolver):
+    assert resolver.correct(make_norm("blight", "blihgt")).tokens == ["blight"]
+
+
+def test_correct_keeps_known_labels_and_generic_corrections(resolver):
+    known = make_norm("potato", "blight")
+    assert resolver.correct(known) is known
+    # "plnat" is one edit from "plant", a generic term
+    typo = make_norm("plnat")
+    assert resolver.correct(typo) is typo
+
+
+def test_correct_label_uses_the_installed_resolver(resolver, monkeypatch):
+    monkeypatch.setattr(fuzzy, "_resolver", None)
+    norm = make_norm("blihgt")
+    assert correct_label(norm) is norm
+    set_resolver(resolver)
+    assert correct_label(norm).tokens == ["blight"]
+
+
+def test_vocabulary_from_sqlite_holds_active_names_only(eppo_db):
+    resolver = FuzzyTokenResolver.from_sqlite(eppo_db)
+    assert "wart" not in resolver
+    assert resolver.frequencies["blight"] == 6
+    assert resolver.lookup("infestnas") == "infestans"
+
+
+def test_prefetch_resolves_misspelled_labels_like_diagnose(eppo_db, monkeypatch):
+    monkeypatch.setattr(fuzzy, "_resolver", None)
+    monkeypatch.setattr(Config, "FUZZY_TOKENS", True)
+    labels = ["Phytopthora infestnas", "Alternria solnai"]
+    assert resolve_labels(labels, eppo_db) == ([], labels)
+
+    load_resolver(eppo_db)
+    codes, unresolved = resolve_labels(labels, eppo_db)
+    retriever = RetrievalSession(eppo_db)
+    diagnosed = [
+        diagnose(
+            label,
+            eppo_client=FakeEPPOClient(),
+            generator=FakeGenerator(),
+            retriever=retriever,
+        ).eppocode
+        for label in labels
+    ]
+    assert codes == diagnosed == ["PHYTIN", "ALTESO"]
+    assert unresolved == []
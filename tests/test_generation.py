@@ -0,0 +1,55 @@
+"""Compact prompt mode of ResponseGenerator."""
+
+import pytest
+
+from src.config import Config
+from src.facts import format_facts_compact
+from src.generation import ResponseGenerator
+from src.tokens import completion_tokens_for
+
+SMALL_FACTS = {
+    "overview": {"prefname": "Venturia inaequalis", "eppocode": "VENTIN"},
+    "names": [{"fullname": "apple scab"}],
+}
+LARGE_FACTS = {
+    "overview": {"prefname": "Phytophthora infestans", "eppocode": "PHYTIN"},
+    "names": [{"fullname": f"late blight of host number {i}"} for i in range(5)],
+    "hosts": [
+        {"prefname": f"Solanum species {i}", "class_label": "Major host"}
+        for i in range(10)
+    ],
+}
+
+
+@pytest.fixture
+def generator():
+    return ResponseGenerator(api_key="", use_response_cache=False, compact=True)
+
+
+def _block(facts):
+    return format_facts_compact(facts, Config.GROQ_FACTS_TOKEN_BUDGET)
+
+
+def test_completion_cap_follows_the_facts_sent(generator):
+    small, large = _block(SMALL_FACTS), _block(LARGE_FACTS)
+    assert generator._answer_words(small) < generator._answer_words(large)
+    assert generator._max_tokens(small) < generator._max_tokens(large)
+    assert generator._max_tokens(small) == (
+        completion_tokens_for(generator._answer_words(small))
+        + Config.GROQ_REASONING_TOKENS
+    )
+    assert f"at most {generator._answer_words(small)} words" in (
+        generator._user_prompt("Apple scab", small)
+    )
+
+
+def test_answer_length_is_bounded(generator, monkeypatch):
+    assert generator._answer_words("") == Config.GROQ_COMPACT_MIN_ANSWER_WORDS
+    monkeypatch.setattr(Config, "GROQ_COMPACT_WORDS_PER_FACT_TOKEN", 100.0)
+    words = generator._answer_words(_block(SMALL_FACTS))
+    assert words == Config.GROQ_COMPACT_ANSWER_WORDS
+
+
+def test_full_mode_keeps_the_configured_cap():
+    generator = ResponseGenerator(api_key="", use_response_cache=False, compact=False)
+    assert generator._max_tokens(_block(SMALL_FACTS)) == Config.GROQ_MAX_TOKENS
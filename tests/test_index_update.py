@@ -0,0 +1,135 @@
+"""Release diffs and incremental token index patches."""
+
+import sqlite3
+import warnings
+
+import pytest
+
+from conftest import CODES, NAMES, make_norm, write_db
+from src.cache import ResponseCache, SQLiteCache
+from src.index_update import (
+    diff_databases,
+    invalidate_codes,
+    patch_name_index,
+    update_name_index,
+)
+from src.name_index import build_name_index
+from src.retrieval import index_is_current, index_path_for, query_candidates
+
+
+def _new_release():
+    codes = [c for c in CODES if c[0] != 6] + [
+        (6, "OLDCOD", "GAF", "A"),
+        (9, "NEWCOD", "GAF", "A"),
+    ]
+    names = [n for n in NAMES if n[0] not in (12, 16)] + [
+        (12, 5, "scab of apple fruit", "A"),
+        (17, 3, "Irish potato", "A"),
+        (18, 9, "potato smut", "A"),
+    ]
+    return codes, names
+
+
+@pytest.fixture
+def releases(tmp_path):
+    old = write_db(tmp_path / "old.sqlite", CODES, NAMES)
+    new = write_db(tmp_path / "new.sqlite", *_new_release())
+    return old, new
+
+
+def _index_rows(index_path):
+    conn = sqlite3.connect(str(index_path))
+    try:
+        names = conn.execute("SELECT * FROM names ORDER BY nameid").fetchall()
+        tokens = conn.execute(
+            "SELECT token, nameid FROM name_tokens ORDER BY token, nameid"
+        ).fetchall()
+    finally:
+        conn.close()
+    return names, tokens
+
+
+def test_diff_databases(releases):
+    old, new = releases
+    diff = diff_databases(old, new)
+    assert diff.codes_added == {9}
+    assert diff.codes_removed == set()
+    assert diff.codes_changed == {6}
+    assert diff.names_added == {17, 18}
+    assert diff.names_removed == {16}
+    assert diff.names_changed == {12}
+    # Changed names plus every name of a changed code
+    assert diff.affected_nameids == {12, 14, 16, 17, 18}
+    assert diff.eppocodes == {"NEWCOD", "OLDCOD", "VENTIN", "AABLIG", "SOLTU"}
+    assert diff.summary()["eppocodes"] == 5
+
+
+def test_diff_of_identical_releases_is_empty(releases):
+    old, _ = releases
+    diff = diff_databases(old, old)
+    assert diff.affected_nameids == set()
+    assert diff.eppocodes == set()
+
+
+def test_patched_index_equals_a_rebuild(releases, tmp_path):
+    old, new = releases
+    old_index = index_path_for(old)
+    build_name_index(old)
+    patched = tmp_path / "patched.tokens.sqlite"
+    stats = patch_name_index(old_index, new, diff_databases(old, new), patched)
+
+    rebuilt = tmp_path / "rebuilt.tokens.sqlite"
+    build_name_index(new, rebuilt)
+    assert _index_rows(patched) == _index_rows(rebuilt)
+    assert stats["names_deleted"] == 2
+    assert stats["names_inserted"] == 4
+    assert index_is_current(patched, new)
+    # The old index is left untouched for readers that still have it open
+    assert index_is_current(old_index, old)
+
+
+def test_patched_index_serves_queries_without_fallback(releases):
+    old, new = releases
+    build_name_index(old)
+    new_index = index_path_for(new)
+    patch_name_index(index_path_for(old), new, diff_databases(old, new), new_index)
+
+    norm = make_norm("potato", "smut")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        indexed = query_candidates(new, norm)
+    assert [c.eppocode for c in indexed] == [
+        c.eppocode for c in query_candidates(new, norm, use_index=False)
+    ]
+    assert indexed[0].eppocode == "NEWCOD"
+
+
+def test_update_name_index_patches_only_a_matching_index(releases, tmp_path):
+    old, new = releases
+    diff = diff_databases(old, new)
+    index_path = tmp_path / "eppo.tokens.sqlite"
+
+    build_name_index(old, index_path)
+    assert update_name_index(old, new, index_path, diff)["mode"] == "patched"
+
+    # Now built from ``new``, so it cannot be patched as if from ``old``
+    stats = update_name_index(old, new, index_path, diff)
+    assert stats["mode"] == "rebuilt"
+    assert index_is_current(index_path, new)
+
+
+def test_invalidate_codes_drops_only_changed_codes(tmp_path):
+    cache = SQLiteCache(tmp_path / "facts.sqlite")
+    responses = ResponseCache(tmp_path / "responses.sqlite")
+    for code in ("VENTIN", "PHYTIN"):
+        cache.set(code, "overview", {"prefname": code})
+        cache.set(code, "names", [])
+        responses.set(code, ResponseCache.make_key(code), "answer")
+
+    stats = invalidate_codes(["VENTIN"], cache=cache, response_cache=responses)
+    assert (stats["facts_removed"], stats["responses_removed"]) == (2, 1)
+    assert cache.get("VENTIN", "overview") is None
+    assert cache.get("PHYTIN", "overview") is not None
+    assert responses.get("PHYTIN", ResponseCache.make_key("PHYTIN")) == "answer"
+    cache.close()
+    responses.close()
@@ -0,0 +1,131 @@
+"""Stage timers, hooks, latency percentiles and tracing spans."""
+
+import pytest
+
+from conftest import FakeClock, FakeEPPOClient, FakeGenerator
+from src import instrumentation
+from src.config import Config
+from src.instrumentation import LatencyStats, StageTimer, add_hook, span_hook
+from src.pipeline import diagnose
+from src.retrieval import RetrievalSession
+
+
+@pytest.fixture(autouse=True)
+def no_hooks(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_hooks", [])
+    monkeypatch.setattr(Config, "PIPELINE_TIMINGS", False)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(instrumentation, "time", clock)
+    return clock
+
+
+def test_timer_is_off_unless_enabled_or_hooked():
+    assert StageTimer.start() is None
+    assert StageTimer.start(True) is not None
+    add_hook(lambda stage, seconds: None)
+    assert StageTimer.start() is not None
+    assert StageTimer.start(False) is None
+
+
+def test_repeated_stages_add_up(clock):
+    timer = StageTimer(prefix="batch.")
+    for stage, seconds in [("fetch", 1), ("validate", 2), ("fetch", 3)]:
+        clock.advance(seconds)
+        timer.lap(stage)
+    clock.advance(0.5)
+    assert timer.finish() == {
+        "batch.fetch": 4,
+        "batch.validate": 2,
+        "batch.total": 6.5,
+    }
+
+
+def test_finish_reports_each_stage_once_with_total_last(clock):
+    seen = []
+    add_hook(lambda stage, seconds: seen.append((stage, seconds)))
+    timer = StageTimer()
+    clock.advance(1)
+    timer.lap("fetch")
+    clock.advance(2)
+    timer.lap("fetch")
+    timer.finish()
+    assert seen == [("fetch", 3), ("total", 3)]
+
+
+def test_diagnose_adds_one_sample_per_stage(eppo_db):
+    stats = LatencyStats()
+    add_hook(stats)
+    result = diagnose(
+        "Potato late blight",
+        eppo_client=FakeEPPOClient(),
+        generator=FakeGenerator(),
+        retriever=RetrievalSession(eppo_db),
+        prefetch_k=1,
+    )
+    stages = ["normalize", "retrieve", "select", "fetch", "validate", "generate"]
+    assert list(result.timings) == stages + ["total"]
+    assert {stage: row["count"] for stage, row in stats.summary().items()} == {
+        stage: 1 for stage in stages + ["total"]
+    }
+
+
+def test_percentiles_are_nearest_rank():
+    stats = LatencyStats()
+    for ms in range(100, 0, -1):
+        stats.record("fetch", ms / 1000)
+    row = stats.summary()["fetch"]
+    assert row["count"] == 100
+    assert (row["p50"], row["p95"], row["p99"]) == (0.05, 0.095, 0.099)
+    assert row["mean"] == pytest.approx(0.0505)
+
+
+def test_window_keeps_the_latest_samples():
+    stats = LatencyStats(window=3)
+    stats.record_timings({"fetch": 1.0})
+    for seconds in (2.0, 3.0, 4.0):
+        stats.record("fetch", seconds)
+    assert stats.summary()["fetch"]["mean"] == pytest.approx(3.0)
+    stats.reset()
+    assert stats.summary() == {}
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time):
+        tracer = self
+
+        class Span:
+            def end(self, end_time):
+                tracer.spans.append((name, start_time, end_time))
+
+        return Span()
+
+
+def test_span_hook_lays_stages_back_to_back():
+    tracer = FakeTracer()
+    hook = span_hook(tracer)
+    hook("fetch", 0.25)
+    hook("validate", 0.5)
+    hook("total", 1.0)
+
+    fetch, validate, total = tracer.spans
+    assert [span[0] for span in tracer.spans] == [
+        "diagnose.fetch",
+        "diagnose.validate",
+        "diagnose.total",
+    ]
+    assert fetch[1] == total[1]
+    assert fetch[2] == validate[1]
+    assert fetch[2] - fetch[1] == 250_000_000
+    assert validate[2] - validate[1] == 500_000_000
+    assert total[2] - total[1] == 1_000_000_000
+
+    # The next diagnosis starts with no pending stages
+    hook("total", 0.1)
+    assert tracer.spans[-1][0] == "diagnose.total" and len(tracer.spans) == 4
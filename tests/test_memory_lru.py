@@ -0,0 +1,199 @@
+"""MemoryLRU bounds, TTL and single-flight loading."""
+
+import asyncio
+import threading
+
+import pytest
+
+from conftest import FakeClock, wait_until
+from src import cache as cache_module
+from src.cache import MemoryLRU, _approx_size
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_evicts_least_recently_used_entry():
+    memo = MemoryLRU(max_entries=2, max_bytes=0)
+    memo.set("a", 1)
+    memo.set("b", 2)
+    assert memo.get("a") == 1
+    memo.set("c", 3)
+    assert memo.get("b") is None
+    assert (memo.get("a"), memo.get("c")) == (1, 3)
+    assert memo.evictions == 1
+
+
+def test_evicts_down_to_max_bytes():
+    value = {"name": "x" * 50}
+    size = _approx_size(value)
+    memo = MemoryLRU(max_entries=0, max_bytes=size * 2)
+    for key in "abc":
+        memo.set(key, dict(value))
+    assert len(memo) == 2
+    assert memo.get("a") is None
+    assert memo._bytes == size * 2
+
+
+def test_replacing_a_key_keeps_size_accounting():
+    memo = MemoryLRU(max_entries=0, max_bytes=1000)
+    memo.set("a", "x" * 100)
+    memo.set("a", "y" * 10)
+    assert memo._bytes == _approx_size("y" * 10)
+    memo.invalidate("a")
+    assert memo._bytes == 0 and len(memo) == 0
+
+
+def test_entries_expire_after_ttl(clock):
+    memo = MemoryLRU(max_entries=10, max_bytes=0, ttl=60)
+    memo.set("a", 1)
+    clock.advance(59)
+    assert memo.get("a") == 1
+    clock.advance(1)
+    assert memo.get("a") is None
+    assert len(memo) == 0 and memo._bytes == 0
+
+
+def test_get_or_load_runs_one_load_for_concurrent_misses():
+    memo = MemoryLRU(max_entries=10, max_bytes=0)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(memo.get_or_load("k", load)))
+        for _ in range(8)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    wait_until(lambda: memo.coalesced == 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 8
+    assert (memo.misses, memo.coalesced) == (1, 7)
+    assert memo.get_or_load("k", load) == "value"
+    assert memo.hits == 1
+
+
+def test_get_or_load_shares_errors_and_retries_later():
+    memo = MemoryLRU(max_entries=10, max_bytes=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            memo.get_or_load("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_until(lambda: memo.coalesced == 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2
+    assert memo._inflight == {}
+    assert memo.get_or_load("k", lambda: "ok") == "ok"
+
+
+def test_get_or_load_skips_values_rejected_by_should_store():
+    memo = MemoryLRU(max_entries=10, max_bytes=0)
+    assert memo.get_or_load("k", lambda: None, lambda v: v is not None) is None
+    assert len(memo) == 0
+    assert memo.get_or_load("k", lambda: 1, lambda v: v is not None) == 1
+    assert memo.get("k") == 1
+
+
+def test_aget_or_load_shares_one_load_between_tasks():
+    memo = MemoryLRU(max_entries=10, max_bytes=0)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(memo.aget_or_load("k", load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert calls == [1]
+    assert (memo.misses, memo.coalesced) == (1, 4)
+    assert memo._ainflight == {}
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_load():
+    memo = MemoryLRU(max_entries=10, max_bytes=0)
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def load():
+            await gate.wait()
+            return "value"
+
+        leader = asyncio.ensure_future(memo.aget_or_load("k", load))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(memo.aget_or_load("k", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "value"
+    assert memo.get("k") == "value"
+
+
+def test_load_finishes_when_every_caller_is_cancelled():
+    memo = MemoryLRU(max_entries=10, max_bytes=0)
+
+    async def main():
+        gate = asyncio.Event()
+        done = asyncio.Event()
+
+        async def load():
+            await gate.wait()
+            done.set()
+            return "value"
+
+        caller = asyncio.ensure_future(memo.aget_or_load("k", load))
+        await asyncio.sleep(0)
+        caller.cancel()
+        gate.set()
+        await asyncio.wait_for(done.wait(), 5)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert memo.get("k") == "value"
+    assert memo._ainflight == {}
@@ -0,0 +1,190 @@
+"""diagnose and diagnose_batch: runner-up fallback and shared batch work."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from conftest import FakeEPPOClient, FakeGenerator
+from src import pipeline
+from src.eppo_client import AsyncEPPOClient
+from src.pipeline import (
+    REFUSAL_LOW_CONFIDENCE,
+    REFUSAL_NO_CANDIDATES,
+    REFUSAL_VALIDATION_FAILED,
+    adiagnose,
+    diagnose,
+    diagnose_batch,
+)
+from src.rate_limit import RateLimiter
+from src.retrieval import RetrievalSession
+
+
+@pytest.fixture
+def run(eppo_db):
+    def run(labels, eppo_client=None, **kwargs):
+        eppo_client = eppo_client or FakeEPPOClient()
+        generator = FakeGenerator()
+        results = diagnose_batch(
+            labels,
+            eppo_client=eppo_client,
+            generator=generator,
+            retriever=RetrievalSession(eppo_db),
+            **kwargs,
+        )
+        return results, eppo_client, generator
+
+    return run
+
+
+def test_batch_answers_each_label_in_order(run):
+    labels = ["Potato late blight", "", "Apple scab", "Zebra stripes"]
+    results, client, _ = run(labels)
+    assert [r.eppocode for r in results[::2]] == ["PHYTIN", "VENTIN"]
+    assert results[1].refused and results[1].message == REFUSAL_NO_CANDIDATES
+    assert results[3].refused and results[3].message == REFUSAL_LOW_CONFIDENCE
+    assert client.calls == {"PHYTIN": 1, "VENTIN": 1}
+
+
+def test_duplicates_share_the_fetch_and_the_answer_per_raw_label(run):
+    labels = ["Potato late blight", "potato  LATE blight", "Potato late blight"]
+    results, client, generator = run(labels)
+    assert client.calls == {"PHYTIN": 1}
+    assert generator.labels == ["Potato late blight", "potato  LATE blight"]
+    assert [r.message for r in results] == [
+        f"{label} -> Phytophthora infestans" for label in labels
+    ]
+
+
+def test_every_label_gets_its_own_result(run):
+    results, _, _ = run(["Potato late blight", "Potato late blight", "", ""])
+    assert len({id(r) for r in results}) == 4
+    results[2].message = "edited by one caller"
+    assert results[3].message == REFUSAL_NO_CANDIDATES
+
+
+def test_batch_timings_are_copied_per_result(run):
+    results, _, _ = run(["Apple scab", "Apple scab"], timings=True)
+    first, second = (r.timings for r in results)
+    assert first == second and first is not second
+    assert {"batch.normalize", "batch.fetch", "batch.total"} <= set(first)
+
+
+# "Blight potato" ties ALTESO and PHYTIN; ALTESO ranks first by code
+def test_diagnose_falls_back_to_a_runner_up_that_validates(eppo_db):
+    client = FakeEPPOClient(broken={"ALTESO"})
+    result = diagnose(
+        "Blight potato",
+        eppo_client=client,
+        generator=FakeGenerator(),
+        retriever=RetrievalSession(eppo_db),
+        prefetch_k=3,
+    )
+    assert not result.refused
+    assert result.eppocode == "PHYTIN"
+    assert result.message == "Blight potato -> Phytophthora infestans"
+
+
+def test_diagnose_without_fallback_refuses(eppo_db):
+    client = FakeEPPOClient(broken={"ALTESO"})
+    result = diagnose(
+        "Blight potato",
+        eppo_client=client,
+        generator=FakeGenerator(),
+        retriever=RetrievalSession(eppo_db),
+        prefetch_k=1,
+    )
+    assert result.refused and result.eppocode == "ALTESO"
+    assert result.message == REFUSAL_VALIDATION_FAILED
+    assert client.calls == {"ALTESO": 1}
+
+
+def test_owned_client_outlives_its_runner_up_fetches(eppo_db, monkeypatch):
+    class OwnedClient(FakeEPPOClient):
+        def __init__(self, cache_dir=None):
+            super().__init__()
+            self.finished = []
+            self.finished_at_close = None
+            clients.append(self)
+
+        def fetch_facts(self, eppocode):
+            if eppocode != "ALTESO":
+                time.sleep(0.05)
+            facts = super().fetch_facts(eppocode)
+            self.finished.append(eppocode)
+            return facts
+
+        def close(self):
+            self.finished_at_close = list(self.finished)
+
+    clients = []
+    monkeypatch.setattr(pipeline, "EPPOClient", OwnedClient)
+    result = diagnose(
+        "Blight potato",
+        generator=FakeGenerator(),
+        retriever=RetrievalSession(eppo_db),
+        prefetch_k=3,
+    )
+    assert result.eppocode == "ALTESO"
+    (client,) = clients
+    assert "PHYTIN" in client.calls
+    assert sorted(client.finished_at_close) == sorted(client.calls.elements())
+
+
+def test_batch_falls_back_and_fetches_each_code_once(run):
+    labels = ["Blight potato", "Potato late blight"]
+    results, client, _ = run(
+        labels, eppo_client=FakeEPPOClient(broken={"ALTESO"}), prefetch_k=3
+    )
+    assert [r.eppocode for r in results] == ["PHYTIN", "PHYTIN"]
+    assert client.calls == {"ALTESO": 1, "PHYTIN": 1}
+
+
+def test_batch_without_fallback_refuses(run):
+    results, _, _ = run(
+        ["Blight potato"], eppo_client=FakeEPPOClient(broken={"ALTESO"}), prefetch_k=1
+    )
+    assert results[0].refused and results[0].message == REFUSAL_VALIDATION_FAILED
+
+
+def test_adiagnose_fetches_the_three_endpoints_concurrently(eppo_db):
+    facts = FakeEPPOClient().fetch_facts("VENTIN")
+    requested = []
+    all_in = asyncio.Event()
+
+    async def handler(request):
+        *_, eppocode, endpoint = request.url.path.split("/")
+        requested.append((eppocode, endpoint))
+        if len(requested) == 3:
+            all_in.set()
+        # Only answers once all three requests are in flight
+        await asyncio.wait_for(all_in.wait(), 5)
+        return httpx.Response(200, json=facts.get(endpoint, []))
+
+    class AsyncGenerator(FakeGenerator):
+        async def generate(self, label, facts):
+            return super().generate(label, facts)
+
+    async def run():
+        client = AsyncEPPOClient(
+            use_cache=False, rate_limiter=RateLimiter(rate=1000, burst=10)
+        )
+        await client.http.aclose()
+        client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with client:
+            return await adiagnose(
+                "Apple scab",
+                eppo_client=client,
+                generator=AsyncGenerator(),
+                retriever=RetrievalSession(eppo_db),
+                prefetch_k=1,
+            )
+
+    result = asyncio.run(run())
+    assert result.eppocode == "VENTIN" and not result.refused
+    assert sorted(requested) == [
+        ("VENTIN", "hosts"),
+        ("VENTIN", "names"),
+        ("VENTIN", "overview"),
+    ]
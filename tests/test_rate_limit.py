@@ -0,0 +1,135 @@
+"""Token bucket math, Retry-After parsing and backoff."""
+
+import asyncio
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from conftest import FakeClock
+from src import rate_limit
+from src.rate_limit import HAS_FCNTL, RateLimiter, backoff_delay, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_full_burst_then_waits_for_the_deficit(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.5)
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_refills_at_rate_up_to_burst(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    for _ in range(3):
+        limiter.reserve()
+    clock.advance(1)
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.5)
+
+    clock.advance(3600)
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.5)
+
+
+def test_acquire_sleeps_only_for_the_deficit(clock):
+    limiter = RateLimiter(rate=4, burst=1)
+    start = clock.now
+    for _ in range(5):
+        limiter.acquire()
+    assert clock.now - start == pytest.approx(1.0)
+
+
+def test_block_for_holds_back_callers_with_tokens(clock):
+    limiter = RateLimiter(rate=10, burst=10)
+    limiter.block_for(5)
+    assert limiter.reserve() == pytest.approx(5.0)
+    clock.advance(2)
+    # A shorter block does not shorten the pending one
+    limiter.block_for(1)
+    assert limiter.reserve() == pytest.approx(3.0)
+    clock.advance(3)
+    assert limiter.reserve() == 0.0
+
+
+def test_clock_stepping_back_does_not_drain_the_bucket():
+    limiter = RateLimiter(rate=1, burst=5)
+    state = limiter._take(3.0, updated=110.0, blocked_until=0.0, now=100.0)
+    assert state == (0.0, 2.0, 100.0)
+
+
+def test_in_process_bucket_ignores_wall_clock(monkeypatch):
+    limiter = RateLimiter(rate=1, burst=1)
+    limiter.reserve()
+    # A wall-clock jump forward must not refill the bucket
+    real_time = rate_limit.time.time
+    monkeypatch.setattr(rate_limit.time, "time", lambda: real_time() + 3600)
+    assert limiter.reserve() > 0.5
+
+
+@pytest.mark.skipif(not HAS_FCNTL, reason="state files need fcntl")
+def test_state_file_shares_one_budget(clock, tmp_path):
+    state_file = tmp_path / "eppo.bucket"
+    first = RateLimiter(rate=1, burst=2, state_file=state_file)
+    second = RateLimiter(rate=1, burst=2, state_file=state_file)
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() == pytest.approx(1.0)
+    second.block_for(10)
+    assert first.reserve() == pytest.approx(10.0)
+
+
+def test_acquire_async_waits_without_blocking(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(rate=2, burst=1)
+
+    async def main():
+        await limiter.acquire_async()
+        await limiter.acquire_async()
+
+    asyncio.run(main())
+    assert slept == [pytest.approx(0.5)]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("3", 3.0),
+        ("0.5", 0.5),
+        ("-1", 0.0),
+        ("", None),
+        (None, None),
+        ("soon", None),
+    ],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date(clock):
+    clock.now = 1_700_000_000.0
+    when = datetime.fromtimestamp(clock.now + 30, tz=timezone.utc)
+    assert parse_retry_after(format_datetime(when, usegmt=True)) == pytest.approx(30)
+    past = datetime.fromtimestamp(clock.now - 30, tz=timezone.utc)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_backoff_delay_is_jittered_within_bounds(monkeypatch):
+    for attempt in range(5):
+        full = 0.5 * 2**attempt
+        monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: a)
+        assert backoff_delay(attempt) == pytest.approx(full / 2)
+        monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: b)
+        assert backoff_delay(attempt) == pytest.approx(full)
+    assert backoff_delay(2, base=1.0) <= 4.0
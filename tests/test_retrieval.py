@@ -0,0 +1,209 @@
+"""Candidate ranking, the token index, its stale-index fallback and sessions."""
+
+import itertools
+import os
+import sqlite3
+import threading
+import warnings
+
+import pytest
+
+from conftest import make_norm
+from src import retrieval
+from src.name_index import build_name_index, read_index_meta
+from src.retrieval import (
+    RetrievalSession,
+    _rank_rows,
+    get_session,
+    index_is_current,
+    index_path_for,
+    query_candidates,
+)
+
+
+def _row(eppocode, fullname, dtcode="GAF"):
+    return {"eppocode": eppocode, "dtcode": dtcode, "fullname": fullname}
+
+
+def _ranked(candidates):
+    return [(c.eppocode, c.dtcode, c.fullname, c.score) for c in candidates]
+
+
+def test_rank_rows_breaks_score_ties_by_code():
+    rows = [
+        _row("ZZBLIG", "brown blight of pear"),
+        _row("MMBLIG", "brown blight of pear", dtcode="SFT"),
+        _row("AABLIG", "brown blight of pear"),
+        _row("MMBLIG", "brown blight of pear"),
+    ]
+    ranked = _rank_rows(rows, make_norm("brown", "blight"), 10)
+    assert [(c.eppocode, c.dtcode) for c in ranked] == [
+        ("AABLIG", "GAF"),
+        ("MMBLIG", "GAF"),
+        ("ZZBLIG", "GAF"),
+        ("MMBLIG", "SFT"),
+    ]
+
+
+def test_rank_rows_keeps_longest_then_smallest_name_per_code():
+    rows = [
+        _row("PHYTIN", "late blight of tomato"),
+        _row("PHYTIN", "blight"),
+        _row("PHYTIN", "late blight of potato"),
+    ]
+    norm = make_norm("blight")
+    for order in itertools.permutations(rows):
+        (best,) = _rank_rows(list(order), norm, 10)
+        assert best.fullname == "late blight of potato"
+        assert best.token_overlap == 1
+
+
+def test_rank_rows_prefers_overlap_over_name_length():
+    rows = [
+        _row("PHYTIN", "late blight of tomato and other solanaceae"),
+        _row("PHYTIN", "potato blight"),
+    ]
+    (best,) = _rank_rows(rows, make_norm("potato", "blight"), 10)
+    assert best.fullname == "potato blight"
+    assert best.token_overlap == 2
+
+
+def test_rank_rows_does_not_depend_on_row_order():
+    rows = [
+        _row("ZZBLIG", "brown blight of pear"),
+        _row("PHYTIN", "late blight of potato"),
+        _row("PHYTIN", "late blight of tomato"),
+        _row("AABLIG", "brown blight of pear"),
+        _row("SOLTU", "potato", dtcode="PFL"),
+    ]
+    norm = make_norm("blight", "potato")
+    expected = _ranked(_rank_rows(rows, norm, 10))
+    for order in itertools.permutations(rows):
+        assert _ranked(_rank_rows(list(order), norm, 10)) == expected
+
+
+def test_rank_rows_truncates_after_sorting():
+    rows = [_row(f"CODE{i:02d}", "blight") for i in range(20)]
+    rows.append(_row("ZZZZZZ", "potato blight"))
+    ranked = _rank_rows(rows, make_norm("potato", "blight"), 3)
+    assert [c.eppocode for c in ranked] == ["ZZZZZZ", "CODE00", "CODE01"]
+
+
+def test_query_candidates_skips_inactive_rows(eppo_db):
+    codes = [c.eppocode for c in query_candidates(eppo_db, make_norm("wart"))]
+    assert codes == []
+    names = [c.fullname for c in query_candidates(eppo_db, make_norm("scab"))]
+    assert names == ["apple scab"]
+
+
+@pytest.mark.parametrize(
+    "tokens",
+    [
+        ("late", "blight", "potato"),
+        ("brown", "blight"),
+        ("blight",),
+        ("potato",),
+        ("apple", "scab"),
+        ("unknown",),
+    ],
+)
+def test_token_index_matches_like_scan(eppo_db, tokens):
+    norm = make_norm(*tokens)
+    like = query_candidates(eppo_db, norm, use_index=False)
+    build_name_index(eppo_db)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        indexed = query_candidates(eppo_db, norm)
+    assert _ranked(indexed) == _ranked(like)
+
+
+def test_build_name_index_records_source(eppo_db):
+    stats = build_name_index(eppo_db)
+    index_path = index_path_for(eppo_db)
+    meta = read_index_meta(index_path)
+    assert stats["names"] == 14
+    assert meta["source_size"] == str(eppo_db.stat().st_size)
+    assert index_is_current(index_path, eppo_db)
+
+
+def test_stale_index_warns_and_falls_back_to_like(eppo_db):
+    build_name_index(eppo_db)
+    index_path = index_path_for(eppo_db)
+    # Same size, new mtime: e.g. a release copied over the old file
+    st = eppo_db.stat()
+    os.utime(eppo_db, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not index_is_current(index_path, eppo_db)
+
+    norm = make_norm("brown", "blight")
+    with pytest.warns(RuntimeWarning, match="does not match"):
+        stale = query_candidates(eppo_db, norm)
+    assert _ranked(stale) == _ranked(query_candidates(eppo_db, norm, use_index=False))
+
+
+def test_index_from_another_schema_version_is_not_current(eppo_db):
+    build_name_index(eppo_db)
+    index_path = index_path_for(eppo_db)
+    conn = sqlite3.connect(str(index_path))
+    conn.execute("UPDATE meta SET value = '0' WHERE key = 'schema_version'")
+    conn.commit()
+    conn.close()
+    assert not index_is_current(index_path, eppo_db)
+
+
+QUERIES = [
+    make_norm("late", "blight", "potato"),
+    make_norm("brown", "blight"),
+    make_norm("apple", "scab"),
+    make_norm("unknown"),
+]
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_session_matches_query_candidates(eppo_db, indexed):
+    if indexed:
+        build_name_index(eppo_db)
+    expected = [_ranked(query_candidates(eppo_db, norm)) for norm in QUERIES]
+    with RetrievalSession(eppo_db) as session:
+        assert session.indexed == indexed
+        assert [_ranked(session.query(norm)) for norm in QUERIES] == expected
+        assert [_ranked(c) for c in session.query_many(QUERIES)] == expected
+        assert session.query(make_norm()) == []
+
+
+def test_session_pool_is_bounded_and_shared_between_threads(eppo_db):
+    session = RetrievalSession(eppo_db, pool_size=2)
+    norm = make_norm("late", "blight", "potato")
+    expected = _ranked(session.query(norm))
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait(5)
+        for _ in range(20):
+            results.append(_ranked(session.query(norm)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert results == [expected] * 160
+    assert session._opened <= 2
+    session.close()
+
+
+def test_closed_session_refuses_queries_and_closes_borrowed_connections(eppo_db):
+    session = RetrievalSession(eppo_db)
+    with session.connection() as conn:
+        session.close()
+        conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with pytest.raises(RuntimeError, match="closed"):
+        session.query(make_norm("blight"))
+
+
+def test_get_session_is_shared_per_path(eppo_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "_sessions", {})
+    assert get_session(eppo_db) is get_session(str(eppo_db))
+    assert get_session(tmp_path / "other.sqlite") is not get_session(eppo_db)
@@ -0,0 +1,50 @@
+"""Serving: class list reloads while serving."""
+
+import json
+import os
+
+import pytest
+
+from src import normalization
+from src.config import Config
+from src.normalization import load_vocabulary
+from src.serving import load_retriever, serve_lines
+
+
+@pytest.fixture
+def classes(tmp_path, monkeypatch):
+    monkeypatch.setattr(normalization, "_vocabulary", None)
+    monkeypatch.setattr(Config, "CV_CLASSES_RELOAD_INTERVAL", 0.0)
+    path = tmp_path / "classes.txt"
+    path.write_text("Potato late blight\n", encoding="utf-8")
+    return path
+
+
+def test_workers_pick_up_an_edited_class_list(eppo_db, classes):
+    pytest.importorskip("numpy")
+    retriever = load_retriever(eppo_db)
+    vocabulary = load_vocabulary(classes)
+    assert "Apple scab" not in vocabulary
+
+    def lines():
+        yield json.dumps({"label": "Potato late blight"})
+        classes.write_text("Potato late blight\nApple scab\n", encoding="utf-8")
+        mtime = os.stat(classes).st_mtime + 10
+        os.utime(classes, (mtime, mtime))
+        yield json.dumps({"label": "Apple scab"})
+
+    responses = [
+        json.loads(r) for r in serve_lines(lines(), retriever, retrieval_only=True)
+    ]
+    assert [r["candidates"][0]["eppocode"] for r in responses] == ["PHYTIN", "VENTIN"]
+    assert "Apple scab" in vocabulary
+    # Looked up in the reloaded list, with its tokens pinned in the index
+    assert vocabulary.hits == 2
+    assert {"apple", "scab"} <= set(retriever.token_ids._pinned)
+
+
+def test_unreadable_class_list_keeps_the_loaded_one(classes):
+    vocabulary = load_vocabulary(classes)
+    classes.unlink()
+    assert vocabulary.poll() is False
+    assert "Potato late blight" in vocabulary
@@ -0,0 +1,24 @@
+"""Local token estimate and completion budget."""
+
+from src.tokens import TOKENS_PER_WORD, completion_tokens_for, estimate_tokens
+
+
+def test_estimate_counts_words_digits_and_punctuation():
+    assert estimate_tokens("") == estimate_tokens(None) == 0
+    assert estimate_tokens("late") == 1
+    # Longer words count one token per 4 letters
+    assert estimate_tokens("Phytophthora") == 3
+    # Digits in groups of 3, punctuation runs one per 2 characters
+    assert estimate_tokens("12345") == 2
+    assert estimate_tokens("(PHYTIN)") == 2 + 1 + 1
+    assert estimate_tokens("late blight, potato") == 1 + 2 + 1 + 2
+
+
+def test_estimate_grows_with_the_text():
+    block = "Names: late blight of potato, potato blight"
+    assert estimate_tokens(block + ", tomato blight") > estimate_tokens(block)
+
+
+def test_completion_tokens_leave_headroom():
+    assert completion_tokens_for(100) >= 100 * TOKENS_PER_WORD
+    assert completion_tokens_for(0) == 0
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Update derived indexes and caches for a new EPPO database release.
+
+Diffs t_codes/t_names of the old and new releases, patches the token index
+for the changed names only, recompiles the compiled index if one is in use,
+and drops cached facts and generated answers for the changed codes only.
+
+Usage:
+    python update_index.py --old eppocodes_all.sqlite --new eppocodes_2026.sqlite
+    python update_index.py --new new.sqlite --changed-codes changed.txt
+    python prefetch.py --codes changed.txt  # re-warm what was invalidated
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from src.cache import ResponseCache, open_cache
+from src.compiled_index import HAS_NUMPY, CompiledNameIndex, compiled_path_for
+from src.config import Config
+from src.index_update import diff_databases, invalidate_codes, update_name_index
+from src.retrieval import index_path_for
+
+
+def main():
+    """Diff two releases, patch indexes and invalidate changed codes."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--old",
+        type=Path,
+        default=Config.SQLITE_PATH,
+        help="Release the current indexes were built from (defaults to EPPO_SQLITE_PATH)",
+    )
+    parser.add_argument("--new", type=Path, required=True, help="New release")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help="Token index of the old release (defaults to <old stem>.tokens.sqlite)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Patched token index (defaults to <new stem>.tokens.sqlite)",
+    )
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="Recompile the compiled index even if the old release had none",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Config.EPPO_CACHE_DIR,
+        help="EPPO cache to clean (defaults to EPPO_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--response-cache",
+        type=Path,
+        default=Config.RESPONSE_CACHE_PATH,
+        help="Generated answer cache to clean (defaults to GROQ_RESPONSE_CACHE_PATH)",
+    )
+    parser.add_argument(
+        "--no-invalidate", action="store_true", help="Leave the caches untouched"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what changed"
+    )
+    parser.add_argument(
+        "--changed-codes", type=Path, default=None, help="Write changed EPPO codes here"
+    )
+    parser.add_argument(
+        "--report", type=Path, default=None, help="Write the summary as JSON here"
+    )
+    args = parser.parse_args()
+
+    for path in (args.old, args.new):
+        if not path.exists():
+            print(f"❌ SQLite database not found at {path}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    print(f"🔎 Diffing {args.old} → {args.new}")
+    diff = diff_databases(args.old, args.new)
+    summary = diff.summary()
+    print(
+        f"   Codes: +{summary['codes_added']} -{summary['codes_removed']} "
+        f"~{summary['codes_changed']}"
+    )
+    print(
+        f"   Names: +{summary['names_added']} -{summary['names_removed']} "
+        f"~{summary['names_changed']}"
+    )
+    print(f"   Changed EPPO codes: {summary['eppocodes']}")
+    print(f"   Time: {diff.seconds:.2f}s")
+    report = {"diff": summary, "diff_seconds": diff.seconds}
+
+    if args.changed_codes:
+        args.changed_codes.write_text(
+            "".join(f"{code}\n" for code in sorted(diff.eppocodes)), encoding="utf-8"
+        )
+        print(f"📝 Wrote changed codes to {args.changed_codes}")
+
+    if args.dry_run:
+        return
+
+    index_path = args.index or index_path_for(args.old)
+    output = args.output or index_path_for(args.new)
+    print(f"\n🔨 Updating token index: {index_path} → {output}")
+    stats = update_name_index(args.old, args.new, index_path, diff, output)
+    if stats["mode"] == "patched":
+        print(
+            f"   Patched {stats['names_deleted']} → {stats['names_inserted']} names, "
+            f"{stats['postings_deleted']} → {stats['postings_inserted']} postings"
+        )
+    else:
+        print(f"   Rebuilt (old index missing or not built from {args.old})")
+        print(f"   Names: {stats['names']}, postings: {stats['postings']}")
+    print(f"   Time: {stats['seconds']:.2f}s")
+    report["name_index"] = stats
+
+    if args.compiled or compiled_path_for(args.old).exists():
+        if not HAS_NUMPY:
+            print("❌ The compiled index requires numpy (pip install numpy)")
+            sys.exit(1)
+        compiled_output = compiled_path_for(args.new)
+        print(f"\n🔨 Recompiling name index → {compiled_output}")
+        compile_start = time.perf_counter()
+        stats = CompiledNameIndex.from_sqlite(args.new).save(compiled_output, args.new)
+        stats["seconds"] = time.perf_counter() - compile_start
+        print(f"   Tokens: {stats['tokens']}, names: {stats['names']}, codes: {stats['codes']}")
+        print(f"   Time: {stats['seconds']:.2f}s")
+        report["compiled_index"] = stats
+
+    if not args.no_invalidate and diff.eppocodes:
+        cache = open_cache(cache_dir=args.cache_dir)
+        response_cache = (
+            ResponseCache(args.response_cache) if args.response_cache.exists() else None
+        )
+        try:
+            stats = invalidate_codes(diff.eppocodes, cache, response_cache)
+        finally:
+            cache.close()
+            if response_cache is not None:
+                response_cache.close()
+        print(f"\n🧹 Invalidated {len(diff.eppocodes)} codes")
+        print(f"   Cached facts removed: {stats['facts_removed']}")
+        print(f"   Cached answers removed: {stats['responses_removed']}")
+        report["invalidation"] = stats
+
+    report["seconds"] = time.perf_counter() - start
+    print(f"\n✅ Done in {report['seconds']:.2f}s")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()